@@ -0,0 +1 @@
+"""Tooling for running, measuring and extending the spinning hexagon outputs."""
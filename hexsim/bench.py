@@ -0,0 +1,362 @@
+"""
+Headless benchmark harness for the model scripts.
+
+Every "<Model>.py" script is executed unmodified with the SDL dummy video
+driver and an uncapped clock, and stopped after a fixed number of frames.
+Per frame we measure:
+
+  render    - time spent in Surface.fill/blit and pygame.draw.* (display.flip
+              is a no-op here, the frame is drawn to an off-screen surface)
+  collision - time spent inside the script's collision helpers (if it has any)
+  physics   - everything else the frame did (update code, inline collisions)
+
+Usage:
+    python -m hexsim.bench --frames 600 --output bench.json
+"""
+import argparse
+import builtins
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from hexsim.scripts import model_name, model_scripts
+
+# Helper functions the scripts use for collision detection/response.
+# Time spent inside any of them is reported as "collision".
+COLLISION_HELPERS = (
+    "closest_point_on_segment",
+    "closest_point_on_line",
+    "check_collision",
+    "handle_collisions",
+    "collide_line",
+    "distance_point_to_line",
+    "distance",
+    "is_point_inside_hexagon",
+    "point_in_polygon",
+)
+
+DRAW_FUNCTIONS = ("polygon", "circle", "line", "lines", "aaline", "aalines", "rect")
+
+
+class FrameLimitReached(BaseException):
+    """Raised from display.flip once the requested number of frames has run.
+
+    Derives from BaseException so a script's own ``except Exception`` can't
+    swallow it.
+    """
+
+
+class ScriptRecorder:
+    """Collects per-frame timings while a script runs."""
+
+    def __init__(self, frames, warmup=0):
+        self.frames = frames
+        self.warmup = warmup
+        self.frame_count = 0
+        self.render = 0.0
+        self.collision = 0.0
+        self.waiting = 0.0
+        self.depth = 0
+        self.frame_start = None
+        self.samples = []  # (frame, render, collision, waiting) per measured frame
+        self.helpers = []
+        self.wrapped = False
+        self.surface = None
+        self.on_frame = None  # optional callback(surface, frame_index)
+
+    def start(self):
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        now = time.perf_counter()
+        if self.frame_count >= self.warmup:
+            self.samples.append((now - self.frame_start, self.render, self.collision, self.waiting))
+        if self.on_frame is not None:
+            self.on_frame(self.surface, self.frame_count)
+        self.frame_count += 1
+        self.render = self.collision = self.waiting = 0.0
+        if self.frame_count >= self.warmup + self.frames:
+            raise FrameLimitReached()
+        self.frame_start = time.perf_counter()
+
+    def wrap_helpers(self, namespace):
+        """Replace the script's collision helpers with timed wrappers.
+
+        Called on the first event poll, when the main loop is about to start
+        and every module-level helper has been defined.
+        """
+        self.wrapped = True
+        for name in COLLISION_HELPERS:
+            func = namespace.get(name)
+            if getattr(func, "__globals__", None) is namespace:
+                namespace[name] = self._timed_helper(func)
+                self.helpers.append(name)
+
+    def _timed_helper(self, func):
+        def timed(*args, **kwargs):
+            if self.depth:
+                return func(*args, **kwargs)
+            self.depth += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.collision += time.perf_counter() - start
+                self.depth -= 1
+        return timed
+
+
+# ----------------------------
+# pygame patches
+# ----------------------------
+
+class _TimedSurface(pygame.Surface):
+    """Off-screen stand-in for the display surface that times fill and blit."""
+
+    recorder = None
+
+    def fill(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().fill(*args, **kwargs)
+        finally:
+            self.recorder.render += time.perf_counter() - start
+
+    def blit(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().blit(*args, **kwargs)
+        finally:
+            self.recorder.render += time.perf_counter() - start
+
+
+class _UncappedClock:
+    """Drop-in for pygame.time.Clock that never sleeps.
+
+    tick() reports the nominal frame time so scripts that use its return value
+    keep running at their designed speed.
+    """
+
+    def __init__(self):
+        self.framerate = 0
+
+    def tick(self, framerate=0):
+        self.framerate = framerate
+        return int(1000 / framerate) if framerate else 0
+
+    tick_busy_loop = tick
+
+    def get_fps(self):
+        return float(self.framerate)
+
+    def get_time(self):
+        return int(1000 / self.framerate) if self.framerate else 0
+
+    get_rawtime = get_time
+
+
+class _Patches:
+    """Install the timing hooks into pygame for the duration of one script run."""
+
+    def __init__(self, recorder, namespace):
+        self.recorder = recorder
+        self.namespace = namespace
+        self.saved = []
+
+    def _set(self, owner, name, value):
+        self.saved.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def _timed(self, func):
+        recorder = self.recorder
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.render += time.perf_counter() - start
+        return timed
+
+    def __enter__(self):
+        recorder = self.recorder
+        namespace = self.namespace
+        real_set_mode = pygame.display.set_mode
+        real_get = pygame.event.get
+
+        def set_mode(size=(0, 0), *args, **kwargs):
+            real_set_mode(size, *args, **kwargs)
+            _TimedSurface.recorder = recorder
+            recorder.surface = _TimedSurface(size)
+            return recorder.surface
+
+        def get_surface():
+            return recorder.surface
+
+        def event_get(*args, **kwargs):
+            if not recorder.wrapped:
+                recorder.wrap_helpers(namespace)
+                recorder.start()
+            start = time.perf_counter()
+            events = real_get(*args, **kwargs)
+            recorder.waiting += time.perf_counter() - start
+            return events
+
+        def flip(*args, **kwargs):
+            if recorder.frame_start is None:
+                recorder.start()
+            recorder.end_frame()
+
+        self._set(pygame.display, "set_mode", set_mode)
+        self._set(pygame.display, "get_surface", get_surface)
+        self._set(pygame.display, "flip", flip)
+        self._set(pygame.display, "update", flip)
+        self._set(pygame.event, "get", event_get)
+        self._set(pygame.time, "Clock", _UncappedClock)
+        for name in DRAW_FUNCTIONS:
+            self._set(pygame.draw, name, self._timed(getattr(pygame.draw, name)))
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, value in reversed(self.saved):
+            setattr(owner, name, value)
+        return False
+
+
+# ----------------------------
+# Running scripts
+# ----------------------------
+
+def run_script(path, frames=600, warmup=60, seed=0, on_frame=None):
+    """Run one model script headless and return its result dict."""
+    result = {
+        "model": model_name(path),
+        "script": os.path.basename(path),
+        "status": "ok",
+        "error": None,
+        "frames": 0,
+    }
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    try:
+        code = compile(source, path, "exec")
+    except SyntaxError as e:
+        result["status"] = "syntax-error"
+        result["error"] = "%s (line %s)" % (e.msg, e.lineno)
+        return result
+
+    recorder = ScriptRecorder(frames, warmup)
+    recorder.on_frame = on_frame
+    namespace = {"__name__": "__main__", "__file__": path, "__builtins__": builtins}
+    random.seed(seed)
+    start = time.perf_counter()
+    try:
+        with _Patches(recorder, namespace):
+            exec(code, namespace)
+        result["status"] = "exited"
+    except FrameLimitReached:
+        pass
+    except SystemExit:
+        result["status"] = "exited"
+    except Exception as e:
+        result["status"] = "crashed"
+        result["error"] = "%s: %s" % (type(e).__name__, e)
+    finally:
+        wall = time.perf_counter() - start
+        pygame.quit()
+
+    result.update(summarize(recorder.samples))
+    result["collision_helpers"] = recorder.helpers
+    result["wall_s"] = wall
+    return result
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    """Reduce per-frame samples to mean costs (milliseconds) and FPS."""
+    n = len(samples)
+    if n == 0:
+        return {"frames": 0, "fps": None, "frame_ms": None,
+                "physics_ms": None, "collision_ms": None, "render_ms": None}
+    totals = sorted(s[0] for s in samples)
+    frame = sum(totals) / n
+    render = sum(s[1] for s in samples) / n
+    collision = sum(s[2] for s in samples) / n
+    waiting = sum(s[3] for s in samples) / n
+    return {
+        "frames": n,
+        "fps": 1.0 / frame if frame > 0 else None,
+        "frame_ms": {
+            "mean": frame * 1e3,
+            "p50": _percentile(totals, 0.5) * 1e3,
+            "p95": _percentile(totals, 0.95) * 1e3,
+        },
+        "physics_ms": (frame - render - collision - waiting) * 1e3,
+        "collision_ms": collision * 1e3,
+        "render_ms": render * 1e3,
+        "events_ms": waiting * 1e3,
+    }
+
+
+def _fmt(value, spec=".3f"):
+    return "-" if value is None else format(value, spec)
+
+
+def print_table(results, out=sys.stdout):
+    header = "%-30s %-13s %10s %10s %10s %10s %10s" % (
+        "Model", "Status", "FPS", "frame ms", "physics", "collision", "render")
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for r in results:
+        frame_ms = r["frame_ms"]["mean"] if r.get("frame_ms") else None
+        print("%-30s %-13s %10s %10s %10s %10s %10s" % (
+            r["model"][:30], r["status"], _fmt(r.get("fps"), ".0f"), _fmt(frame_ms),
+            _fmt(r.get("physics_ms")), _fmt(r.get("collision_ms")), _fmt(r.get("render_ms"))), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scripts", nargs="*", help="scripts to run (default: every model script)")
+    parser.add_argument("--frames", type=int, default=600, help="measured frames per script")
+    parser.add_argument("--warmup", type=int, default=60, help="unmeasured frames before timing")
+    parser.add_argument("--seed", type=int, default=0, help="seed for scripts that use random")
+    parser.add_argument("--output", default="bench.json", help="where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    scripts = args.scripts or model_scripts()
+    results = []
+    for path in scripts:
+        results.append(run_script(path, args.frames, args.warmup, args.seed))
+
+    report = {
+        "frames": args.frames,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_table(results)
+    print("\nWrote %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
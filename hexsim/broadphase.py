@@ -0,0 +1,167 @@
+"""
+Uniform-grid broad phase for ball-ball collisions.
+
+All balls share one radius, so with cells one diameter wide two balls can
+only touch if they are in the same cell or in neighbouring cells. The grid
+is rebuilt every step by sorting rather than by bucketing in Python:
+
+  1. every ball's cell (cx, cy) is flattened into one integer id
+  2. balls are argsorted by id, so each occupied cell is a run of equal ids
+  3. for the ball's own cell and four of its eight neighbours (the other
+     four are covered from their side) the run is found with searchsorted,
+     and all (i, j) candidates come out at once with repeat/cumsum
+  4. candidates closer than a diameter (plus a small margin) are split
+     into batches in which no ball appears twice, and each batch is
+     resolved with vectorized position corrections and impulses
+
+Batches are solved one after another, Gauss-Seidel style, a few times per
+step; the engine's wall constraint runs after each pass so walls and
+contacts are solved together. With only a few passes support travels a
+few layers up a pile per step, so tall piles of small balls stay
+slightly compressed and never quite come to rest.
+"""
+import numpy as np
+
+ITERATIONS = 4        # relaxation passes over the contacts per step
+RESTING_SPEED = 60.0  # px/s; slower contacts don't bounce, so piles can come to rest
+CONTACT_MARGIN = 0.1  # pairs within this fraction of a diameter of touching are resolved too
+
+# Forward half of the neighbourhood, as (dx, dy) cell offsets
+_OFFSETS = ((1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+class SpatialHash:
+    """Sorted uniform grid over a set of points, rebuilt from scratch by build()."""
+
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.rng = np.random.default_rng(0)
+        self.order = None
+        self.ids = None
+        self.columns = 0
+
+    def build(self, x, y):
+        """Bin points (x, y); afterwards self.order sorts them by cell id."""
+        x0 = x.min()
+        y0 = y.min()
+        cx = ((x - x0) // self.cell_size).astype(np.int64)
+        cy = ((y - y0) // self.cell_size).astype(np.int64)
+        # One spare column on each side so the dx = -1/+1 neighbours never
+        # wrap around into the next row
+        self.columns = int(cx.max()) + 3
+        ids = cy * self.columns + cx + 1
+        self.order = np.argsort(ids, kind="stable")
+        self.ids = ids[self.order]
+
+    def pairs(self):
+        """Candidate pairs (i, j) of points in the same or neighbouring cells.
+
+        Every unordered pair is produced once.
+        """
+        ids = self.ids
+        n = len(ids)
+        pos = np.arange(n)
+        # Same cell: the points after this one in its run
+        lo = [pos + 1]
+        hi = [np.searchsorted(ids, ids, side="right")]
+        for dx, dy in _OFFSETS:
+            target = ids + (dy * self.columns + dx)
+            lo.append(np.searchsorted(ids, target, side="left"))
+            hi.append(np.searchsorted(ids, target, side="right"))
+        lo = np.concatenate(lo)
+        counts = np.concatenate(hi) - lo
+        owner = np.tile(pos, len(_OFFSETS) + 1)
+
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        first = np.cumsum(counts) - counts
+        i = np.repeat(owner, counts)
+        j = np.repeat(lo - first, counts) + np.arange(total)
+        return self.order[i], self.order[j]
+
+
+def batches(i, j, n, rng):
+    """Split contacts (i, j) into batches in which no ball appears twice.
+
+    Each round gives the remaining contacts random priorities and takes
+    every contact that beats all other remaining contacts of both its
+    balls, which needs only a few rounds even for dense piles.
+    """
+    out = []
+    remaining = np.arange(len(i))
+    best = np.empty(n)
+    while remaining.size:
+        ri, rj = i[remaining], j[remaining]
+        priority = rng.random(remaining.size)
+        best.fill(2.0)
+        np.minimum.at(best, ri, priority)
+        np.minimum.at(best, rj, priority)
+        chosen = (best[ri] == priority) & (best[rj] == priority)
+        out.append(remaining[chosen])
+        remaining = remaining[~chosen]
+    return out
+
+
+def collide(balls, restitution, grid=None, iterations=ITERATIONS, constrain=None):
+    """Separate overlapping balls and exchange equal-mass impulses.
+
+    constrain, if given, is called after every iteration, so walls can be
+    solved together with the contacts pressing balls into them. Returns
+    the number of contacts found.
+    """
+    n = len(balls)
+    if n < 2:
+        return 0
+    diameter = 2 * balls.radius
+    if grid is None:
+        grid = SpatialHash(diameter)
+    x, y, vx, vy = balls.x, balls.y, balls.vx, balls.vy
+    grid.build(x, y)
+    i, j = grid.pairs()
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    # Pairs just short of touching are kept too: resolving the pile below
+    # them closes the gap within this step
+    reach = diameter * (1 + CONTACT_MARGIN)
+    touching = np.flatnonzero(dx * dx + dy * dy < reach * reach)
+    if touching.size == 0:
+        return 0
+    i, j = i[touching], j[touching]
+    groups = [(i[k], j[k]) for k in batches(i, j, n, grid.rng)]
+    for _ in range(iterations):
+        for bi, bj in groups:
+            _resolve(x, y, vx, vy, bi, bj, diameter, restitution)
+        if constrain is not None:
+            constrain()
+    return int(touching.size)
+
+
+def _resolve(x, y, vx, vy, i, j, diameter, restitution):
+    """Resolve contacts in which no ball appears twice, all at once."""
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    d2 = dx * dx + dy * dy
+    dist = np.sqrt(d2)
+    # Contact normal from i to j; coincident centers get an arbitrary one
+    coincident = dist == 0
+    safe = np.where(coincident, 1.0, dist)
+    nx = np.where(coincident, 1.0, dx / safe)
+    ny = np.where(coincident, 0.0, dy / safe)
+
+    # Each ball moves half the overlap away from the other
+    push = 0.5 * np.maximum(diameter - dist, 0.0)
+    x[i] -= push * nx
+    y[i] -= push * ny
+    x[j] += push * nx
+    y[j] += push * ny
+
+    # Equal masses: each ball takes half of the (1 + e) relative normal velocity
+    rel = (vx[j] - vx[i]) * nx + (vy[j] - vy[i]) * ny
+    bounce = np.where(rel < -RESTING_SPEED, restitution, 0.0)
+    impulse = np.where((rel < 0) & (dist < diameter), 0.5 * (1 + bounce) * rel, 0.0)
+    vx[i] += impulse * nx
+    vy[i] += impulse * ny
+    vx[j] -= impulse * nx
+    vy[j] -= impulse * ny
@@ -0,0 +1,51 @@
+"""
+The hotkeys of "Gemini 2.0 Flash - Hotkeys.py", applied to an engine.
+
+Controls work on the recording.EVENT_* bits rather than on pygame keys, so
+the same actions can come from a local keyboard (hexsim.viewer), a remote
+client (hexsim.server) or a recorded trajectory.
+"""
+import math
+import random
+
+import numpy as np
+
+from hexsim.engine import FPS
+from hexsim.recording import EVENT_FASTER, EVENT_KICK, EVENT_LEFT, EVENT_RIGHT, EVENT_SLOWER
+
+SPEED_STEP = math.radians(0.1) * FPS   # Gemini's 0.1 degrees per frame, per second
+KICK_MIN, KICK_MAX = 5 * FPS, 15 * FPS  # random kick strength in pixels per second
+
+
+class Controls:
+    """Rotation direction and speed of an engine, changed by hotkey events."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.direction = 1 if engine.angular_velocity >= 0 else -1
+        self.speed = abs(engine.angular_velocity)
+
+    def apply(self, events):
+        """Apply a bitmask of hotkey events, in the order the script checks them."""
+        if not events:
+            return
+        if events & EVENT_LEFT:
+            self.direction = -1  # Counterclockwise
+        if events & EVENT_RIGHT:
+            self.direction = 1   # Clockwise
+        if events & EVENT_FASTER:
+            self.speed += SPEED_STEP
+        if events & EVENT_SLOWER:
+            self.speed = max(0.0, self.speed - SPEED_STEP)  # Prevent negative speed
+        if events & EVENT_KICK:
+            self.kick()
+        self.engine.angular_velocity = self.direction * self.speed
+
+    def kick(self):
+        """Add a random force to every ball."""
+        b = self.engine.balls
+        n = len(b)
+        angle = np.array([random.uniform(0, 2 * math.pi) for _ in range(n)])
+        force = np.array([random.uniform(KICK_MIN, KICK_MAX) for _ in range(n)])
+        b.vx += force * np.cos(angle)
+        b.vy += force * np.sin(angle)
@@ -0,0 +1,82 @@
+"""
+Dirty-rectangle rendering.
+
+Instead of screen.fill() + redraw + display.flip() over the whole window
+every frame, only the regions that changed are cleared and pushed to the
+display: last frame's bounding rects are filled with the background, the
+scene is drawn again (pygame.draw returns the rect each call touched), and
+display.update() is given the old and new rects together. When the dirty
+area gets large a plain flip is cheaper, so we fall back to it.
+
+The hexagon outline is drawn as short line pieces rather than one polygon,
+so its dirty rects hug the outline instead of covering the whole hexagon.
+"""
+import pygame
+
+FULL_FRACTION = 0.4   # flip the whole window once this much of it is dirty
+OUTLINE_PIECES = 8    # line pieces per polygon edge
+
+
+def draw_outline(surface, color, vertices, width=1, pieces=OUTLINE_PIECES):
+    """Draw a closed polygon outline; returns the rect of every piece."""
+    rects = []
+    n = len(vertices)
+    for i in range(n):
+        ax, ay = vertices[i]
+        bx, by = vertices[(i + 1) % n]
+        dx, dy = (bx - ax) / pieces, (by - ay) / pieces
+        for k in range(pieces):
+            start = (ax + dx * k, ay + dy * k)
+            end = (ax + dx * (k + 1), ay + dy * (k + 1))
+            rects.append(pygame.draw.line(surface, color, start, end, width))
+    return rects
+
+
+class DirtyRects:
+    """Tracks what was drawn last frame and this frame, and presents only that."""
+
+    def __init__(self, surface, background, full_fraction=FULL_FRACTION):
+        self.surface = surface
+        self.background = background
+        self.full_area = surface.get_width() * surface.get_height() * full_fraction
+        self.previous = []
+        self.current = []
+        self.first = True
+        self.full_flips = 0
+        self.partial_updates = 0
+
+    def clear(self):
+        """Erase last frame's drawing (the whole surface on the first frame)."""
+        if self.first:
+            self.surface.fill(self.background)
+        else:
+            for rect in self.previous:
+                self.surface.fill(self.background, rect)
+
+    def add(self, rect):
+        if rect.width and rect.height:
+            self.current.append(rect)
+
+    def extend(self, rects):
+        for rect in rects:
+            self.add(rect)
+
+    def invalidate(self):
+        """Force a full clear and flip on the next frame, e.g. after a resize."""
+        self.first = True
+
+    def present(self):
+        """Push the changed regions to the display."""
+        rects = self.previous + self.current
+        area = 0
+        for rect in rects:
+            area += rect.width * rect.height
+        if self.first or area > self.full_area:
+            pygame.display.flip()
+            self.full_flips += 1
+        else:
+            pygame.display.update(rects)
+            self.partial_updates += 1
+        self.previous = self.current
+        self.current = []
+        self.first = False
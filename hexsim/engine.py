@@ -0,0 +1,495 @@
+"""
+Vectorized many-ball engine.
+
+Uses the collision model from "ChatGPT o3-mini.py": closest point on each
+edge, wall velocity omega x (p - center) at the contact point, and a
+restitution reflection of the velocity relative to the wall. Instead of one
+ball in a scalar Python loop, every ball is stepped at once with NumPy. Ball
+state is stored as struct-of-arrays (one float64 array per component), so the
+only Python-level loops are over edges and resolve iterations, never balls.
+
+Units are pixels and seconds. The o3-mini script's per-frame constants
+(gravity 0.5 px/frame², rotation 0.01 rad/frame, at 60 FPS) map to the
+defaults below.
+
+Usage:
+    python -m hexsim.engine --balls 100000 --steps 200
+    python -m hexsim.engine --balls 100000 --sides 1000 --sectors
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from hexsim import broadphase, ccd, integrators, kernels, solver
+from hexsim.geometry import RegularPolygon
+from hexsim.profiler import COLLISION, DISABLED
+
+FPS = 60
+WIDTH, HEIGHT = 800, 600
+HEX_CENTER = (WIDTH // 2, HEIGHT // 2)
+HEX_RADIUS = 250
+NUM_SIDES = 6
+ANGULAR_VELOCITY = 0.01 * FPS   # radians per second
+GRAVITY = 0.5 * FPS * FPS       # pixels per second²
+RESTITUTION = 0.9
+BALL_RADIUS = 15
+ITERATIONS = 3                  # collision resolve passes per step, as in o3-mini
+CCD_ITERATIONS = 4              # swept bounces per ball per step when ccd is on
+SPAWN_SPREAD = 100.0            # radius of the disc random balls start in
+BACKENDS = ("numpy", "numba")
+INTEGRATOR = "semi-implicit"    # the scripts' update order
+
+
+class Balls:
+    """Struct-of-arrays ball state. All balls share one radius."""
+
+    def __init__(self, x, y, vx, vy, radius=BALL_RADIUS):
+        self.x = np.array(x, dtype=np.float64)
+        self.y = np.array(y, dtype=np.float64)
+        self.vx = np.array(vx, dtype=np.float64)
+        self.vy = np.array(vy, dtype=np.float64)
+        self.radius = float(radius)
+
+    def __len__(self):
+        return len(self.x)
+
+    @classmethod
+    def single(cls, x, y, vx, vy, radius=BALL_RADIUS):
+        return cls([x], [y], [vx], [vy], radius)
+
+    @classmethod
+    def random(cls, n, center=HEX_CENTER, spread=SPAWN_SPREAD, speed=300.0, radius=BALL_RADIUS, seed=None):
+        """Scatter n balls uniformly in a disc of radius spread around center,
+        with random directions and speeds up to speed."""
+        rng = np.random.default_rng(seed)
+        r = spread * np.sqrt(rng.random(n))
+        theta = rng.random(n) * (2 * math.pi)
+        s = speed * rng.random(n)
+        phi = rng.random(n) * (2 * math.pi)
+        return cls(center[0] + r * np.cos(theta), center[1] + r * np.sin(theta),
+                   s * np.cos(phi), s * np.sin(phi), radius)
+
+    def copy(self):
+        return Balls(self.x, self.y, self.vx, self.vy, self.radius)
+
+
+class _Scratch:
+    """Work arrays for one edge query, reused between steps."""
+
+    def __init__(self, n):
+        self.t = np.empty(n)
+        self.cx = np.empty(n)
+        self.cy = np.empty(n)
+        self.dx = np.empty(n)
+        self.dy = np.empty(n)
+        self.d2 = np.empty(n)
+        self.tmp = np.empty(n)
+        self.hit = np.empty(n, dtype=bool)
+        self.searching = np.empty(n, dtype=bool)
+        self.collided = np.empty(n, dtype=bool)
+
+
+class Engine:
+    """Steps a Balls population inside a rotating regular polygon.
+
+    With ccd=True balls are moved with swept collision detection (see
+    hexsim.ccd) so large steps and fast balls can't tunnel through the walls;
+    the discrete o3-mini pass still runs afterwards for resting contacts.
+
+    With ball_collisions=True balls also collide with each other, using the
+    sorted-grid broad phase in hexsim.broadphase.
+
+    With sectors=True the wall pass doesn't walk the edges: balls inside the
+    inscribed circle shrunk by their radius are skipped outright and the
+    rest are resolved against the single edge or vertex their polar angle
+    points at (RegularPolygon.locate), so the cost per ball doesn't grow
+    with the number of sides.
+
+    With contacts=True the wall pass is hexsim.solver's ContactSolver
+    instead of o3-mini's loop: every edge a ball touches is solved at once
+    with warm-started accumulated impulses, so balls wedged in a corner
+    settle instead of jittering between the two walls.
+
+    integrator picks how free flight is stepped (see hexsim.integrators),
+    and drag adds linear air drag in 1/s, which unlike Claude's per-frame
+    FRICTION doesn't depend on the step size. ccd moves balls along
+    straight lines, so it needs the default semi-implicit integrator.
+
+    backend="numba" runs the plain o3-mini step (no ccd, ball collisions,
+    sectors, contacts or drag, default integrator) through the compiled
+    kernel in hexsim.kernels, which gives the same results as the NumPy
+    path; without Numba it quietly stays on NumPy.
+    """
+
+    def __init__(self, balls, center=HEX_CENTER, radius=HEX_RADIUS, sides=NUM_SIDES, angle=0.0,
+                 angular_velocity=ANGULAR_VELOCITY, gravity=GRAVITY, restitution=RESTITUTION,
+                 iterations=ITERATIONS, ccd=False, ccd_iterations=CCD_ITERATIONS, ball_collisions=False,
+                 sectors=False, contacts=False, integrator=INTEGRATOR, drag=0.0, backend="numpy"):
+        self.balls = balls
+        self.polygon = RegularPolygon(center, radius, sides)
+        self.angle = float(angle)
+        self.angular_velocity = float(angular_velocity)
+        self.gravity = float(gravity)
+        self.restitution = float(restitution)
+        self.iterations = int(iterations)
+        self.ccd = bool(ccd)
+        self.ccd_iterations = int(ccd_iterations)
+        self.ball_collisions = bool(ball_collisions)
+        self.ball_contacts = 0
+        self.sectors = bool(sectors)
+        self.contacts = bool(contacts)
+        self.solver = solver.ContactSolver()
+        if integrator not in integrators.INTEGRATORS:
+            raise ValueError("unknown integrator %r, expected one of %s"
+                             % (integrator, ", ".join(integrators.INTEGRATORS)))
+        if self.ccd and integrator != INTEGRATOR:
+            raise ValueError("ccd moves balls in straight lines and needs the %s integrator" % INTEGRATOR)
+        self.integrator = integrator
+        self.drag = float(drag)
+        self.profiler = DISABLED
+        if backend not in BACKENDS:
+            raise ValueError("unknown backend %r, expected one of %s" % (backend, ", ".join(BACKENDS)))
+        self.backend = backend
+        self.time = 0.0
+        self._scratch = None
+        self._grid = broadphase.SpatialHash(2 * balls.radius)
+
+    # ----------------------------
+    # Geometry
+    # ----------------------------
+
+    @property
+    def center(self):
+        return self.polygon.center
+
+    @property
+    def radius(self):
+        return self.polygon.radius
+
+    @property
+    def sides(self):
+        return self.polygon.sides
+
+    def vertices(self, angle=None):
+        """Polygon vertices as a (sides, 2) array, same order as o3-mini.
+
+        The array is the polygon's reused buffer; copy it to keep it.
+        """
+        return self.polygon.update_arrays(self.angle if angle is None else angle)[0]
+
+    # ----------------------------
+    # Stepping
+    # ----------------------------
+
+    def step(self, dt=1.0 / FPS):
+        """Advance the simulation by dt seconds."""
+        b = self.balls
+        if self._compiled():
+            self.angle += self.angular_velocity * dt
+            verts, normals = self.polygon.update_arrays(self.angle)
+            self.profiler.begin(COLLISION)
+            kernels.compiled()(b.x, b.y, b.vx, b.vy, verts, normals, b.radius, self.restitution,
+                               self.angular_velocity, self.center[0], self.center[1],
+                               self.gravity * dt, dt, self.iterations)
+            self.profiler.end()
+            self.time += dt
+            return
+        s = self._buffers()
+        angle0 = self.angle
+        self.angle += self.angular_velocity * dt
+        if self.ccd:
+            integrators.kick(b, self.gravity, self.drag, dt)
+            ccd.advance(self, angle0, dt, self.ccd_iterations)
+        elif self.integrator != INTEGRATOR or self.drag:
+            integrators.INTEGRATORS[self.integrator](b, self.gravity, self.drag, dt)
+        else:
+            # Semi-implicit Euler, the same order the scripts use
+            b.vy += self.gravity * dt
+            np.multiply(b.vx, dt, out=s.tmp)
+            b.x += s.tmp
+            np.multiply(b.vy, dt, out=s.tmp)
+            b.y += s.tmp
+        self.profiler.begin(COLLISION)
+        if self.ball_collisions:
+            self.ball_contacts = broadphase.collide(b, self.restitution, self._grid, constrain=self.contain)
+            if not self.ball_contacts:
+                self.contain()
+        self.collide()
+        self.profiler.end()
+        self.time += dt
+
+    def _compiled(self):
+        """Whether this step can go through the compiled kernel."""
+        return (self.backend == "numba" and not self.ccd
+                and not self.ball_collisions and not self.sectors and not self.contacts
+                and self.integrator == INTEGRATOR and not self.drag and kernels.compiled() is not None)
+
+    def run(self, steps, dt=1.0 / FPS):
+        for _ in range(steps):
+            self.step(dt)
+
+    def _buffers(self):
+        n = len(self.balls)
+        if self._scratch is None or len(self._scratch.t) != n:
+            self._scratch = _Scratch(n)
+        return self._scratch
+
+    # ----------------------------
+    # Collision detection and resolution
+    # ----------------------------
+
+    def collide(self):
+        """Resolve ball/wall contacts.
+
+        Mirrors o3-mini's loop: each pass walks the edges in order, a ball is
+        resolved against the first edge it overlaps and then stops searching;
+        balls that collided get another pass, up to self.iterations.
+        """
+        if self.contacts:
+            self.solver.solve(self)
+            return
+        if self.sectors:
+            self._collide_sectors()
+            return
+        b = self.balls
+        verts, normals = self.polygon.update_arrays(self.angle)
+        edges = list(zip(verts.tolist(), np.roll(verts, -1, axis=0).tolist(), normals.tolist()))
+        s = self._buffers()
+        s.searching.fill(True)
+        s.collided.fill(False)
+        for i in range(self.sides):
+            self._collide_edge(b.x, b.y, None, edges[i], s)
+        idx = np.flatnonzero(s.collided)
+        for _ in range(self.iterations - 1):
+            if idx.size == 0:
+                break
+            sub = _Scratch(idx.size)
+            sub.searching.fill(True)
+            sub.collided.fill(False)
+            x, y = b.x[idx], b.y[idx]
+            for i in range(self.sides):
+                self._collide_edge(x, y, idx, edges[i], sub)
+            idx = idx[sub.collided]
+
+    def _collide_sectors(self):
+        """collide() for sectors=True: one candidate feature per ball.
+
+        A ball whose center lies outside the polygon is pushed back in
+        rather than out through the wall, whether it's past an edge or a
+        vertex. Balls that collided are checked again, as in collide(), to
+        catch the neighbouring edge near a vertex.
+        """
+        b = self.balls
+        s = self._buffers()
+        poly = self.polygon
+        r = b.radius
+        # Inscribed-circle early-out
+        np.subtract(b.x, poly.center[0], out=s.dx)
+        np.subtract(b.y, poly.center[1], out=s.dy)
+        np.multiply(s.dx, s.dx, out=s.d2)
+        np.multiply(s.dy, s.dy, out=s.tmp)
+        s.d2 += s.tmp
+        safe = max(poly.apothem - r, 0.0)
+        idx = np.flatnonzero(s.d2 >= safe * safe)
+        normals = poly.update_arrays(self.angle)[1]
+        a = poly.apothem
+        h = poly.half_edge
+        for _ in range(self.iterations):
+            if idx.size == 0:
+                break
+            x, y = b.x[idx], b.y[idx]
+            edge, u, v = poly.locate(x, y, self.angle)
+            # Closest point on the edge's segment, clamped onto a vertex past its ends
+            along = np.clip(v, -h, h)
+            ox = -normals[edge, 0]
+            oy = -normals[edge, 1]
+            cx = poly.center[0] + a * ox - along * oy
+            cy = poly.center[1] + a * oy + along * ox
+            dx = x - cx
+            dy = y - cy
+            dist = np.hypot(dx, dy)
+            outside = u > a
+            hit = outside | (dist < r)
+            if not hit.any():
+                break
+            idx, x, y, cx, cy = idx[hit], x[hit], y[hit], cx[hit], cy[hit]
+            dx, dy, dist, outside = dx[hit], dy[hit], dist[hit], outside[hit]
+            ox, oy = ox[hit], oy[hit]
+            # Normal towards the inside: away from the wall for centers
+            # inside, towards it for centers that got through
+            flat = dist == 0
+            sign = np.where(outside, -1.0, 1.0) / np.where(flat, 1.0, dist)
+            nx = np.where(flat, -ox, dx * sign)
+            ny = np.where(flat, -oy, dy * sign)
+            depth = np.where(outside, r + dist, r - dist)
+            b.x[idx] = x + nx * depth
+            b.y[idx] = y + ny * depth
+
+            # Wall velocity at the contact point: omega x (p - center)
+            wx = -self.angular_velocity * (cy - poly.center[1])
+            wy = self.angular_velocity * (cx - poly.center[0])
+            vx, vy = b.vx[idx], b.vy[idx]
+            rel_dot_n = (vx - wx) * nx + (vy - wy) * ny
+            impulse = np.where(rel_dot_n < 0, (1 + self.restitution) * rel_dot_n, 0.0)
+            b.vx[idx] = vx - impulse * nx
+            b.vy[idx] = vy - impulse * ny
+
+    def contain(self):
+        """Move balls pushed through a wall (by other balls) back inside it.
+
+        o3-mini's closest-point test can't tell which side of an edge a ball
+        is on, so a center shoved past the edge would be pushed further out.
+        Balls are clamped to the polygon shrunk by one radius and bounced off
+        the wall they were clamped against, as the wall pass would have.
+        """
+        b = self.balls
+        s = self._buffers()
+        verts, normals = self.polygon.update_arrays(self.angle)
+        cx, cy = self.center
+        w = self.angular_velocity
+        for (ax, ay), (nx, ny) in zip(verts.tolist(), normals.tolist()):
+            # How far each ball is short of one radius inside the edge's line
+            np.subtract(b.x, ax, out=s.dx)
+            s.dx *= nx
+            np.subtract(b.y, ay, out=s.dy)
+            s.dy *= ny
+            np.add(s.dx, s.dy, out=s.tmp)
+            np.subtract(b.radius, s.tmp, out=s.tmp)
+            ids = np.flatnonzero(s.tmp > 0)
+            if ids.size == 0:
+                continue
+            depth = s.tmp[ids]
+            px = b.x[ids] + depth * nx
+            py = b.y[ids] + depth * ny
+            b.x[ids] = px
+            b.y[ids] = py
+            # Wall velocity at the contact point, one radius further out
+            wx = -w * (py - b.radius * ny - cy)
+            wy = w * (px - b.radius * nx - cx)
+            vx, vy = b.vx[ids], b.vy[ids]
+            rel_dot_n = (vx - wx) * nx + (vy - wy) * ny
+            bounce = np.where(rel_dot_n < -broadphase.RESTING_SPEED, self.restitution, 0.0)
+            impulse = np.where(rel_dot_n < 0, (1 + bounce) * rel_dot_n, 0.0)
+            b.vx[ids] = vx - impulse * nx
+            b.vy[ids] = vy - impulse * ny
+
+    def _collide_edge(self, x, y, idx, edge, s):
+        """Test balls (x, y) against one edge and resolve the ones still searching.
+
+        idx maps positions in x/y to ball indices, or is None when x/y are the
+        full ball arrays. x/y are updated in place for resolved balls.
+        """
+        b = self.balls
+        (ax, ay), (bx, by), (enx, eny) = edge
+        abx, aby = bx - ax, by - ay
+        ab_len_sq = abx * abx + aby * aby
+        if ab_len_sq == 0:
+            return
+        # Projection factor of each ball onto the edge, clamped to the segment
+        np.subtract(x, ax, out=s.dx)
+        np.subtract(y, ay, out=s.dy)
+        np.multiply(s.dx, abx, out=s.t)
+        np.multiply(s.dy, aby, out=s.tmp)
+        s.t += s.tmp
+        s.t /= ab_len_sq
+        np.clip(s.t, 0.0, 1.0, out=s.t)
+        # Closest point and offset from it
+        np.multiply(s.t, abx, out=s.cx)
+        s.cx += ax
+        np.multiply(s.t, aby, out=s.cy)
+        s.cy += ay
+        np.subtract(x, s.cx, out=s.dx)
+        np.subtract(y, s.cy, out=s.dy)
+        np.multiply(s.dx, s.dx, out=s.d2)
+        np.multiply(s.dy, s.dy, out=s.tmp)
+        s.d2 += s.tmp
+        np.less(s.d2, b.radius * b.radius, out=s.hit)
+        s.hit &= s.searching
+        local = np.flatnonzero(s.hit)
+        if local.size == 0:
+            return
+        s.searching[local] = False
+        s.collided[local] = True
+
+        ids = local if idx is None else idx[local]
+        cx, cy = s.cx[local], s.cy[local]
+        dx, dy = s.dx[local], s.dy[local]
+        dist = np.sqrt(s.d2[local])
+        # Collision normal; fall back to the edge's inward perpendicular when
+        # the ball center sits exactly on the edge.
+        on_edge = dist == 0
+        safe = np.where(on_edge, 1.0, dist)
+        nx = np.where(on_edge, enx, dx / safe)
+        ny = np.where(on_edge, eny, dy / safe)
+
+        # Push the ball out of the wall
+        penetration = b.radius - dist
+        px = x[local] + nx * penetration
+        py = y[local] + ny * penetration
+        x[local] = px
+        y[local] = py
+        if idx is not None:
+            b.x[ids] = px
+            b.y[ids] = py
+
+        # Wall velocity at the contact point: omega x (p - center)
+        wx = -self.angular_velocity * (cy - self.center[1])
+        wy = self.angular_velocity * (cx - self.center[0])
+        vx, vy = b.vx[ids], b.vy[ids]
+        rel_dot_n = (vx - wx) * nx + (vy - wy) * ny
+        # Only reflect balls moving into the wall
+        impulse = np.where(rel_dot_n < 0, (1 + self.restitution) * rel_dot_n, 0.0)
+        b.vx[ids] = vx - impulse * nx
+        b.vy[ids] = vy - impulse * ny
+
+    # ----------------------------
+    # Diagnostics
+    # ----------------------------
+
+    def energy(self):
+        """Total kinetic plus potential energy per unit mass (y grows downward)."""
+        b = self.balls
+        return float(0.5 * np.sum(b.vx * b.vx + b.vy * b.vy) - self.gravity * np.sum(b.y))
+
+
+def make_engine(balls=1, seed=None, ccd=False, radius=BALL_RADIUS, collide_balls=False, contacts=False):
+    """o3-mini's starting state for one ball, a random cloud otherwise."""
+    if balls == 1:
+        ball = Balls.single(HEX_CENTER[0] + 100, HEX_CENTER[1] - 50, 3 * FPS, -5 * FPS, radius)
+    else:
+        ball = Balls.random(balls, radius=radius, seed=seed)
+    return Engine(ball, ccd=ccd, ball_collisions=collide_balls, contacts=contacts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure vectorized engine throughput")
+    parser.add_argument("--balls", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--radius", type=float, default=BALL_RADIUS)
+    parser.add_argument("--collide-balls", action="store_true", help="ball-ball collisions")
+    parser.add_argument("--sides", type=int, default=NUM_SIDES)
+    parser.add_argument("--sectors", action="store_true", help="O(1) sector lookup instead of walking the edges")
+    parser.add_argument("--contacts", action="store_true", help="multi-contact wall solver")
+    parser.add_argument("--integrator", choices=list(integrators.INTEGRATORS), default=INTEGRATOR)
+    parser.add_argument("--drag", type=float, default=0.0, help="linear drag per second")
+    parser.add_argument("--backend", choices=BACKENDS, default="numpy", help="numba: compiled kernel if installed")
+    args = parser.parse_args(argv)
+
+    print("%10s %12s %16s" % ("balls", "ms/step", "ball-steps/s"))
+    for n in args.balls:
+        balls = Balls.random(n, spread=SPAWN_SPREAD, radius=args.radius, seed=args.seed)
+        engine = Engine(balls, sides=args.sides, ball_collisions=args.collide_balls, sectors=args.sectors,
+                        contacts=args.contacts, integrator=args.integrator, drag=args.drag,
+                        backend=args.backend)
+        engine.step()  # warm up buffers
+        start = time.perf_counter()
+        engine.run(args.steps)
+        elapsed = time.perf_counter() - start
+        print("%10d %12.3f %16.3e" % (n, elapsed / args.steps * 1e3, n * args.steps / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Event-driven engine that jumps from impact to impact.
+
+Between impacts a ball follows an exact parabola, and the polygon turns
+at a constant angular velocity, so nothing needs to happen at 60 Hz.
+EventEngine finds the time of the next ball/wall impact directly, moves
+the ball there in one jump, bounces it and carries on. Simulating an
+hour costs as many impacts as the ball makes in that hour, not 216000
+frames.
+
+As in hexsim.ccd, a ball of radius r is inside the polygon exactly when
+its center is on the inner side of every edge line moved inward by r.
+For edge i, with outward normal n_i(t) turning at omega, the distance
+past that line is
+
+    f_i(t) = (p(t) - c) . n_i(t) - (apothem - r)
+
+and an impact is the first t where f_i comes up through 0. f_i' is the
+normal speed of the ball relative to the wall, so an impact is also where
+the bounce has something to reflect. The root is found per edge:
+
+  - omega = 0: f_i is a quadratic in t, solved in closed form
+  - otherwise: Newton steps from below. |f_i''| is bounded by
+    g + 2 |omega| |v| + omega^2 |p - c| over the step, so the step that
+    makes the quadratic upper bound f + f' h + M h^2 / 2 reach 0 can't
+    jump past a root. Far from the wall the steps are as long as the
+    flight, near it they converge quadratically
+  - if that hasn't converged after MAX_ITERATIONS (a grazing approach,
+    where the steps shrink), plain conservative advancement on the
+    first-order bound |f_i'| <= |v| + |omega| |p - c| takes over
+
+Bounces are o3-mini's: reflect the velocity relative to the wall at the
+contact point, with restitution. A ball that reaches the wall slower than
+broadphase.RESTING_SPEED would bounce ever lower and ever faster (the
+Zeno problem), so it is in resting contact instead: it is stepped every
+RESTING_STEP, pushed back out of the wall and stopped along its normal,
+until a step ends with it clear of every wall and jumping resumes. A
+ball that comes to rest for good therefore costs what it would in the
+stepped engine, and balls are advanced one at a time in Python, so for
+large crowds over short runs the vectorized Engine stays faster.
+
+EventEngine has Engine's step(), run(), angle, time and energy(), so it
+can stand in where a scene only steps and reads the balls.
+
+Usage:
+    python -m hexsim.events --hours 1
+    python -m hexsim.events --balls 100 --hours 0.1 --stepped
+"""
+import argparse
+import math
+import time
+
+from hexsim.broadphase import RESTING_SPEED
+from hexsim.engine import (ANGULAR_VELOCITY, BALL_RADIUS, FPS, GRAVITY, HEX_CENTER, HEX_RADIUS, NUM_SIDES,
+                           RESTITUTION, Balls, Engine)
+from hexsim.geometry import RegularPolygon
+
+TOLERANCE = 1e-9        # px; an impact is found once the ball is this close to the wall
+MAX_ITERATIONS = 64     # Newton steps per edge before conservative advancement takes over
+CA_ITERATIONS = 10000   # conservative advancement steps before the ball is taken as touching
+MAX_JUMP = 0.5          # seconds; longest step the derivative bounds are worked out for
+RESTING_STEP = 1.0 / FPS  # seconds between steps of a ball in resting contact, as the stepped engine
+
+
+class EventEngine:
+    """Balls in a rotating regular polygon, advanced from impact to impact.
+
+    Balls don't collide with each other, so each is advanced on its own.
+    impacts counts the bounces so far, resting_steps the fixed steps taken
+    by balls in resting contact and fallbacks the impact searches that
+    needed conservative advancement.
+    """
+
+    def __init__(self, balls, center=HEX_CENTER, radius=HEX_RADIUS, sides=NUM_SIDES, angle=0.0,
+                 angular_velocity=ANGULAR_VELOCITY, gravity=GRAVITY, restitution=RESTITUTION):
+        self.balls = balls
+        self.polygon = RegularPolygon(center, radius, sides)
+        self.angle = float(angle)
+        self.angular_velocity = float(angular_velocity)
+        self.gravity = float(gravity)
+        self.restitution = float(restitution)
+        self.time = 0.0
+        self.impacts = 0
+        self.resting_steps = 0
+        self.fallbacks = 0
+        # Direction of each edge's outward normal at angle 0
+        self._normal_angles = [math.atan2(-uy, -ux) for ux, uy in self.polygon.unit_normals]
+
+    @property
+    def center(self):
+        return self.polygon.center
+
+    @property
+    def radius(self):
+        return self.polygon.radius
+
+    @property
+    def sides(self):
+        return self.polygon.sides
+
+    # ----------------------------
+    # Stepping
+    # ----------------------------
+
+    def step(self, dt=1.0 / FPS):
+        """Advance the simulation by dt seconds, however many impacts that takes."""
+        b = self.balls
+        for i in range(len(b)):
+            b.x[i], b.y[i], b.vx[i], b.vy[i] = self._advance_ball(
+                float(b.x[i]), float(b.y[i]), float(b.vx[i]), float(b.vy[i]), float(dt))
+        self.angle += self.angular_velocity * dt
+        self.time += dt
+
+    def run(self, steps, dt=1.0 / FPS):
+        for _ in range(steps):
+            self.step(dt)
+
+    def _advance_ball(self, x, y, vx, vy, duration):
+        """One ball's state after duration seconds from the engine's current time."""
+        g = self.gravity
+        w = self.angular_velocity
+        t = 0.0
+        resting = self._touching(x, y, self.angle)
+        while t < duration:
+            if resting:
+                h = min(RESTING_STEP, duration - t)
+                x, y, vx, vy, resting = self._contact_step(x, y, vx, vy, self.angle + w * t, h)
+                self.resting_steps += 1
+                t += h
+                continue
+            h, edge = self.next_impact(x, y, vx, vy, self.angle + w * t, duration - t)
+            # Exact free flight under constant gravity
+            x += vx * h
+            y += (vy + 0.5 * g * h) * h
+            vy += g * h
+            t += h
+            if edge < 0:
+                break
+            vx, vy, resting = self._bounce(x, y, vx, vy, self.angle + w * t, edge)
+            self.impacts += 1
+        return x, y, vx, vy
+
+    # ----------------------------
+    # Time of impact
+    # ----------------------------
+
+    def next_impact(self, x, y, vx, vy, angle, horizon):
+        """(seconds until the ball hits a wall, edge index), or (horizon, -1).
+
+        angle is the polygon's angle at the ball's current time.
+        """
+        cx, cy = self.polygon.center
+        dx, dy = x - cx, y - cy
+        limit = self.polygon.apothem - self.balls.radius
+        # Nearest walls first, so later edges search a shorter horizon
+        order = sorted(range(self.sides), key=lambda i: -(dx * math.cos(self._normal_angles[i] + angle)
+                                                         + dy * math.sin(self._normal_angles[i] + angle)))
+        best, edge = horizon, -1
+        for i in order:
+            a = self._normal_angles[i] + angle
+            if self.angular_velocity == 0:
+                t = self._quadratic_impact(dx, dy, vx, vy, a, limit, best)
+            else:
+                t = self._newton_impact(dx, dy, vx, vy, a, limit, best)
+            if t < best:
+                best, edge = t, i
+        return best, edge
+
+    def _quadratic_impact(self, dx, dy, vx, vy, a, limit, horizon):
+        """First upward zero of f(t) = c2 t^2 + c1 t + c0 before horizon, for a still wall."""
+        nx, ny = math.cos(a), math.sin(a)
+        c0 = dx * nx + dy * ny - limit
+        c1 = vx * nx + vy * ny
+        c2 = 0.5 * self.gravity * ny
+        if c0 > -TOLERANCE and c1 > 0:
+            return 0.0
+        if c2 == 0:
+            roots = [-c0 / c1] if c1 else []
+        else:
+            disc = c1 * c1 - 4 * c2 * c0
+            if disc < 0:
+                return math.inf
+            # The numerically stable pair of roots
+            q = -0.5 * (c1 + math.copysign(math.sqrt(disc), c1))
+            roots = sorted([q / c2, c0 / q] if q else [0.0])
+        for t in roots:
+            if 0 <= t < horizon and 2 * c2 * t + c1 > 0:
+                return t
+        return math.inf
+
+    def _newton_impact(self, dx, dy, vx, vy, a0, limit, horizon):
+        """First upward zero of f before horizon for a wall turning at omega, or inf."""
+        g = self.gravity
+        w = self.angular_velocity
+        t = 0.0
+        for _ in range(MAX_ITERATIONS):
+            f, fp, speed, reach = self._distance(dx, dy, vx, vy, a0, limit, t)
+            if f > -TOLERANCE and fp > 0:
+                return t
+            cap = min(MAX_JUMP, horizon - t)
+            if cap <= 0:
+                return math.inf
+            # Bound on |f''| over the next cap seconds
+            m = g + 2 * abs(w) * (speed + g * cap) + w * w * (reach + speed * cap + 0.5 * g * cap * cap)
+            fn = min(f, 0.0)
+            h = (-fp + math.sqrt(fp * fp - 2 * m * fn)) / m
+            if h == 0:
+                break
+            t += min(h, cap)
+        self.fallbacks += 1
+        return self._conservative_impact(dx, dy, vx, vy, a0, limit, horizon, t)
+
+    def _conservative_impact(self, dx, dy, vx, vy, a0, limit, horizon, t):
+        """Conservative advancement from t on |f'| <= |v| + |omega| |p - c|."""
+        g = self.gravity
+        w = abs(self.angular_velocity)
+        f = -math.inf
+        for _ in range(CA_ITERATIONS):
+            f, fp, speed, reach = self._distance(dx, dy, vx, vy, a0, limit, t)
+            if f > -TOLERANCE:
+                return t
+            cap = min(MAX_JUMP, horizon - t)
+            if cap <= 0:
+                return math.inf
+            bound = speed + g * cap + w * (reach + speed * cap + 0.5 * g * cap * cap)
+            t += min(-f / bound, cap)
+        # Still closing in on a tangent: call it a touch
+        return t if t < horizon else math.inf
+
+    def _distance(self, dx, dy, vx, vy, a0, limit, t):
+        """(f, f', |v|, |p - c|) at t for the edge whose normal points at a0 at t = 0."""
+        g = self.gravity
+        w = self.angular_velocity
+        px = dx + vx * t
+        py = dy + (vy + 0.5 * g * t) * t
+        uy = vy + g * t
+        a = a0 + w * t
+        c, s = math.cos(a), math.sin(a)
+        f = px * c + py * s - limit
+        # Ball velocity along the normal, less the wall's there
+        fp = vx * c + uy * s + w * (py * c - px * s)
+        return f, fp, math.hypot(vx, uy), math.hypot(px, py)
+
+    # ----------------------------
+    # Contact
+    # ----------------------------
+
+    def _wall_normal(self, x, y, vx, vy, angle, edge):
+        """(outward normal, speed into the wall relative to it) for a ball touching edge."""
+        cx, cy = self.polygon.center
+        a = self._normal_angles[edge] + angle
+        nx, ny = math.cos(a), math.sin(a)
+        # Wall velocity omega x (p - center) at the contact point
+        px = x + nx * self.balls.radius
+        py = y + ny * self.balls.radius
+        w = self.angular_velocity
+        wx, wy = -w * (py - cy), w * (px - cx)
+        return nx, ny, (vx - wx) * nx + (vy - wy) * ny
+
+    def _bounce(self, x, y, vx, vy, angle, edge):
+        """Reflect off edge; returns (vx, vy, whether the ball is now resting)."""
+        nx, ny, vn = self._wall_normal(x, y, vx, vy, angle, edge)
+        if vn > RESTING_SPEED:
+            j = (1 + self.restitution) * vn
+            return vx - j * nx, vy - j * ny, False
+        j = max(vn, 0.0)
+        return vx - j * nx, vy - j * ny, True
+
+    def _touching(self, x, y, angle):
+        cx, cy = self.polygon.center
+        limit = self.polygon.apothem - self.balls.radius
+        return any((x - cx) * math.cos(a + angle) + (y - cy) * math.sin(a + angle) > limit
+                   for a in self._normal_angles)
+
+    def _contact_step(self, x, y, vx, vy, angle, h):
+        """One fixed step of a resting ball; returns its state and whether it still touches."""
+        cx, cy = self.polygon.center
+        limit = self.polygon.apothem - self.balls.radius
+        g = self.gravity
+        x += vx * h
+        y += (vy + 0.5 * g * h) * h
+        vy += g * h
+        angle += self.angular_velocity * h
+        touching = False
+        for edge, a in enumerate(self._normal_angles):
+            nx, ny = math.cos(a + angle), math.sin(a + angle)
+            depth = (x - cx) * nx + (y - cy) * ny - limit
+            if depth <= 0:
+                continue
+            touching = True
+            x -= depth * nx
+            y -= depth * ny
+            nx, ny, vn = self._wall_normal(x, y, vx, vy, angle, edge)
+            if vn > 0:
+                j = (1 + self.restitution) * vn if vn > RESTING_SPEED else vn
+                vx -= j * nx
+                vy -= j * ny
+        return x, y, vx, vy, touching
+
+    # ----------------------------
+    # Diagnostics
+    # ----------------------------
+
+    def energy(self):
+        """Total kinetic plus potential energy per unit mass (y grows downward)."""
+        b = self.balls
+        return float(0.5 * (b.vx * b.vx + b.vy * b.vy).sum() - self.gravity * b.y.sum())
+
+    def escaped(self):
+        """Number of balls whose center is outside the polygon shrunk by their radius."""
+        b = self.balls
+        cx, cy = self.polygon.center
+        limit = self.polygon.apothem - b.radius + 1e-6
+        out = 0
+        for x, y in zip(b.x.tolist(), b.y.tolist()):
+            out += any((x - cx) * math.cos(a + self.angle) + (y - cy) * math.sin(a + self.angle) > limit
+                       for a in self._normal_angles)
+        return out
+
+
+def _balls(n, seed, radius):
+    if n == 1:
+        # o3-mini's starting state
+        return Balls.single(HEX_CENTER[0] + 100, HEX_CENTER[1] - 50, 3 * FPS, -5 * FPS, radius)
+    return Balls.random(n, radius=radius, seed=seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Long-horizon runs that jump from impact to impact")
+    parser.add_argument("--balls", type=int, default=1)
+    parser.add_argument("--hours", type=float, default=1.0, help="simulated hours")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--radius", type=float, default=BALL_RADIUS)
+    parser.add_argument("--spin", type=float, default=ANGULAR_VELOCITY, help="polygon angular velocity in rad/s")
+    parser.add_argument("--restitution", type=float, default=RESTITUTION)
+    parser.add_argument("--report", type=float, default=600.0, help="simulated seconds between progress lines")
+    parser.add_argument("--stepped", action="store_true",
+                        help="also run the stepped engine with ccd at %d FPS for comparison" % FPS)
+    args = parser.parse_args(argv)
+
+    seconds = args.hours * 3600
+    options = {"angular_velocity": args.spin, "restitution": args.restitution}
+    engine = EventEngine(_balls(args.balls, args.seed, args.radius), **options)
+    start = time.perf_counter()
+    done = 0.0
+    while done < seconds:
+        chunk = min(args.report, seconds - done)
+        engine.step(chunk)
+        done += chunk
+        print("t = %8.0f s  impacts %9d  resting steps %8d  escaped %d  energy %14.1f"
+              % (engine.time, engine.impacts, engine.resting_steps, engine.escaped(), engine.energy()))
+    wall = time.perf_counter() - start
+    frames = int(round(seconds * FPS))
+    work = engine.impacts + engine.resting_steps
+    print("events:  %.0f simulated s in %.2f s (%.0fx real time); %d impacts and %d resting steps "
+          "instead of %d ball-frames; %d conservative-advancement fallbacks"
+          % (seconds, wall, seconds / wall, engine.impacts, engine.resting_steps, frames * args.balls,
+             engine.fallbacks))
+    if work:
+        print("         %.1f ball-frames skipped for each impact or resting step" % (frames * args.balls / work))
+    if args.stepped:
+        stepped = Engine(_balls(args.balls, args.seed, args.radius), ccd=True, **options)
+        start = time.perf_counter()
+        stepped.run(frames, 1.0 / FPS)
+        wall = time.perf_counter() - start
+        b = stepped.balls
+        normals = stepped.polygon.update_arrays(stepped.angle)[1]
+        inside = ((b.x[:, None] - stepped.center[0]) * normals[:, 0] + (b.y[:, None] - stepped.center[1])
+                  * normals[:, 1] + (stepped.polygon.apothem - b.radius))
+        print("stepped: %.0f simulated s in %.2f s (%.0fx real time); %d frames; escaped %d"
+              % (seconds, wall, seconds / wall, frames, int((inside.min(axis=1) < -1e-6).sum())))
+
+
+if __name__ == "__main__":
+    main()
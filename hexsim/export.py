@@ -0,0 +1,402 @@
+"""
+Headless GIF / PNG-sequence export.
+
+Frames are rendered off-screen (the model scripts under the SDL dummy
+driver via hexsim.bench, the engine onto a plain pygame Surface, or with
+--renderer numpy into hexsim.render's framebuffer, which doesn't import
+pygame at all) and streamed to an encoder as they are produced:
+
+  1. the main process compares each frame with the previous one and crops
+     it to the bounding box of the pixels that changed
+  2. the crop, plus a mask of the pixels inside it that didn't change, is
+     handed to a worker process, which quantizes it to a palette, makes the
+     unchanged pixels transparent and LZW-encodes it (or, for PNG, deflates
+     the whole frame)
+  3. encoded frames are written in order as they come back
+
+At most a few frames per worker are in flight at once, so memory use does
+not grow with the length of the clip. GIF and PNG encoding are implemented
+here with the standard library and NumPy; no imaging package is needed.
+
+Usage:
+    python -m hexsim.export --all --frames 600 --output-dir GIFs
+    python -m hexsim.export "ChatGPT o3-mini.py" --png frames/
+    python -m hexsim.export --engine --balls 200 --output engine.gif
+    python -m hexsim.export --engine --renderer numpy --scale 0.5 --output engine.gif
+"""
+import argparse
+import collections
+import os
+import struct
+import sys
+import time
+import zlib
+from multiprocessing import Pool
+
+import numpy as np
+
+from hexsim.scripts import model_name, model_scripts
+
+GIF_FPS = 30            # frames per second written to GIFs; the scripts run at 60
+PENDING_PER_WORKER = 4  # encoded frames in flight per worker before the producer waits
+MAX_CODE = 4096         # GIF LZW codes are at most 12 bits
+
+# Model name -> name of its GIF in GIFs/, where the two differ
+GIF_NAMES = {
+    "DeepSeek R1 32B": "DeepSeek R1 32b",
+    "DeepSeek R1 70B": "DeepSeek R1 70b",
+}
+
+
+# ----------------------------
+# GIF encoding (runs in workers)
+# ----------------------------
+
+def quantize(pixels):
+    """Palette-index an (h, w, 3) uint8 array.
+
+    Renders with at most 255 distinct colors (almost every frame here) keep
+    them exactly; anything more is mapped onto a uniform 6x7x6 color cube.
+    One palette entry is always left free for transparency. Returns
+    (indices, palette) with palette an (n, 3) uint8 array.
+    """
+    rgb = pixels.astype(np.uint32)
+    packed = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) <= 255:
+        palette = np.stack(((colors >> 16) & 255, (colors >> 8) & 255, colors & 255), axis=1)
+        return indices.reshape(packed.shape).astype(np.uint8), palette.astype(np.uint8)
+    levels = np.array([6, 7, 6])
+    q = (pixels.astype(np.uint16) * levels // 256).astype(np.uint8)
+    indices = q[..., 0] * 42 + q[..., 1] * 6 + q[..., 2]
+    cube = np.stack(np.meshgrid(np.arange(6), np.arange(7), np.arange(6), indexing="ij"), axis=-1)
+    palette = ((cube.reshape(-1, 3) * 2 + 1) * 255 // (2 * (levels - 1) + 2)).astype(np.uint8)
+    return indices, palette
+
+
+def lzw_encode(indices, min_code_size):
+    """GIF-flavoured LZW of a flat sequence of palette indices."""
+    clear = 1 << min_code_size
+    end = clear + 1
+    out = bytearray()
+    acc = 0
+    nbits = 0
+    code_size = min_code_size + 1
+
+    def emit(code):
+        nonlocal acc, nbits
+        acc |= code << nbits
+        nbits += code_size
+        while nbits >= 8:
+            out.append(acc & 255)
+            acc >>= 8
+            nbits -= 8
+
+    data = bytes(indices)
+    emit(clear)
+    table = {}
+    next_code = end + 1
+    prefix = data[0]
+    for k in data[1:]:
+        key = (prefix << 8) | k
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        emit(prefix)
+        if next_code == MAX_CODE:
+            emit(clear)
+            table.clear()
+            next_code = end + 1
+            code_size = min_code_size + 1
+        else:
+            table[key] = next_code
+            if next_code == 1 << code_size and code_size < 12:
+                code_size += 1
+            next_code += 1
+        prefix = k
+    emit(prefix)
+    # The decoder adds one more entry on reading that last code
+    if next_code == 1 << code_size and code_size < 12:
+        code_size += 1
+    emit(end)
+    if nbits:
+        out.append(acc & 255)
+    return bytes(out)
+
+
+def _sub_blocks(data):
+    """Split data into GIF sub-blocks, terminated by an empty one."""
+    out = bytearray()
+    for i in range(0, len(data), 255):
+        chunk = data[i:i + 255]
+        out.append(len(chunk))
+        out += chunk
+    out.append(0)
+    return bytes(out)
+
+
+def encode_gif_frame(pixels, unchanged, x, y, delay):
+    """One GIF frame: graphic control extension, image descriptor with a
+    local color table, and the LZW image data.
+
+    pixels is the changed region at (x, y); unchanged (or None) marks the
+    pixels inside it that match the previous frame, which become
+    transparent so the frame below shows through.
+    """
+    indices, palette = quantize(pixels)
+    transparent = len(palette)
+    if unchanged is not None:
+        indices[unchanged] = transparent
+    bits = max(2, int(transparent).bit_length())  # room for the transparent entry
+    table = np.zeros((1 << bits, 3), dtype=np.uint8)
+    table[:len(palette)] = palette
+    h, w = indices.shape
+
+    flags = 1 if unchanged is not None else 0  # transparency flag
+    flags |= 1 << 2                            # disposal: leave the frame in place
+    out = bytearray(b"\x21\xf9\x04")
+    out += struct.pack("<BHBB", flags, delay, transparent if unchanged is not None else 0, 0)
+    out += b"\x2c" + struct.pack("<HHHHB", x, y, w, h, 0x80 | (bits - 1))
+    out += table.tobytes()
+    out.append(bits)
+    out += _sub_blocks(lzw_encode(indices.ravel(), bits))
+    return bytes(out)
+
+
+# ----------------------------
+# PNG encoding (runs in workers)
+# ----------------------------
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(pixels, path):
+    """Write an (h, w, 3) uint8 array as an RGB PNG file."""
+    h, w, _ = pixels.shape
+    rows = np.empty((h, 1 + 3 * w), dtype=np.uint8)
+    rows[:, 0] = 0  # filter type None on every row
+    rows[:, 1:] = pixels.reshape(h, 3 * w)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0)))
+        f.write(_png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        f.write(_png_chunk(b"IEND", b""))
+    return path
+
+
+# ----------------------------
+# Streaming writers (main process)
+# ----------------------------
+
+class _Pipeline:
+    """Submits encode jobs to a pool, keeping a bounded number in flight
+    and handing results back in submission order."""
+
+    def __init__(self, pool, workers, write):
+        self.pool = pool
+        self.limit = max(1, workers) * PENDING_PER_WORKER
+        self.write = write
+        self.pending = collections.deque()
+
+    def submit(self, func, *args):
+        self.pending.append(self.pool.apply_async(func, args))
+        while len(self.pending) > self.limit:
+            self.write(self.pending.popleft().get())
+
+    def drain(self):
+        while self.pending:
+            self.write(self.pending.popleft().get())
+
+
+class GifWriter:
+    """Streams frames into an animated GIF. Frames are (h, w, 3) uint8 arrays."""
+
+    def __init__(self, path, pool, workers, fps=GIF_FPS):
+        self.path = path
+        self.fps = fps
+        self.frames = 0
+        self.previous = None
+        self._file = None
+        self._pipeline = _Pipeline(pool, workers, self._write)
+
+    def add(self, frame):
+        if self._file is None:
+            self._start(frame.shape[1], frame.shape[0])
+        # Frame delays are whole centiseconds; rounding the running time
+        # keeps e.g. 30 FPS at 3, 3, 4, 3, 3, 4, ...
+        delay = round((self.frames + 1) * 100 / self.fps) - round(self.frames * 100 / self.fps)
+        if self.previous is None:
+            args = (frame, None, 0, 0, delay)
+        else:
+            changed = np.any(frame != self.previous, axis=2)
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0))
+            if rows.size == 0:
+                # Nothing moved: a single transparent pixel carries the delay
+                rows = cols = np.zeros(1, dtype=np.intp)
+                changed[0, 0] = False
+            y0, y1 = rows[0], rows[-1] + 1
+            x0, x1 = cols[0], cols[-1] + 1
+            args = (frame[y0:y1, x0:x1], ~changed[y0:y1, x0:x1], int(x0), int(y0), delay)
+        self._pipeline.submit(encode_gif_frame, *args)
+        self.previous = frame
+        self.frames += 1
+
+    def close(self):
+        self._pipeline.drain()
+        if self._file is not None:
+            self._file.write(b"\x3b")
+            self._file.close()
+            self._file = None
+
+    def _start(self, width, height):
+        self._file = open(self.path, "wb")
+        # No global color table: every frame carries its own palette
+        self._file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0, 0, 0))
+        # Netscape extension: loop forever
+        self._file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def _write(self, data):
+        self._file.write(data)
+
+
+class PngWriter:
+    """Streams frames into a numbered PNG sequence in a directory."""
+
+    def __init__(self, directory, pool, workers):
+        self.directory = directory
+        self.frames = 0
+        os.makedirs(directory, exist_ok=True)
+        self._pipeline = _Pipeline(pool, workers, lambda path: None)
+
+    def add(self, frame):
+        path = os.path.join(self.directory, "frame_%05d.png" % self.frames)
+        self._pipeline.submit(encode_png, frame, path)
+        self.frames += 1
+
+    def close(self):
+        self._pipeline.drain()
+
+
+# ----------------------------
+# Frame sources
+# ----------------------------
+
+def surface_pixels(surface, scale=1.0):
+    """An (h, w, 3) uint8 copy of a pygame surface, optionally scaled."""
+    import pygame
+
+    if scale != 1.0:
+        size = (max(1, round(surface.get_width() * scale)), max(1, round(surface.get_height() * scale)))
+        surface = pygame.transform.smoothscale(surface, size)
+    return np.ascontiguousarray(pygame.surfarray.array3d(surface).transpose(1, 0, 2))
+
+
+def export_script(path, writer, frames, every=2, seed=0, scale=1.0):
+    """Run a model script headless and feed every every-th frame to writer."""
+    from hexsim.bench import run_script
+
+    def on_frame(surface, index):
+        if surface is not None and index % every == 0:
+            writer.add(surface_pixels(surface, scale))
+
+    try:
+        result = run_script(path, frames=frames, warmup=0, seed=seed, on_frame=on_frame)
+    finally:
+        writer.close()
+    return result
+
+
+def export_engine(writer, frames, balls=1, seed=None, every=2, scale=1.0, renderer="pygame", **engine_args):
+    """Render the vectorized engine off-screen into writer.
+
+    renderer is "pygame" or "numpy" (see hexsim.render); numpy draws at
+    the scaled size directly and never imports pygame.
+    """
+    from hexsim.engine import FPS, HEIGHT, WIDTH, make_engine
+    from hexsim.render import draw_scene, make_renderer
+
+    if renderer == "numpy":
+        target = make_renderer(renderer, WIDTH, HEIGHT, scale=scale)
+        scale = 1.0
+    elif renderer == "pygame":
+        target = make_renderer(renderer, WIDTH, HEIGHT)
+    else:
+        raise ValueError("can't export frames from the %r renderer" % (renderer,))
+    engine = make_engine(balls, seed, **engine_args)
+    b = engine.balls
+    try:
+        for i in range(frames):
+            engine.step(1.0 / FPS)
+            if i % every == 0:
+                draw_scene(target, engine.polygon.update(engine.angle), b.x, b.y, b.radius)
+                if scale != 1.0:
+                    writer.add(surface_pixels(target.surface, scale))
+                else:
+                    writer.add(target.pixels())
+    finally:
+        writer.close()
+
+
+def gif_path(directory, script):
+    name = model_name(script)
+    return os.path.join(directory, GIF_NAMES.get(name, name) + ".gif")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render headless runs to GIFs or PNG sequences")
+    parser.add_argument("scripts", nargs="*", help="model scripts to export")
+    parser.add_argument("--all", action="store_true", help="export every model script")
+    parser.add_argument("--engine", action="store_true", help="export the vectorized engine instead")
+    parser.add_argument("--balls", type=int, default=1, help="balls (--engine)")
+    parser.add_argument("--renderer", choices=["pygame", "numpy"], default="pygame",
+                        help="how engine frames are drawn (--engine)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=600, help="frames to simulate, at 60 FPS")
+    parser.add_argument("--every", type=int, default=2, help="keep every n-th frame")
+    parser.add_argument("--scale", type=float, default=1.0, help="resize frames by this factor")
+    parser.add_argument("--output-dir", default="GIFs", help="where model GIFs are written")
+    parser.add_argument("--output", default="engine.gif", help="GIF path (--engine)")
+    parser.add_argument("--png", metavar="DIR", help="write a PNG sequence to DIR instead of a GIF")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    fps = 60.0 / args.every
+    scripts = model_scripts() if args.all else args.scripts
+    if not scripts and not args.engine:
+        parser.error("give scripts, --all or --engine")
+
+    def writer_for(gif, subdir=None):
+        if args.png:
+            directory = os.path.join(args.png, subdir) if subdir else args.png
+            return PngWriter(directory, pool, args.workers)
+        return GifWriter(gif, pool, args.workers, fps)
+
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        if args.engine:
+            writer = writer_for(args.output)
+            export_engine(writer, args.frames, args.balls, args.seed, args.every, args.scale, args.renderer)
+            print("engine: %d frames -> %s" % (writer.frames, args.png or args.output))
+        else:
+            os.makedirs(args.output_dir, exist_ok=True)
+            for script in scripts:
+                t = time.perf_counter()
+                subdir = model_name(script) if len(scripts) > 1 else None
+                writer = writer_for(gif_path(args.output_dir, script), subdir)
+                result = export_script(script, writer, args.frames, args.every, args.seed, args.scale)
+                target = writer.directory if args.png else writer.path
+                if not writer.frames:
+                    target = "nothing written"
+                status = result["status"] if result["status"] != "ok" else "%d frames" % writer.frames
+                print("%-30s %-14s %6.1f s -> %s" % (model_name(script)[:30], status,
+                                                     time.perf_counter() - t, target))
+                sys.stdout.flush()
+    print("Finished in %.1f s" % (time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,652 @@
+"""
+Turn a model script's `while running:` loop into steppable functions.
+
+The scripts keep their state in module globals (or in main()'s locals)
+and run their physics inline in a frame loop that also draws, polls
+events and sleeps in clock.tick. extract() parses a script and writes a
+new module with the same physics code, rearranged:
+
+  init(seed=None)  runs the setup code (everything before the loop) and
+                   returns a State holding every variable the loop changes
+  step(state)      one iteration of the loop body, with those variables
+                   read and written as state.<name>
+  running(state)   the loop condition
+
+Nothing is re-implemented, so quirks are kept (unlike the hand ports in
+hexsim.models, which this complements). What is taken out:
+
+  - statements that call pygame's display, draw, event, font, key, mouse,
+    time, transform, ... functions, sys.exit, or .draw()/.render()
+    methods, and statements that use names those calls produced (screen,
+    font, keys, ...), transitively; loops and ifs whose header uses them
+    go as a whole, so the event loop and the hotkeys are dropped
+  - clock.tick(fps) as a statement; where its value is used it becomes
+    the nominal frame time, as in hexsim.bench's uncapped clock
+
+Which variables go into State is decided per name: anything the setup
+assigns that the loop or a helper function writes or mutates (or that
+comes from random), and anything the loop assigns that can be read
+before it is assigned again, since in the script it carries over from
+the previous frame. Loop variables that are always assigned before use
+stay plain locals of step(). Helper functions that read or write state
+globals are pointed at the State being stepped, and `break`/`continue` in
+the loop body end the step (break also stops running()). Script names
+that clash with the generated ones (a `running` flag, say) get a
+trailing underscore, and setup that a default argument needs also runs
+at import.
+
+Usage:
+    python -m hexsim.extract "ChatGPT o3-mini.py"              # print the module
+    python -m hexsim.extract --all --output-dir extracted/
+    python -m hexsim.extract --all --run 10000                 # steps/s of each script
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+import types
+
+from hexsim.scripts import model_name, model_scripts
+
+# pygame.<attr> calls that draw, poll input or wait
+RENDER_ATTRS = {"display", "draw", "event", "font", "freetype", "gfxdraw", "image", "init", "key", "mixer",
+                "mouse", "quit", "time", "transform", "Surface"}
+DRAW_METHODS = {"draw", "render"}
+EXIT_CALLS = {"sys.exit", "exit", "quit"}
+TICK_METHODS = {"tick", "tick_busy_loop"}
+# Names the generated module defines; script names that clash get a trailing _
+RESERVED = {"State", "init", "step", "running", "state", "_state", "_frame_ms", "_random"}
+
+HEADER = '''"""Generated by hexsim.extract from %r; edit the script, not this."""
+import random as _random
+
+
+def _frame_ms(framerate=0):
+    # What hexsim.bench's uncapped clock returns from tick()
+    return int(1000 / framerate) if framerate else 0
+'''
+
+
+class ExtractError(ValueError):
+    """The script has no frame loop this extractor can lift."""
+
+
+def _dotted(node):
+    """"pygame.draw.circle" for an attribute chain on a name, else None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _root(node):
+    """Name at the bottom of x.a[i].b, or None."""
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Starred)):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _stored(targets):
+    """Names bound by assignment targets (not subscripts/attributes)."""
+    out = set()
+    for t in targets:
+        for n in ast.walk(t):
+            if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store):
+                out.add(n.id)
+    return out
+
+
+def _walk_scope(node):
+    """ast.walk that doesn't enter nested functions, classes or lambdas."""
+    todo = [node]
+    while todo:
+        n = todo.pop()
+        yield n
+        for child in ast.iter_child_nodes(n):
+            if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+                todo.append(child)
+
+
+def _comprehension_targets(node):
+    out = set()
+    for n in _walk_scope(node):
+        if isinstance(n, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+            for gen in n.generators:
+                out |= _stored([gen.target])
+    return out
+
+
+def _writes(nodes):
+    """Names rebound, mutated through an attribute/subscript or method call."""
+    out = set()
+    for node in nodes:
+        local = _comprehension_targets(node)
+        for n in _walk_scope(node):
+            if isinstance(n, ast.Name) and isinstance(n.ctx, (ast.Store, ast.Del)):
+                out.add(n.id)
+            elif isinstance(n, (ast.Attribute, ast.Subscript)) and isinstance(n.ctx, (ast.Store, ast.Del)):
+                out.add(_root(n))
+            elif isinstance(n, ast.Call) and isinstance(n.func, ast.Attribute):
+                out.add(_root(n.func.value))
+        out -= local
+    out.discard(None)
+    return out
+
+
+def _loads(node):
+    local = _comprehension_targets(node)
+    return {n.id for n in _walk_scope(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)} - local
+
+
+# ----------------------------
+# Dropping rendering code
+# ----------------------------
+
+class _TickCalls(ast.NodeTransformer):
+    """clock.tick(fps) -> _frame_ms(fps)."""
+
+    def __init__(self, clocks):
+        self.clocks = clocks
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        f = node.func
+        if (isinstance(f, ast.Attribute) and f.attr in TICK_METHODS and isinstance(f.value, ast.Name)
+                and f.value.id in self.clocks):
+            return ast.Call(ast.Name("_frame_ms", ast.Load()), node.args, node.keywords)
+        return node
+
+
+def _touches(node, dropped):
+    """Whether an expression draws, polls, exits or uses a dropped name."""
+    for n in ast.walk(node):
+        if isinstance(n, ast.Name) and n.id in dropped:
+            return True
+        if isinstance(n, ast.Call):
+            if isinstance(n.func, ast.Name) and n.func.id == "_frame_ms":
+                continue
+            chain = _dotted(n.func)
+            if chain is None:
+                continue
+            parts = chain.split(".")
+            if parts[0] == "pygame" and len(parts) > 1 and parts[1] in RENDER_ATTRS:
+                return True
+            if chain in EXIT_CALLS or (len(parts) > 1 and parts[-1] in DRAW_METHODS):
+                return True
+    return False
+
+
+def _strip(body, dropped):
+    """Body without rendering statements; names assigned from them join dropped."""
+    out = []
+    for stmt in body:
+        if isinstance(stmt, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef, ast.Global,
+                             ast.Nonlocal, ast.Pass, ast.Break, ast.Continue)):
+            out.append(stmt)
+            continue
+        if isinstance(stmt, ast.Expr):
+            if isinstance(stmt.value, ast.Call) and isinstance(stmt.value.func, ast.Name) \
+                    and stmt.value.func.id == "_frame_ms":
+                continue
+            if isinstance(stmt.value, ast.Constant) or not _touches(stmt, dropped):
+                out.append(stmt)
+            continue
+        if isinstance(stmt, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+            if stmt.value is not None and _touches(stmt.value, dropped):
+                targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+                dropped |= _stored(targets)
+                continue
+            if not _touches(stmt, dropped):
+                out.append(stmt)
+            continue
+        header = {ast.For: "iter", ast.AsyncFor: "iter", ast.While: "test", ast.If: "test"}.get(type(stmt))
+        if header:
+            if _touches(getattr(stmt, header), dropped):
+                continue
+            stmt.body = _strip(stmt.body, dropped) or [ast.Pass()]
+            stmt.orelse = _strip(stmt.orelse, dropped)
+            out.append(stmt)
+        elif isinstance(stmt, (ast.With, ast.AsyncWith)):
+            if any(_touches(item, dropped) for item in stmt.items):
+                continue
+            stmt.body = _strip(stmt.body, dropped) or [ast.Pass()]
+            out.append(stmt)
+        elif isinstance(stmt, ast.Try):
+            stmt.body = _strip(stmt.body, dropped) or [ast.Pass()]
+            for handler in stmt.handlers:
+                handler.body = _strip(handler.body, dropped) or [ast.Pass()]
+            stmt.orelse = _strip(stmt.orelse, dropped)
+            stmt.finalbody = _strip(stmt.finalbody, dropped)
+            out.append(stmt)
+        elif not _touches(stmt, dropped):
+            out.append(stmt)
+    return out
+
+
+# ----------------------------
+# Finding setup, loop and helpers
+# ----------------------------
+
+def _frame_loop(body):
+    """Index of the last top-level while loop in body, or None."""
+    found = None
+    for i, stmt in enumerate(body):
+        if isinstance(stmt, ast.While):
+            found = i
+    return found
+
+
+def _split(tree):
+    """(definitions, setup statements, loop) of a script."""
+    definitions, setup = [], []
+    main = None
+    for stmt in tree.body:
+        if isinstance(stmt, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef)):
+            definitions.append(stmt)
+        elif (isinstance(stmt, ast.If) and "__name__" in _loads(stmt.test)):
+            # if __name__ == "__main__": main()
+            for inner in stmt.body:
+                if isinstance(inner, ast.Expr) and isinstance(inner.value, ast.Call) \
+                        and isinstance(inner.value.func, ast.Name):
+                    main = inner.value.func.id
+        else:
+            setup.append(stmt)
+    i = _frame_loop(setup)
+    if i is not None:
+        return definitions, setup[:i], setup[i]
+    # The loop lives in main()
+    for d in definitions:
+        if isinstance(d, ast.FunctionDef) and d.name in (main, "main"):
+            j = _frame_loop(d.body)
+            if j is not None:
+                definitions.remove(d)
+                return definitions, setup + d.body[:j], d.body[j]
+    raise ExtractError("no top-level `while` frame loop, in the module or in main()")
+
+
+def _helpers(definitions):
+    """Every function and method defined at module level."""
+    out = []
+    for d in definitions:
+        if isinstance(d, ast.FunctionDef):
+            out.append(d)
+        elif isinstance(d, ast.ClassDef):
+            out.extend(n for n in d.body if isinstance(n, ast.FunctionDef))
+    return out
+
+
+def _definition_time_loads(definitions):
+    """Names read when the definitions run: defaults, decorators, class bodies."""
+    out = set()
+    for d in definitions:
+        if isinstance(d, ast.FunctionDef):
+            for node in d.decorator_list + d.args.defaults + [k for k in d.args.kw_defaults if k is not None]:
+                out |= _loads(node)
+        elif isinstance(d, ast.ClassDef):
+            for node in d.decorator_list + d.bases + [k.value for k in d.keywords]:
+                out |= _loads(node)
+            out |= _definition_time_loads([n for n in d.body if isinstance(n, ast.FunctionDef)])
+            for n in d.body:
+                if not isinstance(n, ast.FunctionDef):
+                    out |= _loads(n)
+    return out
+
+
+def _prelude(statements, needed):
+    """The statements, in order, that assign needed names or what those read."""
+    needed = set(needed)
+    out = []
+    for stmt in reversed(statements):
+        stores = {n.id for n in _walk_scope(stmt) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+        if stores & needed:
+            out.append(stmt)
+            needed |= _loads(stmt)
+    return out[::-1]
+
+
+def _function_globals(func):
+    """(free names read or written, names declared global) of a function."""
+    declared = set()
+    for n in _walk_scope(func):
+        if isinstance(n, ast.Global):
+            declared.update(n.names)
+    args = func.args
+    params = {a.arg for a in args.posonlyargs + args.args + args.kwonlyargs}
+    params |= {a.arg for a in (args.vararg, args.kwarg) if a is not None}
+    stores = set()
+    for stmt in func.body:
+        stores |= {n.id for n in _walk_scope(stmt) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+        stores |= _comprehension_targets(stmt)
+    local = (params | stores) - declared
+    free = {n.id for stmt in func.body for n in _walk_scope(stmt) if isinstance(n, ast.Name)} - local
+    return free, declared
+
+
+def _carried(body, definite, assigned, out):
+    """Add to out the names of assigned that body can read before assigning.
+
+    definite is the set assigned on every path so far; it is updated for
+    the statements that always run, and for names both branches of an
+    if/else assign, but not for loop bodies, which may not run.
+    """
+    for stmt in body:
+        if isinstance(stmt, (ast.For, ast.AsyncFor, ast.While, ast.If, ast.With, ast.AsyncWith, ast.Try)):
+            headers = [getattr(stmt, f) for f in ("iter", "test") if hasattr(stmt, f)]
+            headers += [item.context_expr for item in getattr(stmt, "items", [])]
+            for h in headers:
+                out |= (_loads(h) & assigned) - definite
+            if isinstance(stmt, (ast.With, ast.AsyncWith)):
+                # The body always runs
+                definite |= _stored([i.optional_vars for i in stmt.items if i.optional_vars is not None])
+                _carried(stmt.body, definite, assigned, out)
+                continue
+            if isinstance(stmt, ast.If) and stmt.orelse:
+                taken, other = set(definite), set(definite)
+                _carried(stmt.body, taken, assigned, out)
+                _carried(stmt.orelse, other, assigned, out)
+                definite |= taken & other
+                continue
+            inner = set(definite)
+            if isinstance(stmt, (ast.For, ast.AsyncFor)):
+                inner |= _stored([stmt.target])
+            blocks = [stmt.body, getattr(stmt, "orelse", [])]
+            if isinstance(stmt, ast.Try):
+                blocks += [h.body for h in stmt.handlers] + [stmt.finalbody]
+            for block in blocks:
+                _carried(block, set(inner), assigned, out)
+            continue
+        if isinstance(stmt, ast.AugAssign):
+            out |= (_loads(stmt) | _stored([stmt.target])) & assigned - definite
+            continue
+        out |= (_loads(stmt) & assigned) - definite
+        if isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+            definite |= _stored(stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target])
+
+
+# ----------------------------
+# Rewriting
+# ----------------------------
+
+class _ToState(ast.NodeTransformer):
+    """name -> <holder>.name for names in fields, outside comprehension scopes."""
+
+    def __init__(self, holder, fields):
+        self.holder = holder
+        self.fields = fields
+
+    def visit_Name(self, node):
+        if node.id in self.fields:
+            return ast.copy_location(ast.Attribute(ast.Name(self.holder, ast.Load()), node.id, node.ctx), node)
+        return node
+
+    def _comprehension(self, node):
+        saved = self.fields
+        self.fields = saved - _comprehension_targets(node)
+        self.generic_visit(node)
+        self.fields = saved
+        return node
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _comprehension
+
+    def visit_FunctionDef(self, node):
+        return node
+
+    visit_Lambda = visit_ClassDef = visit_FunctionDef
+
+
+def _all_names(tree):
+    out = set()
+    for n in ast.walk(tree):
+        if isinstance(n, ast.Name):
+            out.add(n.id)
+        elif isinstance(n, (ast.FunctionDef, ast.ClassDef)):
+            out.add(n.name)
+        elif isinstance(n, ast.arg):
+            out.add(n.arg)
+        elif isinstance(n, (ast.Global, ast.Nonlocal)):
+            out.update(n.names)
+    return out
+
+
+class _Rename(ast.NodeTransformer):
+    """Rename script names that would clash with the generated ones."""
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+
+    def visit_Name(self, node):
+        node.id = self.mapping.get(node.id, node.id)
+        return node
+
+    def visit_arg(self, node):
+        node.arg = self.mapping.get(node.arg, node.arg)
+        return node
+
+    def visit_FunctionDef(self, node):
+        node.name = self.mapping.get(node.name, node.name)
+        self.generic_visit(node)
+        return node
+
+    visit_ClassDef = visit_FunctionDef
+
+    def visit_Global(self, node):
+        node.names = [self.mapping.get(n, n) for n in node.names]
+        return node
+
+    visit_Nonlocal = visit_Global
+
+
+class _LoopExits(ast.NodeTransformer):
+    """break/continue of the frame loop itself -> end the step."""
+
+    def visit_Break(self, node):
+        self.broke = True
+        return [ast.parse("state._stopped = True").body[0], ast.Return(None)]
+
+    def visit_Continue(self, node):
+        return ast.Return(None)
+
+    def visit_For(self, node):
+        # Their own break/continue belong to inner loops
+        return node
+
+    visit_AsyncFor = visit_While = visit_FunctionDef = visit_ClassDef = visit_For
+    broke = False
+
+
+def extract(path):
+    """Source of the steppable module for the script at path."""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    try:
+        tree = ast.parse(source, path)
+    except SyntaxError as e:
+        raise ExtractError("%s does not parse: %s (line %s)" % (os.path.basename(path), e.msg, e.lineno))
+    _Rename({n: n + "_" for n in RESERVED if n in _all_names(tree)}).visit(tree)
+    definitions, setup, loop = _split(tree)
+    if loop.orelse:
+        raise ExtractError("the frame loop has an else clause")
+
+    # clock = pygame.time.Clock(); its tick() values become nominal frame times
+    clocks = set()
+    for stmt in setup:
+        if isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.Call) \
+                and _dotted(stmt.value.func) in ("pygame.time.Clock", "time.Clock"):
+            clocks |= _stored(stmt.targets)
+    ticks = _TickCalls(clocks)
+    setup = [ticks.visit(s) for s in setup]
+    loop = ticks.visit(loop)
+
+    # Drop rendering until no more names are found to depend on it
+    dropped = set()
+    while True:
+        before = len(dropped)
+        kept_setup = _strip([_copy(s) for s in setup], dropped)
+        kept_loop = _strip([_copy(s) for s in loop.body], dropped)
+        loop_test_drawn = _touches(loop.test, dropped)
+        if len(dropped) == before:
+            break
+    if loop_test_drawn:
+        raise ExtractError("the frame loop's condition depends on pygame")
+    helpers = _helpers(definitions)
+
+    setup_names = set()
+    for stmt in kept_setup:
+        stores = {n.id for n in _walk_scope(stmt) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+        setup_names |= stores - _comprehension_targets(stmt)
+    loop_names = {n.id for stmt in kept_loop for n in _walk_scope(stmt)
+                  if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+    loop_names -= set().union(*[_comprehension_targets(s) for s in kept_loop]) if kept_loop else set()
+    helper_free, helper_written = set(), set()
+    for func in helpers:
+        free, declared = _function_globals(func)
+        helper_free |= free
+        helper_written |= declared | (_writes(func.body) & free)
+
+    random_names = set()
+    for stmt in kept_setup:
+        calls = [(_dotted(n.func) or "").split(".") for n in ast.walk(stmt.value) if isinstance(n, ast.Call)] \
+            if isinstance(stmt, ast.Assign) else []
+        if any("random" in chain for chain in calls):
+            random_names |= _stored(stmt.targets)
+
+    state = (setup_names & (_writes(kept_loop) | helper_written)) | random_names
+    state |= loop_names & (setup_names | helper_free)
+    carried = set()
+    _carried(kept_loop, set(), loop_names, carried)
+    state |= carried
+    state |= _loads(loop.test) & loop_names
+    fields = sorted(state)
+
+    exits = _LoopExits()
+    body = []
+    for stmt in kept_loop:
+        new = exits.visit(stmt)
+        body.extend(new if isinstance(new, list) else [new])
+    to_state = _ToState("state", set(fields))
+    body = [to_state.visit(s) for s in body] or [ast.Pass()]
+    test = _ToState("state", set(fields)).visit(_copy(loop.test))
+    if exits.broke:
+        fields.append("_stopped")
+        test = ast.BoolOp(ast.And(), [ast.parse("not state._stopped", mode="eval").body, test])
+
+    # Helpers see the state being stepped as _state
+    uses_state = False
+    for func in helpers:
+        free, declared = _function_globals(func)
+        shared = set(fields) & free
+        if not shared:
+            continue
+        uses_state = True
+        rewrite = _ToState("_state", shared)
+        new_body = []
+        for stmt in func.body:
+            if isinstance(stmt, ast.Global):
+                stmt.names = [n for n in stmt.names if n not in shared]
+                if not stmt.names:
+                    continue
+            new_body.append(rewrite.visit(stmt))
+        func.body = new_body or [ast.Pass()]
+
+    # Setup the definitions need when they are made (center=(WIDTH // 2, ...)
+    # as a default) also runs once at import
+    top = [s for s in setup if any(s is t for t in tree.body)]
+    prelude = _prelude(_strip([_copy(s) for s in top], set(dropped)), _definition_time_loads(definitions))
+    imports = [d for d in definitions if isinstance(d, (ast.Import, ast.ImportFrom))]
+    definitions = imports + prelude + [d for d in definitions if d not in imports]
+
+    globals_ = sorted(setup_names)
+    init = ast.parse("def init(seed=None):\n"
+                     "    if seed is not None:\n"
+                     "        _random.seed(seed)\n").body[0]
+    if globals_:
+        init.body.insert(0, ast.Global(globals_))
+    init.body += kept_setup
+    init.body.append(ast.parse("state = State()").body[0])
+    for name in fields:
+        if name in setup_names:
+            init.body.append(ast.parse("state.%s = %s" % (name, name)).body[0])
+    if exits.broke:
+        init.body.append(ast.parse("state._stopped = False").body[0])
+    init.body.append(ast.Return(ast.Name("state", ast.Load())))
+
+    step = ast.parse("def step(state):\n    pass\n").body[0]
+    step.body = ([ast.Global(["_state"]), ast.parse("_state = state").body[0]] if uses_state else []) + body
+    running = ast.parse("def running(state):\n    pass\n").body[0]
+    running.body = [ast.Return(test)]
+    state_class = ast.parse("class State:\n    __slots__ = %r\n" % (tuple(fields),)).body[0]
+
+    module = ast.Module(definitions + [state_class, init, step, running], type_ignores=[])
+    ast.fix_missing_locations(module)
+    return HEADER % os.path.basename(path) + "\n\n" + ast.unparse(module) + "\n"
+
+
+def _copy(node):
+    return ast.parse(ast.unparse(node)).body[0] if isinstance(node, ast.stmt) else node
+
+
+def load(path):
+    """Extract the script at path and import the result as a module."""
+    source = extract(path)
+    module = types.ModuleType("hexsim_extracted_" + model_name(path).replace(" ", "_"))
+    module.__file__ = path
+    exec(compile(source, "<extracted %s>" % os.path.basename(path), "exec"), module.__dict__)
+    return module
+
+
+def run(path, frames, seed=0):
+    """Step an extracted script headless; returns (steps taken, seconds)."""
+    module = load(path)
+    state = module.init(seed)
+    start = time.perf_counter()
+    steps = 0
+    while steps < frames and module.running(state):
+        module.step(state)
+        steps += 1
+    return steps, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lift a script's frame loop into init()/step()/running()")
+    parser.add_argument("scripts", nargs="*", help="scripts to extract")
+    parser.add_argument("--all", action="store_true", help="every model script")
+    parser.add_argument("--output-dir", help="write <script>.py here instead of printing")
+    parser.add_argument("--run", type=int, metavar="FRAMES", help="step each extracted script and report steps/s")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    scripts = model_scripts() if args.all else args.scripts
+    if not scripts:
+        parser.error("give scripts or --all")
+    failed = 0
+    for path in scripts:
+        name = os.path.basename(path)
+        try:
+            if args.run:
+                steps, seconds = run(path, args.run, args.seed)
+                print("%-30s %7d steps in %6.3f s (%9.0f steps/s)" % (name[:30], steps, seconds,
+                                                                     steps / seconds if seconds else 0))
+            elif args.output_dir:
+                os.makedirs(args.output_dir, exist_ok=True)
+                with open(os.path.join(args.output_dir, name), "w", encoding="utf-8") as f:
+                    f.write(extract(path))
+                print("wrote %s" % os.path.join(args.output_dir, name))
+            else:
+                sys.stdout.write(extract(path))
+        except ExtractError as e:
+            failed += 1
+            print("%-30s not extracted: %s" % (name[:30], e), file=sys.stderr)
+        except Exception as e:
+            failed += 1
+            print("%-30s fails when stepped: %s: %s" % (name[:30], type(e).__name__, e), file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
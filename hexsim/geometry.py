@@ -0,0 +1,144 @@
+"""
+Shared geometry kernel for the rotating polygon.
+
+The scripts each rebuild the hexagon every frame (get_hexagon_vertices,
+calculate_hexagon_points, hexagon_vertices, rotate_point, ...) with one
+cos/sin pair per vertex, a fresh list of tuples, and edge normals worked out
+again inside the collision loop. RegularPolygon precomputes the unit polygon
+and its local edge normals once; each update is a single rotation (one
+cos/sin pair) written into buffers that are reused from frame to frame.
+
+Vertex i sits at angle 2*pi*i/sides + angle, the order every script uses.
+Angles are in radians; the scripts that work in degrees convert first.
+"""
+import math
+
+try:
+    import numpy as np
+except ImportError:  # the list buffers work without NumPy
+    np = None
+
+
+class RegularPolygon:
+    """A regular polygon rotating about its center.
+
+    After update(angle):
+      vertices[i] - [x, y] of vertex i in screen coordinates
+      normals[i]  - unit inward normal of edge i (vertex i -> vertex i + 1)
+    Both are lists of two-element lists that are overwritten in place, so
+    hold on to the values, not the lists, if you need the previous frame.
+    """
+
+    def __init__(self, center, radius, sides=6):
+        if sides < 3:
+            raise ValueError("a polygon needs at least 3 sides, got %r" % (sides,))
+        self.center = (float(center[0]), float(center[1]))
+        self.radius = float(radius)
+        self.sides = int(sides)
+        self.apothem = self.radius * math.cos(math.pi / self.sides)
+
+        step = 2 * math.pi / self.sides
+        self.unit_vertices = tuple((math.cos(step * i), math.sin(step * i)) for i in range(self.sides))
+        # Edge i's inward normal points from the edge midpoint back to the center
+        self.unit_normals = tuple((-math.cos(step * (i + 0.5)), -math.sin(step * (i + 0.5)))
+                                  for i in range(self.sides))
+
+        self.angle = None
+        self.vertices = [[0.0, 0.0] for _ in range(self.sides)]
+        self.normals = [[0.0, 0.0] for _ in range(self.sides)]
+        self._array_angle = None
+        self.vertex_array = None
+        self.normal_array = None
+        if np is not None:
+            self._unit_vertices = np.array(self.unit_vertices)
+            self._unit_normals = np.array(self.unit_normals)
+            self._rotation = np.empty((2, 2))
+            self.vertex_array = np.empty((self.sides, 2))
+            self.normal_array = np.empty((self.sides, 2))
+
+    def update(self, angle):
+        """Rotate to angle (radians) and refresh the vertices/normals lists."""
+        if angle == self.angle:
+            return self.vertices
+        c = math.cos(angle)
+        s = math.sin(angle)
+        cx, cy = self.center
+        r = self.radius
+        for (ux, uy), v in zip(self.unit_vertices, self.vertices):
+            v[0] = cx + r * (ux * c - uy * s)
+            v[1] = cy + r * (ux * s + uy * c)
+        for (ux, uy), n in zip(self.unit_normals, self.normals):
+            n[0] = ux * c - uy * s
+            n[1] = ux * s + uy * c
+        self.angle = angle
+        return self.vertices
+
+    def update_arrays(self, angle):
+        """Rotate to angle and refresh vertex_array/normal_array, both (sides, 2).
+
+        Same values as update(), computed with one matrix product each.
+        """
+        if np is None:
+            raise RuntimeError("update_arrays() needs NumPy")
+        if angle != self._array_angle:
+            c = math.cos(angle)
+            s = math.sin(angle)
+            rot = self._rotation
+            # Row vectors times the transposed rotation matrix
+            rot[0, 0] = c
+            rot[0, 1] = s
+            rot[1, 0] = -s
+            rot[1, 1] = c
+            np.matmul(self._unit_normals, rot, out=self.normal_array)
+            np.matmul(self._unit_vertices, rot, out=self.vertex_array)
+            self.vertex_array *= self.radius
+            self.vertex_array += self.center
+            self._array_angle = angle
+        return self.vertex_array, self.normal_array
+
+    def locate(self, x, y, angle):
+        """Nearest edge of each point in arrays x, y, in O(1) per point.
+
+        Inside a regular polygon the nearest edge is the one whose angular
+        sector (between the spokes to its two vertices) holds the point, so
+        it follows from the point's polar angle relative to the rotation
+        without looking at the other edges. Returns (edge, u, v): the edge
+        index, the distance along its outward normal from the center (u >
+        apothem is outside its line) and the offset along it from its
+        midpoint, positive towards vertex edge + 1. |v| > half_edge means
+        the closest feature is a vertex rather than the edge.
+        """
+        if np is None:
+            raise RuntimeError("locate() needs NumPy")
+        c = math.cos(angle)
+        s = math.sin(angle)
+        rx = x - self.center[0]
+        ry = y - self.center[1]
+        # Rotate into the polygon's own frame
+        lx = c * rx + s * ry
+        ly = c * ry - s * rx
+        sector = np.arctan2(ly, lx) * (self.sides / (2 * math.pi))
+        edge = np.floor(sector).astype(np.intp) % self.sides
+        ox = -self._unit_normals[edge, 0]
+        oy = -self._unit_normals[edge, 1]
+        return edge, lx * ox + ly * oy, ly * ox - lx * oy
+
+    @property
+    def half_edge(self):
+        return self.radius * math.sin(math.pi / self.sides)
+
+
+def closest_point_on_segment(p, a, b):
+    """
+    Given point p and segment defined by endpoints a and b,
+    return the closest point on the segment to p.
+    """
+    ax, ay = a
+    bx, by = b
+    abx, aby = bx - ax, by - ay
+    ab_len_sq = abx * abx + aby * aby
+    if ab_len_sq == 0:
+        return ax, ay
+    t = ((p[0] - ax) * abx + (p[1] - ay) * aby) / ab_len_sq
+    t = max(0.0, min(1.0, t))
+    return ax + t * abx, ay + t * aby
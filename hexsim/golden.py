@@ -0,0 +1,289 @@
+"""
+Golden-trajectory regression suite with per-step cost budgets.
+
+Each scenario is a seeded, fully deterministic run: every model port in
+hexsim.models (the Gemini scripts' random.uniform starts come from the
+port's seeded random.Random, so several seeds are covered), the engine
+in each of its modes and hexsim.events' event-driven engine. `record` runs them all and stores, under
+hexsim/goldens/:
+
+  <scenario>.npz   the state every SAMPLE_EVERY steps: x, y, vx, vy per
+                   ball and the polygon angle
+  budgets.json     per-step cost of each scenario, in units of a fixed
+                   reference workload timed on the same machine, so the
+                   budgets carry over to faster or slower machines
+
+`check` runs them again and fails (exit status 1) when a sampled state
+leaves its golden by more than the scenario's tolerance. With --timing
+it also times every step and fails when one costs more than its budget
+plus --slack; step times on a busy or shared machine swing by more than
+that, so budgets are opt-in rather than part of every check. A deliberate
+physics or performance change is accepted by recording again and
+committing the new files along with it.
+
+Usage:
+    python -m hexsim.golden check [--timing]
+    python -m hexsim.golden check engine-contacts "model:Gemini 2.0 Flash:0"
+    python -m hexsim.golden record [SCENARIO ...]
+    python -m hexsim.golden list
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from hexsim.models import MODELS
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "goldens")
+BUDGETS = "budgets.json"
+SAMPLE_EVERY = 10       # steps between stored states
+TIMING_REPEATS = 5      # runs per scenario when timing; the fastest counts
+MIN_TIMED = 0.05        # seconds; short scenarios are run back to back until they take this long
+SLACK = 0.5             # fraction a step may exceed its budget by before failing
+MODEL_SEEDS = 3         # seeds for the scripts with random starts
+MODEL_FRAMES = 1200
+ENGINE_STEPS = 600
+
+
+class Scenario:
+    """A named deterministic run.
+
+    make() returns a fresh (step, state) pair: step() advances one step,
+    state() returns the current state as a 1-D float array.
+    """
+
+    def __init__(self, name, make, steps, tolerance):
+        self.name = name
+        self.make = make
+        self.steps = steps
+        self.tolerance = tolerance
+
+    def trajectory(self):
+        """Sampled states as an (samples, state size) array."""
+        step, state = self.make()
+        out = [state().copy()]
+        for i in range(1, self.steps + 1):
+            step()
+            if i % SAMPLE_EVERY == 0:
+                out.append(state().copy())
+        return np.array(out)
+
+    def cost(self):
+        """(seconds per step, the same in reference units).
+
+        Each timed run is paired with a reference run right before it, so
+        load that comes and goes during the suite slows both alike.
+        """
+        best = ratio = math.inf
+        for _ in range(TIMING_REPEATS):
+            reference = reference_time()
+            steps = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < MIN_TIMED:
+                step, _ = self.make()
+                for _ in range(self.steps):
+                    step()
+                steps += self.steps
+            elapsed = (time.perf_counter() - start) / steps
+            best = min(best, elapsed)
+            ratio = min(ratio, elapsed / reference)
+        return best, ratio
+
+    @property
+    def filename(self):
+        return "".join(c if c.isalnum() or c in "-." else "_" for c in self.name) + ".npz"
+
+
+def _model(cls, seed):
+    def make():
+        model = cls(seed=seed)
+        return model.step, lambda: np.array(model.state(), dtype=np.float64)
+    return make
+
+
+def _engine(balls, spawn=None, events=False, **options):
+    def make():
+        from hexsim.engine import Balls, Engine, FPS, HEX_CENTER
+        from hexsim.events import EventEngine
+
+        if balls == 1:
+            # o3-mini's starting state
+            b = Balls.single(HEX_CENTER[0] + 100, HEX_CENTER[1] - 50, 3 * FPS, -5 * FPS)
+        else:
+            b = Balls.random(balls, seed=0, **(spawn or {}))
+        engine = (EventEngine if events else Engine)(b, **options)
+
+        def state():
+            return np.concatenate((b.x, b.y, b.vx, b.vy, [engine.angle]))
+        return engine.step, state
+    return make
+
+
+def scenarios():
+    """Every scenario, in the order they run."""
+    out = []
+    for cls in MODELS.values():
+        for seed in range(MODEL_SEEDS if cls.random_start else 1):
+            out.append(Scenario("model:%s:%d" % (cls.name, seed), _model(cls, seed), MODEL_FRAMES, 1e-6))
+    out += [
+        Scenario("engine-single", _engine(1), ENGINE_STEPS, 1e-6),
+        Scenario("engine-cloud", _engine(200), ENGINE_STEPS, 1e-6),
+        Scenario("engine-ccd", _engine(200, spawn={"speed": 3000.0}, ccd=True), ENGINE_STEPS, 1e-6),
+        Scenario("engine-balls", _engine(100, spawn={"radius": 5}, ball_collisions=True), ENGINE_STEPS, 1e-6),
+        Scenario("engine-sectors", _engine(200, sides=100, sectors=True), ENGINE_STEPS, 1e-6),
+        Scenario("engine-contacts", _engine(200, contacts=True), ENGINE_STEPS, 1e-6),
+        Scenario("engine-events", _engine(1, events=True), ENGINE_STEPS, 1e-6),
+        Scenario("engine-verlet", _engine(200, integrator="verlet"), ENGINE_STEPS, 1e-6),
+        Scenario("engine-rk4-drag", _engine(200, integrator="rk4", drag=0.5), ENGINE_STEPS, 1e-6),
+        Scenario("engine-analytic-drag", _engine(200, integrator="analytic", drag=0.5), ENGINE_STEPS, 1e-6),
+    ]
+    return out
+
+
+def select(names):
+    everything = scenarios()
+    if not names:
+        return everything
+    by_name = {s.name: s for s in everything}
+    unknown = [n for n in names if n not in by_name]
+    if unknown:
+        raise KeyError("unknown scenario %s (see `python -m hexsim.golden list`)" % ", ".join(map(repr, unknown)))
+    return [by_name[n] for n in names]
+
+
+# ----------------------------
+# Timing
+# ----------------------------
+
+def reference_time():
+    """Seconds for a fixed mix of NumPy calls and Python arithmetic.
+
+    Budgets are stored as multiples of this, which roughly cancels out the
+    speed of the machine they were recorded on.
+    """
+    a = np.random.default_rng(0).random(1000)
+    start = time.perf_counter()
+    x = 0.0
+    for i in range(5000):
+        x += math.sqrt(i) * 0.5
+    for _ in range(500):
+        np.sqrt(a * a + a, out=a)
+    return time.perf_counter() - start
+
+
+# ----------------------------
+# Record and check
+# ----------------------------
+
+def _load_budgets(directory):
+    path = os.path.join(directory, BUDGETS)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def record(selected, directory=GOLDEN_DIR, timing=True):
+    os.makedirs(directory, exist_ok=True)
+    budgets = _load_budgets(directory)
+    for s in selected:
+        np.savez_compressed(os.path.join(directory, s.filename), states=s.trajectory(),
+                            steps=s.steps, sample_every=SAMPLE_EVERY)
+        line = "recorded %-36s" % s.name
+        if timing:
+            seconds, cost = s.cost()
+            budgets[s.name] = round(cost, 6)
+            line += " %8.4f ms/step" % (seconds * 1e3)
+        print(line)
+    with open(os.path.join(directory, BUDGETS), "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(budgets.items())), f, indent=2)
+        f.write("\n")
+
+
+def compare(scenario, directory=GOLDEN_DIR):
+    """None if scenario matches its golden, else a description of the first difference."""
+    path = os.path.join(directory, scenario.filename)
+    if not os.path.exists(path):
+        return "no golden trajectory (run record)"
+    with np.load(path) as golden:
+        expected = golden["states"]
+        if int(golden["steps"]) != scenario.steps or int(golden["sample_every"]) != SAMPLE_EVERY:
+            return "golden was recorded with a different step count (run record)"
+    actual = scenario.trajectory()
+    if actual.shape != expected.shape:
+        return "state shape %s, golden %s" % (actual.shape, expected.shape)
+    error = np.abs(actual - expected)
+    # NaN in either one counts as off
+    bad = ~(error <= scenario.tolerance)
+    if not bad.any():
+        return None
+    sample, column = np.argwhere(bad)[0]
+    return "step %d: state[%d] = %r, golden %r (tolerance %g)" % (
+        sample * SAMPLE_EVERY, column, actual[sample, column], expected[sample, column], scenario.tolerance)
+
+
+def check(selected, directory=GOLDEN_DIR, timing=False, slack=SLACK, out=sys.stdout):
+    """Check every scenario, and its budget if timing; returns the number that failed."""
+    budgets = _load_budgets(directory)
+    failed = 0
+    for s in selected:
+        problems = []
+        difference = compare(s, directory)
+        if difference:
+            problems.append(difference)
+        cost = ""
+        if timing:
+            seconds, units = s.cost()
+            cost = "%8.4f ms/step" % (seconds * 1e3)
+            budget = budgets.get(s.name)
+            if budget is None:
+                problems.append("no budget (run record)")
+            else:
+                ratio = units / budget
+                cost += " %5.0f%% of budget" % (100 * ratio)
+                if ratio > 1 + slack:
+                    problems.append("step is %.0f%% over budget" % (100 * (ratio - 1)))
+        out.write("%-4s %-36s %s\n" % ("FAIL" if problems else "ok", s.name, cost))
+        for p in problems:
+            out.write("       %s\n" % p)
+        failed += bool(problems)
+    out.write("%d of %d scenarios failed\n" % (failed, len(selected)))
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check physics against golden trajectories and cost budgets")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("check", help="compare against the stored goldens and budgets")
+    p.add_argument("scenarios", nargs="*", help="scenario names (default: all)")
+    p.add_argument("--timing", action="store_true", help="also time every step against its budget")
+    p.add_argument("--slack", type=float, default=SLACK, help="allowed fraction over budget (with --timing)")
+    p.add_argument("--no-timing", action="store_true", help=argparse.SUPPRESS)
+    p.add_argument("--dir", default=GOLDEN_DIR)
+    p = sub.add_parser("record", help="store new goldens and budgets")
+    p.add_argument("scenarios", nargs="*", help="scenario names (default: all)")
+    p.add_argument("--no-timing", action="store_true", help="keep the stored budgets")
+    p.add_argument("--dir", default=GOLDEN_DIR)
+    sub.add_parser("list", help="list the scenarios")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for s in scenarios():
+            print("%-36s %5d steps, tolerance %g" % (s.name, s.steps, s.tolerance))
+        return
+    try:
+        selected = select(args.scenarios)
+    except KeyError as e:
+        parser.error(e.args[0])
+    if args.command == "record":
+        record(selected, args.dir, not args.no_timing)
+    elif check(selected, args.dir, args.timing and not args.no_timing, args.slack):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
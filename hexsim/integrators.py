@@ -0,0 +1,240 @@
+"""
+Free-flight integrators for the engine, and a cost-vs-accuracy benchmark.
+
+Between collisions a ball only feels gravity and, optionally, linear drag
+(a = g - k v). Every script steps that with a fixed-frame Euler update,
+and Claude's adds FRICTION = 0.99 per frame, which is a drag of
+-ln(0.99) * 60 = 0.603/s at 60 FPS but a different one at any other frame
+rate. The engine's drag is per second, so it means the same at any step,
+and the integrator that steps it is selectable:
+
+  explicit        x += v dt, then v += a(v) dt
+  semi-implicit   v += a(v) dt, then x += v dt (the scripts and the
+                  engine's default)
+  verlet          velocity Verlet: x += v dt + a dt²/2 and v from the
+                  mean of the accelerations at both ends
+  rk4             classic fourth-order Runge-Kutta on (x, v)
+  analytic        the closed-form solution of a = g - k v
+
+All share step(balls, gravity, drag, dt) and update the ball arrays in
+place; collisions are resolved afterwards as before. With no drag Verlet,
+RK4 and the closed form are all exact for constant gravity, so the
+benchmark defaults to Claude's drag, where the orders show.
+
+The benchmark flies balls without walls for a few simulated seconds at
+several step sizes and measures each integrator's energy error against
+the closed form, and its CPU time per simulated second. It prints the
+cheapest choice that meets --target and can plot the curves as an SVG.
+
+Usage:
+    python -m hexsim.integrators --target 1e-4 --plot integrators.svg
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+CLAUDE_DRAG = -math.log(0.99) * 60  # Claude's FRICTION = 0.99 per frame at 60 FPS, per second
+
+
+def _acceleration(vx, vy, gravity, drag):
+    return -drag * vx, gravity - drag * vy
+
+
+def explicit(b, gravity, drag, dt):
+    ax, ay = _acceleration(b.vx, b.vy, gravity, drag)
+    b.x += b.vx * dt
+    b.y += b.vy * dt
+    b.vx += ax * dt
+    b.vy += ay * dt
+
+
+def kick(b, gravity, drag, dt):
+    """The velocity half of semi_implicit, for hexsim.ccd to move the balls."""
+    if drag:
+        b.vx -= drag * b.vx * dt
+        b.vy += (gravity - drag * b.vy) * dt
+    else:
+        b.vy += gravity * dt
+
+
+def semi_implicit(b, gravity, drag, dt):
+    kick(b, gravity, drag, dt)
+    b.x += b.vx * dt
+    b.y += b.vy * dt
+
+
+def verlet(b, gravity, drag, dt):
+    ax, ay = _acceleration(b.vx, b.vy, gravity, drag)
+    b.x += (b.vx + 0.5 * dt * ax) * dt
+    b.y += (b.vy + 0.5 * dt * ay) * dt
+    # Drag depends on velocity, so the end acceleration uses a predicted one
+    ax1, ay1 = _acceleration(b.vx + ax * dt, b.vy + ay * dt, gravity, drag)
+    b.vx += 0.5 * (ax + ax1) * dt
+    b.vy += 0.5 * (ay + ay1) * dt
+
+
+def rk4(b, gravity, drag, dt):
+    vx, vy = b.vx, b.vy
+    ax1, ay1 = _acceleration(vx, vy, gravity, drag)
+    vx2, vy2 = vx + 0.5 * dt * ax1, vy + 0.5 * dt * ay1
+    ax2, ay2 = _acceleration(vx2, vy2, gravity, drag)
+    vx3, vy3 = vx + 0.5 * dt * ax2, vy + 0.5 * dt * ay2
+    ax3, ay3 = _acceleration(vx3, vy3, gravity, drag)
+    vx4, vy4 = vx + dt * ax3, vy + dt * ay3
+    ax4, ay4 = _acceleration(vx4, vy4, gravity, drag)
+    b.x += (vx + 2 * vx2 + 2 * vx3 + vx4) * (dt / 6)
+    b.y += (vy + 2 * vy2 + 2 * vy3 + vy4) * (dt / 6)
+    b.vx += (ax1 + 2 * ax2 + 2 * ax3 + ax4) * (dt / 6)
+    b.vy += (ay1 + 2 * ay2 + 2 * ay3 + ay4) * (dt / 6)
+
+
+def analytic(b, gravity, drag, dt):
+    if not drag:
+        b.x += b.vx * dt
+        b.y += (b.vy + 0.5 * gravity * dt) * dt
+        b.vy += gravity * dt
+        return
+    # v relaxes towards the terminal velocity (0, g/k) as exp(-k t)
+    decay = math.exp(-drag * dt)
+    spent = -math.expm1(-drag * dt) / drag  # (1 - decay) / k without cancellation
+    terminal = gravity / drag
+    b.x += b.vx * spent
+    b.y += terminal * dt + (b.vy - terminal) * spent
+    b.vx *= decay
+    # terminal + (vy - terminal) * decay, in place: terminal * (1 - decay) is g * spent
+    b.vy *= decay
+    b.vy += gravity * spent
+
+
+INTEGRATORS = {
+    "explicit": explicit,
+    "semi-implicit": semi_implicit,
+    "verlet": verlet,
+    "rk4": rk4,
+    "analytic": analytic,
+}
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+
+def _energy(b, gravity):
+    """Kinetic plus potential energy of each ball, per unit mass."""
+    return 0.5 * (b.vx * b.vx + b.vy * b.vy) - gravity * b.y
+
+
+def measure(name, balls, gravity, drag, dt, seconds):
+    """(CPU seconds per simulated second, worst relative energy error).
+
+    The error is sampled once per simulated second against the closed form
+    advanced over the same time in a single step.
+    """
+    step = INTEGRATORS[name]
+    b = balls.copy()
+    exact = balls.copy()
+    per_second = int(round(1 / dt))
+    steps = max(1, int(round(seconds / dt)))
+    worst = 0.0
+    cpu = 0.0
+    for done in range(0, steps, per_second):
+        chunk = min(per_second, steps - done)
+        start = time.perf_counter()
+        for _ in range(chunk):
+            step(b, gravity, drag, dt)
+        cpu += time.perf_counter() - start
+        analytic(exact, gravity, drag, chunk * dt)
+        e = _energy(exact, gravity)
+        error = np.linalg.norm(_energy(b, gravity) - e) / np.linalg.norm(e)
+        worst = max(worst, float(error))
+    return cpu / (steps * dt), worst
+
+
+def write_svg(results, path, target=None, width=640, height=420):
+    """Log-log plot of energy error against CPU time, one line per integrator."""
+    margin = 60
+    floor = 1e-16
+    xs = [math.log10(r[2]) for r in results]
+    ys = [math.log10(max(r[3], floor)) for r in results]
+    x0, x1 = math.floor(min(xs)), math.ceil(max(xs))
+    y0, y1 = math.floor(min(ys)), math.ceil(max(ys))
+    x1, y1 = max(x1, x0 + 1), max(y1, y0 + 1)
+
+    def px(v):
+        return margin + (v - x0) / (x1 - x0) * (width - 2 * margin)
+
+    def py(v):
+        return height - margin - (v - y0) / (y1 - y0) * (height - 2 * margin)
+
+    colors = ["#d62728", "#1f77b4", "#2ca02c", "#9467bd", "#ff7f0e", "#8c564b"]
+    out = ['<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" font-family="sans-serif" '
+           'font-size="11">' % (width, height),
+           '<rect width="100%" height="100%" fill="white"/>']
+    for e in range(x0, x1 + 1):
+        out.append('<line x1="%.1f" y1="%d" x2="%.1f" y2="%d" stroke="#ddd"/>'
+                   % (px(e), margin, px(e), height - margin))
+        out.append('<text x="%.1f" y="%d" text-anchor="middle">1e%d</text>' % (px(e), height - margin + 15, e))
+    for e in range(y0, y1 + 1):
+        out.append('<line x1="%d" y1="%.1f" x2="%d" y2="%.1f" stroke="#ddd"/>'
+                   % (margin, py(e), width - margin, py(e)))
+        out.append('<text x="%d" y="%.1f" text-anchor="end">1e%d</text>' % (margin - 5, py(e) + 4, e))
+    out.append('<text x="%d" y="%d" text-anchor="middle">CPU seconds per simulated second</text>'
+               % (width // 2, height - 15))
+    out.append('<text x="15" y="%d" transform="rotate(-90 15 %d)" text-anchor="middle">'
+               'relative energy error</text>' % (height // 2, height // 2))
+    if target:
+        out.append('<line x1="%d" y1="%.1f" x2="%d" y2="%.1f" stroke="black" stroke-dasharray="4 3"/>'
+                   % (margin, py(math.log10(target)), width - margin, py(math.log10(target))))
+    names = list(dict.fromkeys(r[0] for r in results))
+    for k, name in enumerate(names):
+        color = colors[k % len(colors)]
+        points = [(px(math.log10(r[2])), py(math.log10(max(r[3], floor)))) for r in results if r[0] == name]
+        out.append('<polyline fill="none" stroke="%s" stroke-width="2" points="%s"/>'
+                   % (color, " ".join("%.1f,%.1f" % p for p in points)))
+        for x, y in points:
+            out.append('<circle cx="%.1f" cy="%.1f" r="3" fill="%s"/>' % (x, y, color))
+        out.append('<text x="%d" y="%d" fill="%s">%s</text>' % (width - margin + 5, margin + 15 * k, color, name))
+    out.append("</svg>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+
+
+def main(argv=None):
+    from hexsim.engine import GRAVITY, Balls
+
+    parser = argparse.ArgumentParser(description="Energy error against CPU time for each integrator")
+    parser.add_argument("--integrators", nargs="+", choices=list(INTEGRATORS), default=list(INTEGRATORS))
+    parser.add_argument("--rates", type=int, nargs="+", default=[30, 60, 120, 240, 480, 960],
+                        help="steps per simulated second")
+    parser.add_argument("--balls", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=5.0, help="simulated seconds of free flight")
+    parser.add_argument("--drag", type=float, default=CLAUDE_DRAG, help="linear drag per second")
+    parser.add_argument("--target", type=float, default=None, help="relative energy error to meet")
+    parser.add_argument("--plot", metavar="PATH", help="write an SVG plot")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    balls = Balls.random(args.balls, speed=600.0, seed=args.seed)
+    results = []
+    print("%-14s %6s %16s %14s" % ("integrator", "steps/s", "CPU ms/sim s", "energy error"))
+    for name in args.integrators:
+        for rate in args.rates:
+            cpu, error = measure(name, balls, GRAVITY, args.drag, 1.0 / rate, args.seconds)
+            results.append((name, rate, cpu, error))
+            print("%-14s %6d %16.3f %14.3e" % (name, rate, cpu * 1e3, error))
+    if args.target is not None:
+        meeting = [r for r in results if r[3] <= args.target]
+        if meeting:
+            name, rate, cpu, error = min(meeting, key=lambda r: r[2])
+            print("cheapest within %g: %s at %d steps/s (%.3f CPU ms per simulated second, error %.1e)"
+                  % (args.target, name, rate, cpu * 1e3, error))
+        else:
+            print("nothing tried reaches %g; add higher --rates" % args.target)
+    if args.plot:
+        write_svg(results, args.plot, args.target)
+
+
+if __name__ == "__main__":
+    main()
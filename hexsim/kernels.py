@@ -0,0 +1,134 @@
+"""
+Optional compiled backend for the engine's integrate + collide step.
+
+The NumPy engine pays a fixed cost per array operation, about forty of them
+per edge per step. That dominates for small ball counts (a single ball
+costs about as much as a thousand), and is the same overhead Claude's
+check_collision pays on its 2-element arrays. step_balls is the same step
+written as a plain loop over balls and edges, the way o3-mini's
+closest_point_on_segment/collision loop is written. When Numba is
+installed it is compiled to machine code; otherwise the engine keeps using
+its NumPy path. Importing Numba alone takes about half a second, so that
+and the compile wait for the first engine that asks for the kernel.
+
+step_balls does every floating-point operation in the same order as
+Engine.step/_collide_edge, so the two backends give bit-identical states
+(no fastmath, so nothing is reassociated or fused). The benchmark below
+checks that as it goes.
+
+Usage:
+    python -m hexsim.kernels --balls 1 10 100 1000 10000 100000
+"""
+import argparse
+import functools
+import math
+import time
+
+import numpy as np
+
+
+def step_balls(x, y, vx, vy, verts, normals, radius, restitution, omega, cx, cy, gravity_dt, dt,
+               iterations):
+    """Integrate and collide every ball in place.
+
+    verts/normals are the polygon at the new angle, as from
+    RegularPolygon.update_arrays. Mirrors Engine.collide: each pass a ball
+    is resolved against the first edge it overlaps, and only balls that
+    collided get another pass.
+    """
+    sides = verts.shape[0]
+    r2 = radius * radius
+    for i in range(x.shape[0]):
+        # Semi-implicit Euler, the same order as Engine.step
+        vy[i] += gravity_dt
+        x[i] += vx[i] * dt
+        y[i] += vy[i] * dt
+        for _ in range(iterations):
+            collided = False
+            for e in range(sides):
+                ax = verts[e, 0]
+                ay = verts[e, 1]
+                bx = verts[(e + 1) % sides, 0]
+                by = verts[(e + 1) % sides, 1]
+                abx = bx - ax
+                aby = by - ay
+                ab_len_sq = abx * abx + aby * aby
+                if ab_len_sq == 0:
+                    continue
+                t = ((x[i] - ax) * abx + (y[i] - ay) * aby) / ab_len_sq
+                t = min(max(t, 0.0), 1.0)
+                px = t * abx + ax
+                py = t * aby + ay
+                dx = x[i] - px
+                dy = y[i] - py
+                d2 = dx * dx + dy * dy
+                if not d2 < r2:
+                    continue
+                dist = math.sqrt(d2)
+                if dist == 0:
+                    nx = normals[e, 0]
+                    ny = normals[e, 1]
+                else:
+                    nx = dx / dist
+                    ny = dy / dist
+                penetration = radius - dist
+                x[i] = x[i] + nx * penetration
+                y[i] = y[i] + ny * penetration
+                wx = -omega * (py - cy)
+                wy = omega * (px - cx)
+                rel_dot_n = (vx[i] - wx) * nx + (vy[i] - wy) * ny
+                impulse = (1 + restitution) * rel_dot_n if rel_dot_n < 0 else 0.0
+                vx[i] = vx[i] - impulse * nx
+                vy[i] = vy[i] - impulse * ny
+                collided = True
+                break
+            if not collided:
+                break
+
+
+@functools.lru_cache(maxsize=None)
+def compiled():
+    """step_balls compiled by Numba, or None without it; built on the first call."""
+    try:
+        import numba
+    except ImportError:  # the NumPy path is used instead
+        return None
+    return numba.njit(cache=True)(step_balls)
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+
+def _timed(engine, steps):
+    start = time.perf_counter()
+    engine.run(steps)
+    return (time.perf_counter() - start) / steps
+
+
+def main(argv=None):
+    from hexsim.engine import Balls, Engine
+
+    parser = argparse.ArgumentParser(description="Compare the NumPy and compiled engine backends")
+    parser.add_argument("--balls", type=int, nargs="+", default=[1, 10, 100, 1000, 10000, 100000])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if compiled() is None:
+        parser.exit(1, "Numba is not installed; only the NumPy backend is available\n")
+    print("%10s %14s %14s %9s %10s" % ("balls", "numpy ms/step", "numba ms/step", "speedup", "identical"))
+    for n in args.balls:
+        engines = {}
+        for backend in ("numpy", "numba"):
+            engine = Engine(Balls.random(n, seed=args.seed), backend=backend)
+            engine.step()  # warm up buffers and the JIT
+            engines[backend] = (engine, _timed(engine, args.steps))
+        a, b = engines["numpy"][0].balls, engines["numba"][0].balls
+        same = all(np.array_equal(getattr(a, k), getattr(b, k)) for k in ("x", "y", "vx", "vy"))
+        t_np, t_nb = engines["numpy"][1], engines["numba"][1]
+        print("%10d %14.4f %14.4f %8.1fx %10s" % (n, t_np * 1e3, t_nb * 1e3, t_np / t_nb, "yes" if same else "NO"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,544 @@
+"""
+Steppable ports of each model script's physics.
+
+The scripts keep their state in module globals and run forever at import,
+so they can't be driven from a sweep or a scorer. Each class here is a
+line-by-line port of one script's update code, quirks included (Claude's
+per-frame friction, DeepSeek R1's outward collision normal, DeepSeek R1
+70B's circular "hexagon", ...), without the pygame window. Units are the
+script's own: most work per frame, Claude per second with dt = 1/60.
+
+All models expose the same state after each step():
+    ball_x, ball_y, ball_vx, ball_vy   ball state in the script's units
+    angle                              hexagon rotation in radians
+    polygon                            RegularPolygon drawn by the script
+
+Parameters can be overridden by keyword: gravity, restitution (whatever
+the script calls its bounce coefficient), rotation_speed, ball_radius and
+velocity_scale, which multiplies the initial velocity.
+"""
+import math
+import random
+
+from hexsim.geometry import RegularPolygon, closest_point_on_segment
+
+WIDTH, HEIGHT = 800, 600
+
+
+class ModelPhysics:
+    """Common state and parameter handling for the ported scripts."""
+
+    name = None
+    script = None
+    frame_dt = 1.0 / 60      # seconds per step, for converting velocities
+    velocity_unit = 60.0     # multiply the script's velocities by this for px/s
+    gravity_unit = 3600.0    # and its gravity by this for px/s²
+    random_start = False     # whether the initial state depends on the seed
+    center = (WIDTH // 2, HEIGHT // 2)
+    hex_radius = 150
+    sides = 6
+    defaults = {}
+
+    def __init__(self, seed=0, **params):
+        unknown = set(params) - set(self.defaults) - {"velocity_scale"}
+        if unknown:
+            raise TypeError("%s got unknown parameters: %s" % (type(self).__name__, ", ".join(sorted(unknown))))
+        self.params = dict(self.defaults, velocity_scale=1.0)
+        self.params.update(params)
+        for key, value in self.params.items():
+            setattr(self, key, value)
+        self.rng = random.Random(seed)
+        self.polygon = RegularPolygon(self.center, self.hex_radius, self.sides)
+        self.frame = 0
+        self.angle = 0.0
+        self.reset()
+        self.ball_vx *= self.velocity_scale
+        self.ball_vy *= self.velocity_scale
+        self.polygon.update(self.angle)
+
+    def reset(self):
+        raise NotImplementedError
+
+    def step(self):
+        raise NotImplementedError
+
+    def run(self, frames):
+        for _ in range(frames):
+            self.step()
+
+    def state(self):
+        return self.ball_x, self.ball_y, self.ball_vx, self.ball_vy, self.angle
+
+    def energy(self):
+        """Kinetic plus potential energy per unit mass in px²/s² (y grows downward)."""
+        speed_sq = (self.ball_vx ** 2 + self.ball_vy ** 2) * self.velocity_unit ** 2
+        return 0.5 * speed_sq - self.gravity * self.gravity_unit * self.ball_y
+
+    def outside_distance(self):
+        """How far the ball's center is outside the hexagon (negative: inside)."""
+        return signed_distance(self.polygon, self.angle, self.ball_x, self.ball_y)
+
+
+def signed_distance(polygon, angle, x, y):
+    """Distance from (x, y) to the boundary of polygon at angle; positive outside."""
+    c, s = math.cos(angle), math.sin(angle)
+    rx, ry = x - polygon.center[0], y - polygon.center[1]
+    qx, qy = c * rx + s * ry, c * ry - s * rx
+    return max(-(qx * nx + qy * ny) for nx, ny in polygon.unit_normals) - polygon.apothem
+
+
+# ----------------------------
+# ChatGPT o3-mini
+# ----------------------------
+
+class O3Mini(ModelPhysics):
+    name = "ChatGPT o3-mini"
+    script = "ChatGPT o3-mini.py"
+    hex_radius = 250
+    defaults = {"gravity": 0.5, "restitution": 0.9, "rotation_speed": 0.01, "ball_radius": 15}
+
+    def reset(self):
+        self.ball_x = self.center[0] + 100
+        self.ball_y = self.center[1] - 50
+        self.ball_vx, self.ball_vy = 3.0, -5.0
+
+    def step(self):
+        self.angle += self.rotation_speed
+        vertices = self.polygon.update(self.angle)
+        self.ball_vy += self.gravity
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        cx, cy = self.center
+        w = self.rotation_speed
+        r = self.ball_radius
+        for _ in range(3):
+            collision_occurred = False
+            for i in range(self.sides):
+                a = vertices[i]
+                b = vertices[(i + 1) % self.sides]
+                closest = closest_point_on_segment((self.ball_x, self.ball_y), a, b)
+                dx = self.ball_x - closest[0]
+                dy = self.ball_y - closest[1]
+                dist = math.hypot(dx, dy)
+                if dist < r:
+                    collision_occurred = True
+                    if dist == 0:
+                        normal = self.polygon.normals[i]
+                    else:
+                        normal = (dx / dist, dy / dist)
+                    penetration = r - dist
+                    self.ball_x += normal[0] * penetration
+                    self.ball_y += normal[1] * penetration
+                    wx = -w * (closest[1] - cy)
+                    wy = w * (closest[0] - cx)
+                    rel_x = self.ball_vx - wx
+                    rel_y = self.ball_vy - wy
+                    rel_dot_n = rel_x * normal[0] + rel_y * normal[1]
+                    if rel_dot_n < 0:
+                        self.ball_vx = rel_x - (1 + self.restitution) * rel_dot_n * normal[0] + wx
+                        self.ball_vy = rel_y - (1 + self.restitution) * rel_dot_n * normal[1] + wy
+                    break
+            if not collision_occurred:
+                break
+        self.frame += 1
+
+
+# ----------------------------
+# Claude 3.5 Sonnet
+# ----------------------------
+
+class Claude(ModelPhysics):
+    name = "Claude 3.5 Sonnet"
+    script = "Claude 3.5 Sonnet.py"
+    velocity_unit = 1.0
+    gravity_unit = 1.0
+    center = (WIDTH / 2, HEIGHT / 2)
+    # rotation_speed in degrees per frame, gravity in px/s², velocities in px/s
+    defaults = {"gravity": 980.0, "restitution": 0.8, "rotation_speed": 1.0, "ball_radius": 15,
+                "friction": 0.99}
+
+    def reset(self):
+        self.ball_x, self.ball_y = WIDTH / 2, HEIGHT / 2
+        self.ball_vx, self.ball_vy = 200.0, 0.0
+        self.hexagon_angle = 0.0
+
+    def step(self):
+        dt = self.frame_dt
+        self.ball_vy += self.gravity * dt
+        self.ball_vx *= self.friction
+        self.ball_vy *= self.friction
+        self.ball_x += self.ball_vx * dt
+        self.ball_y += self.ball_vy * dt
+
+        self.hexagon_angle += self.rotation_speed
+        self.angle = math.radians(self.hexagon_angle)
+        points = self.polygon.update(self.angle)
+
+        r = self.ball_radius
+        for i in range(6):
+            p1 = points[i]
+            p2 = points[(i + 1) % 6]
+            # Distance to the infinite line through the edge, as in the script
+            a = p2[1] - p1[1]
+            b = p1[0] - p2[0]
+            c = p2[0] * p1[1] - p1[0] * p2[1]
+            distance = abs(a * self.ball_x + b * self.ball_y + c) / math.sqrt(a * a + b * b)
+            if distance <= r:
+                nx, ny = self.polygon.normals[i]
+                dot = self.ball_vx * nx + self.ball_vy * ny
+                self.ball_vx -= (1 + self.restitution) * dot * nx
+                self.ball_vy -= (1 + self.restitution) * dot * ny
+                overlap = r - distance
+                self.ball_x += nx * overlap
+                self.ball_y += ny * overlap
+        self.frame += 1
+
+
+# ----------------------------
+# Gemini 2.0 Flash (4000 tok) and its hotkeys follow-up
+# ----------------------------
+
+def _is_point_inside_hexagon(x, y, hexagon_points):
+    """Winding number test from the Gemini Flash script."""
+    winding_number = 0
+    n = len(hexagon_points)
+    for i in range(n):
+        x1, y1 = hexagon_points[i]
+        x2, y2 = hexagon_points[(i + 1) % n]
+        if y1 <= y:
+            if y2 > y and (x2 - x1) * (y - y1) - (x - x1) * (y2 - y1) > 0:
+                winding_number += 1
+        elif y2 <= y and (x2 - x1) * (y - y1) - (x - x1) * (y2 - y1) < 0:
+            winding_number -= 1
+    return winding_number != 0
+
+
+class GeminiFlash(ModelPhysics):
+    name = "Gemini 2.0 Flash"
+    script = "Gemini 2.0 Flash.py"
+    random_start = True
+    # rotation_speed in degrees per frame
+    defaults = {"gravity": 0.5, "restitution": 0.8, "rotation_speed": 0.5, "ball_radius": 20}
+
+    def reset(self):
+        self.ball_x, self.ball_y = WIDTH // 2, HEIGHT // 2
+        self.ball_vx = self.rng.uniform(-5, 5)
+        self.ball_vy = self.rng.uniform(-5, 5)
+        self.hexagon_angle = 0.0
+        self.direction = 1
+
+    def step(self):
+        self.hexagon_angle += self.rotation_speed * self.direction
+        self.angle = math.radians(self.hexagon_angle)
+        points = self.polygon.update(self.angle)
+
+        self.ball_vy += self.gravity
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        r = self.ball_radius
+        for i in range(6):
+            x1, y1 = points[i]
+            x2, y2 = points[(i + 1) % 6]
+            dx, dy = x2 - x1, y2 - y1
+            t = ((self.ball_x - x1) * dx + (self.ball_y - y1) * dy) / (dx * dx + dy * dy)
+            t = max(0, min(1, t))
+            closest_x, closest_y = x1 + t * dx, y1 + t * dy
+            distance = math.sqrt((self.ball_x - closest_x) ** 2 + (self.ball_y - closest_y) ** 2)
+            if distance <= r:
+                normal_x, normal_y = self.polygon.normals[i]
+                impulse = (1 + self.restitution) * (self.ball_vx * normal_x + self.ball_vy * normal_y)
+                self.ball_vx -= impulse * normal_x
+                self.ball_vy -= impulse * normal_y
+                self.ball_x += normal_x * (r - distance)
+                self.ball_y += normal_y * (r - distance)
+
+        if not _is_point_inside_hexagon(self.ball_x, self.ball_y, points):
+            min_distance = float("inf")
+            closest_point = None
+            for i in range(6):
+                closest = closest_point_on_segment((self.ball_x, self.ball_y), points[i], points[(i + 1) % 6])
+                distance = math.hypot(self.ball_x - closest[0], self.ball_y - closest[1])
+                if distance < min_distance:
+                    min_distance = distance
+                    closest_point = closest
+            closest_x, closest_y = closest_point
+            normal_x = self.ball_x - closest_x
+            normal_y = self.ball_y - closest_y
+            normal_length = math.sqrt(normal_x ** 2 + normal_y ** 2)
+            if normal_length > 0:
+                normal_x /= normal_length
+                normal_y /= normal_length
+                dot_product = self.ball_vx * normal_x + self.ball_vy * normal_y
+                self.ball_vx -= 2 * dot_product * normal_x
+                self.ball_vy -= 2 * dot_product * normal_y
+                self.ball_x = closest_x + normal_x * r
+                self.ball_y = closest_y + normal_y * r
+        self.frame += 1
+
+
+class GeminiFlashHotkeys(GeminiFlash):
+    name = "Gemini 2.0 Flash - Hotkeys"
+    script = "Gemini 2.0 Flash - Hotkeys.py"
+
+
+# ----------------------------
+# Gemini 2.0 Flash (8192 tok)
+# ----------------------------
+
+class GeminiFlash8192(ModelPhysics):
+    name = "Gemini 2.0 Flash 8192 tok"
+    script = "Gemini 2.0 Flash 8192 tok.py"
+    random_start = True
+    defaults = {"gravity": 0.5, "restitution": 0.8, "rotation_speed": 0.5, "ball_radius": 20}
+
+    def reset(self):
+        self.ball_x = WIDTH // 2
+        self.ball_y = HEIGHT // 2 - self.hex_radius // 2
+        self.ball_vx = self.rng.uniform(-5, 5)
+        self.ball_vy = 0.0
+        self.rotation_angle = 0.0
+
+    def step(self):
+        self.rotation_angle += self.rotation_speed
+        self.angle = math.radians(self.rotation_angle)
+        points = self.polygon.update(self.angle)
+
+        self.ball_vy += self.gravity
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        r = self.ball_radius
+        damping = self.restitution
+        for i in range(6):
+            p1 = points[i]
+            closest = closest_point_on_segment((self.ball_x, self.ball_y), p1, points[(i + 1) % 6])
+            distance = math.hypot(self.ball_x - closest[0], self.ball_y - closest[1])
+            if distance <= r:
+                normal_x, normal_y = self.polygon.normals[i]
+                # The script measures separation from p1 pushed along the normal
+                separation = r - math.sqrt((self.ball_x - (p1[0] + normal_x * r)) ** 2
+                                           + (self.ball_y - (p1[1] + normal_y * r)) ** 2)
+                self.ball_x += normal_x * separation
+                self.ball_y += normal_y * separation
+                dot_product = self.ball_vx * normal_x + self.ball_vy * normal_y
+                self.ball_vx -= 2 * dot_product * normal_x * damping
+                self.ball_vy -= 2 * dot_product * normal_y * damping
+
+        # Screen edges
+        if self.ball_x + r > WIDTH or self.ball_x - r < 0:
+            self.ball_vx = -self.ball_vx * damping
+            self.ball_x = max(r, min(self.ball_x, WIDTH - r))
+        if self.ball_y + r > HEIGHT or self.ball_y - r < 0:
+            self.ball_vy = -self.ball_vy * damping
+            self.ball_y = max(r, min(self.ball_y, HEIGHT - r))
+        self.frame += 1
+
+
+# ----------------------------
+# Gemini 2.0 Pro
+# ----------------------------
+
+class GeminiPro(ModelPhysics):
+    name = "Gemini 2.0 Pro"
+    script = "Gemini 2.0 Pro.py"
+    # rotation_speed in radians per frame
+    defaults = {"gravity": 0.5, "restitution": 0.8, "rotation_speed": 0.02, "ball_radius": 15}
+
+    def reset(self):
+        self.ball_x = WIDTH // 2
+        self.ball_y = HEIGHT // 2 - self.hex_radius + self.ball_radius + 10
+        self.ball_vx, self.ball_vy = 2.0, 0.0
+
+    def step(self):
+        self.ball_vy += self.gravity
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        self.angle += self.rotation_speed
+        vertices = self.polygon.update(self.angle)
+
+        r = self.ball_radius
+        for i in range(6):
+            p1 = vertices[i]
+            p2 = vertices[(i + 1) % 6]
+            closest = closest_point_on_segment((self.ball_x, self.ball_y), p1, p2)
+            dist = math.hypot(closest[0] - self.ball_x, closest[1] - self.ball_y)
+            if dist <= r:
+                normal_x = self.ball_x - closest[0]
+                normal_y = self.ball_y - closest[1]
+                normal_length = math.sqrt(normal_x ** 2 + normal_y ** 2)
+                if normal_length > 0:
+                    normal_x /= normal_length
+                    normal_y /= normal_length
+                else:
+                    normal_x, normal_y = self.polygon.normals[i]
+                dot_product = self.ball_vx * normal_x + self.ball_vy * normal_y
+                self.ball_vx -= 2 * dot_product * normal_x * self.restitution
+                self.ball_vy -= 2 * dot_product * normal_y * self.restitution
+                overlap = r - dist
+                self.ball_x += normal_x * overlap
+                self.ball_y += normal_y * overlap
+        self.frame += 1
+
+
+# ----------------------------
+# DeepSeek R1 (671b)
+# ----------------------------
+
+class DeepSeekR1(ModelPhysics):
+    name = "DeepSeek R1"
+    script = "DeepSeek R1.py"
+    hex_radius = 200
+    # rotation_speed in degrees per frame
+    defaults = {"gravity": 0.5, "restitution": 0.8, "rotation_speed": 1.0, "ball_radius": 15}
+
+    def reset(self):
+        self.ball_x, self.ball_y = float(self.center[0]), float(self.center[1] - 150)
+        self.ball_vx, self.ball_vy = 3.0, 0.0
+        self.rotation_angle = 0.0
+
+    def step(self):
+        self.rotation_angle = (self.rotation_angle + self.rotation_speed) % 360
+        self.angle = math.radians(self.rotation_angle)
+        vertices = self.polygon.update(self.angle)
+
+        self.ball_vy += self.gravity
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        r = self.ball_radius
+        for i in range(6):
+            a = vertices[i]
+            closest = closest_point_on_segment((self.ball_x, self.ball_y), a, vertices[(i + 1) % 6])
+            distance = math.hypot(self.ball_x - closest[0], self.ball_y - closest[1])
+            if distance < r:
+                # The script's normal (edge_y, -edge_x) points out of the hexagon
+                inward_x, inward_y = self.polygon.normals[i]
+                normal = (-inward_x, -inward_y)
+                penetration = r - distance
+                self.ball_x += normal[0] * penetration
+                self.ball_y += normal[1] * penetration
+                dot = self.ball_vx * normal[0] + self.ball_vy * normal[1]
+                self.ball_vx -= 2 * dot * normal[0]
+                self.ball_vy -= 2 * dot * normal[1]
+                self.ball_vx *= self.restitution
+                self.ball_vy *= self.restitution
+        self.frame += 1
+
+
+# ----------------------------
+# DeepSeek R1 32B
+# ----------------------------
+
+class DeepSeekR132B(ModelPhysics):
+    name = "DeepSeek R1 32B"
+    script = "DeepSeek R1 32B.py"
+    random_start = True
+    hex_radius = 300
+    # The script never advances its angle, and rotates only the (invisible)
+    # drawn hexagon, not the one it collides with. rotation_speed is in
+    # degrees per frame; restitution is its damping_factor.
+    defaults = {"gravity": 1.5, "restitution": 0.7, "rotation_speed": 0.0, "ball_radius": 30}
+
+    def reset(self):
+        self.ball_x = WIDTH // 2 - self.ball_radius
+        self.ball_y = HEIGHT // 2 - self.ball_radius
+        self.ball_vx = self.rng.uniform(-2, 2)
+        self.ball_vy = self.rng.uniform(-5, 0)
+        self.degrees = 0.0
+        self._last_point()
+
+    def _last_point(self):
+        # The collision code reads x, y left over from rotating the last vertex
+        rx, ry = self.polygon.unit_vertices[-1]
+        rx *= self.hex_radius
+        ry *= self.hex_radius
+        c, s = math.cos(math.radians(self.degrees)), math.sin(math.radians(self.degrees))
+        self.leftover = (rx * c + ry * s, -rx * s + ry * c)
+
+    def step(self):
+        self.ball_vy += self.gravity
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        vertices = self.polygon.update(0.0)
+        x, y = self.leftover
+        for i in range(6):
+            p1 = vertices[i]
+            p2 = vertices[(i + 1) % 6]
+            dx = self.ball_x - (p1[0] + p2[0]) / 2
+            dy = self.ball_y - (p1[1] + p2[1]) / 2
+            # Cross product with the unnormalized edge: only true within
+            # ball_radius / edge length of the edge's line
+            dist_line_segment = abs(dx * (p2[1] - p1[1]) - dy * (p2[0] - p1[0]))
+            if dist_line_segment <= self.ball_radius:
+                normal_x = -(y - ((p2[1] - p1[1]) / (p2[0] - p1[0])) * (x - p1[0]))
+                normal_y = x - p1[0]
+                dot_product = self.ball_vx * normal_x + self.ball_vy * normal_y
+                if abs(dot_product) > 0:
+                    # The reflected velocity is computed and discarded
+                    self.ball_vx *= self.restitution
+                    self.ball_vy *= self.restitution
+
+        self.degrees += self.rotation_speed
+        self._last_point()
+        self.frame += 1
+
+
+# ----------------------------
+# DeepSeek R1 70B
+# ----------------------------
+
+class DeepSeekR170B(ModelPhysics):
+    name = "DeepSeek R1 70B"
+    script = "DeepSeek R1 70B.py"
+    hex_radius = 100
+    # rotation_speed in radians per frame
+    defaults = {"gravity": 0.5, "restitution": 0.8, "rotation_speed": 0.02, "ball_radius": 8}
+
+    def reset(self):
+        self.ball_x, self.ball_y = float(self.center[0]), float(self.center[1])
+        self.ball_vx, self.ball_vy = 5.0, -10.0
+
+    def step(self):
+        self.angle += self.rotation_speed
+        self.polygon.update(self.angle)
+
+        self.ball_vy += self.gravity
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        # The script collides with the circumscribed circle, not the hexagon
+        r = self.ball_radius
+        cx, cy = self.center
+        dx = self.ball_x - cx
+        dy = self.ball_y - cy
+        distance_to_center = math.hypot(dx, dy)
+        if distance_to_center > self.hex_radius - r:
+            normal_x = dx / distance_to_center
+            normal_y = dy / distance_to_center
+            dot_product = self.ball_vx * normal_x + self.ball_vy * normal_y
+            self.ball_vx -= 2 * dot_product * normal_x
+            self.ball_vy -= 2 * dot_product * normal_y
+            self.ball_x = cx + normal_x * (self.hex_radius - r)
+            self.ball_y = cy + normal_y * (self.hex_radius - r)
+            if math.hypot(self.ball_vx, self.ball_vy) > 0:
+                self.ball_vx *= self.restitution
+                self.ball_vy *= self.restitution
+        self.frame += 1
+
+
+MODELS = {cls.name: cls for cls in (O3Mini, Claude, GeminiFlash, GeminiFlashHotkeys, GeminiFlash8192,
+                                    GeminiPro, DeepSeekR1, DeepSeekR132B, DeepSeekR170B)}
+
+
+def get_model(name):
+    """Look a model up by name or script file name."""
+    if name in MODELS:
+        return MODELS[name]
+    for cls in MODELS.values():
+        if cls.script == name or cls.script == name + ".py":
+            return cls
+    raise KeyError("unknown model %r (known: %s)" % (name, ", ".join(MODELS)))
@@ -0,0 +1,438 @@
+"""
+Per-phase frame profiler with an on-screen HUD and Chrome trace export.
+
+A Profiler splits each frame into phases:
+
+  events     pygame.event.get
+  physics    integration and everything not inside another phase
+  collision  collision detection/response (the engine's wall and ball
+             passes, or the scripts' collision helpers such as o3-mini's
+             closest_point_on_segment in its `for _ in range(3)` loop)
+  draw       fill, blit and pygame.draw.*
+  hud        drawing this overlay
+  flip       display.flip
+  wait       clock.tick sleeping
+
+Phases nest; a phase's time excludes the phases inside it. The last HISTORY
+frames are kept for the HUD, a stacked frame-time graph toggled with F3,
+and with trace=True every phase is also kept as a Chrome trace event
+(chrome://tracing, https://ui.perfetto.dev).
+
+A disabled profiler rebinds begin/end/frame to a no-op, so leaving the
+calls in the frame loop costs one empty function call each.
+
+Usage:
+    python -m hexsim.profiler "ChatGPT o3-mini.py" [--frames 600] [--trace trace.json]
+    python -m hexsim.viewer --profile --trace trace.json
+"""
+import argparse
+import builtins
+import json
+import random
+import time
+
+import numpy as np
+
+from hexsim.scripts import model_name
+
+EVENTS = "events"
+PHYSICS = "physics"
+COLLISION = "collision"
+DRAW = "draw"
+HUD = "hud"
+FLIP = "flip"
+WAIT = "wait"
+PHASES = (EVENTS, PHYSICS, COLLISION, DRAW, HUD, FLIP, WAIT)
+
+HISTORY = 240          # frames kept for the HUD graph
+HUD_KEY = "f3"         # pygame key name that toggles the overlay
+HUD_HEIGHT = 80        # graph height in pixels
+HUD_SCALE_MS = 33.3    # frame time at the top of the graph
+TARGET_MS = 1000 / 60  # reference line on the graph
+
+PHASE_COLORS = {
+    EVENTS: (120, 120, 255),
+    PHYSICS: (80, 200, 80),
+    COLLISION: (240, 200, 40),
+    DRAW: (230, 90, 60),
+    HUD: (150, 150, 150),
+    FLIP: (200, 80, 220),
+    WAIT: (60, 60, 60),
+}
+
+
+def _noop(*args):
+    pass
+
+
+class Profiler:
+    """Accumulates exclusive time per phase for every frame.
+
+    Call frame() once per frame (it closes the previous one) and bracket
+    phases with begin(name)/end() or `with profiler.section(name):`.
+    """
+
+    def __init__(self, enabled=True, trace=False, history=HISTORY):
+        self.history = np.zeros((history, len(PHASES)))  # seconds per phase, ring buffer
+        self.frames = 0
+        self.trace = [] if trace else None  # (name, start, end) in perf_counter seconds
+        self._index = {name: i for i, name in enumerate(PHASES)}
+        self._totals = [0.0] * len(PHASES)
+        self._stack = []  # [phase index, start, time spent in nested phases]
+        self._frame_start = None
+        self.enable(enabled)
+
+    def enable(self, enabled=True):
+        self.enabled = bool(enabled)
+        if self.enabled:
+            self.begin = self._begin
+            self.end = self._end
+            self.frame = self._frame
+        else:
+            self.begin = self.end = self.frame = _noop
+            del self._stack[:]
+            self._frame_start = None
+
+    def enable_next_frame(self):
+        """Enable at the next frame(), when no phase can be open.
+
+        Enabling mid-frame would let an end() whose begin() was a no-op
+        pop an empty stack.
+        """
+        if not self.enabled:
+            self.frame = self._enable_frame
+
+    def _enable_frame(self):
+        self.enable()
+        self._frame()
+
+    def section(self, name):
+        return _Section(self, name) if self.enabled else _NULL_SECTION
+
+    def wrap(self, func, name):
+        """func, timed as phase name whenever the profiler is enabled."""
+        def timed(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            self.begin(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.end()
+        return timed
+
+    def _begin(self, name):
+        self._stack.append([self._index[name], time.perf_counter(), 0.0])
+
+    def _end(self):
+        now = time.perf_counter()
+        phase, start, nested = self._stack.pop()
+        spent = now - start
+        self._totals[phase] += spent - nested
+        if self._stack:
+            self._stack[-1][2] += spent
+        if self.trace is not None:
+            self.trace.append((PHASES[phase], start, now))
+
+    def _frame(self):
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            totals = self._totals
+            # Whatever no phase claimed is the frame's own update code
+            totals[self._index[PHYSICS]] += max(now - self._frame_start - sum(totals), 0.0)
+            self.history[self.frames % len(self.history)] = totals
+            self.frames += 1
+            if self.trace is not None:
+                self.trace.append(("frame", self._frame_start, now))
+            self._totals = [0.0] * len(PHASES)
+        self._frame_start = now
+
+    # ----------------------------
+    # Results
+    # ----------------------------
+
+    def recent(self):
+        """(frames, phases) array of ms per phase, oldest frame first."""
+        n = min(self.frames, len(self.history))
+        start = self.frames % len(self.history)
+        return np.roll(self.history, -start, axis=0)[len(self.history) - n:] * 1e3
+
+    def means(self):
+        """Mean ms per phase over the recent frames, as a dict."""
+        recent = self.recent()
+        values = recent.mean(axis=0) if len(recent) else np.zeros(len(PHASES))
+        return dict(zip(PHASES, values.tolist()))
+
+    def write_trace(self, path):
+        """Write the trace events in Chrome's trace-event JSON format."""
+        events = self.trace or []
+        origin = min((start for _, start, _ in events), default=0.0)
+        frame = 0
+        out = []
+        for name, start, end in events:
+            event = {"name": name, "cat": "frame" if name == "frame" else "phase", "ph": "X",
+                     "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6, "pid": 0, "tid": 0}
+            if name == "frame":
+                event["args"] = {"frame": frame}
+                frame += 1
+            out.append(event)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+
+
+class _Section:
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.begin(self.name)
+
+    def __exit__(self, *exc):
+        self.profiler.end()
+        return False
+
+
+class _NullSection:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+DISABLED = Profiler(enabled=False, history=1)  # shared default for code that is rarely profiled
+
+
+# ----------------------------
+# HUD
+# ----------------------------
+
+class Hud:
+    """Draws a profiler's rolling frame-time graph and phase means."""
+
+    def __init__(self, profiler, visible=True):
+        self.profiler = profiler
+        self.visible = visible
+        self._font = None
+        self._colors = np.array([PHASE_COLORS[name] for name in PHASES] + [(0, 0, 0)], dtype=np.uint8)
+
+    def handle_key(self, key):
+        """Toggle on HUD_KEY; returns whether the key was used."""
+        import pygame
+
+        if pygame.key.name(key) != HUD_KEY:
+            return False
+        self.visible = not self.visible
+        if self.visible:
+            self.profiler.enable_next_frame()
+        return True
+
+    def draw(self, surface, pos=(10, 10)):
+        """Draw onto surface; returns the rect covered, or None when hidden."""
+        if not self.visible or not self.profiler.enabled:
+            return None
+        self.profiler.begin(HUD)
+        try:
+            return self._draw(surface, pos)
+        finally:
+            self.profiler.end()
+
+    def _draw(self, surface, pos):
+        import pygame
+
+        if self._font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(None, 18)
+        recent = self.profiler.recent()
+        width = len(self.profiler.history)
+        # Stacked bars: pixel row y of a frame's column takes the color of
+        # the phase its cumulative time has reached by then
+        tops = np.cumsum(recent, axis=1) * (HUD_HEIGHT / HUD_SCALE_MS)
+        rows = np.arange(HUD_HEIGHT)[::-1] + 0.5
+        phase = (rows[None, :, None] >= tops[:, None, :]).sum(axis=2)
+        pixels = np.zeros((width, HUD_HEIGHT, 3), dtype=np.uint8)
+        pixels[width - len(recent):] = self._colors[phase]
+        target = HUD_HEIGHT - int(TARGET_MS * HUD_HEIGHT / HUD_SCALE_MS)
+        pixels[:, target] = (255, 255, 255)
+        graph = pygame.surfarray.make_surface(pixels)
+
+        x, y = pos
+        means = self.profiler.means()
+        lines = ["frame %.2f ms" % sum(means.values())]
+        lines += ["%-9s %6.2f ms" % (name, means[name]) for name in PHASES if means[name] >= 0.005]
+        line_height = self._font.get_linesize()
+        panel = pygame.Rect(x, y, width + 130, max(HUD_HEIGHT, line_height * len(lines)) + 8)
+        surface.fill((0, 0, 0), panel)
+        surface.blit(graph, (x + 4, y + 4))
+        for i, text in enumerate(lines):
+            name = text.split()[0]
+            color = PHASE_COLORS.get(name, (255, 255, 255))
+            surface.blit(self._font.render(text, True, color), (x + width + 12, y + 4 + i * line_height))
+        return panel
+
+
+# ----------------------------
+# Profiling the model scripts
+# ----------------------------
+
+def _profiled_surface(profiler):
+    import pygame
+
+    class ProfiledSurface(pygame.Surface):
+        """Off-screen surface the script draws to; times fill and blit."""
+
+        def fill(self, *args, **kwargs):
+            profiler.begin(DRAW)
+            try:
+                return super().fill(*args, **kwargs)
+            finally:
+                profiler.end()
+
+        def blit(self, *args, **kwargs):
+            profiler.begin(DRAW)
+            try:
+                return super().blit(*args, **kwargs)
+            finally:
+                profiler.end()
+
+    return ProfiledSurface
+
+
+def _profiled_clock(profiler):
+    import pygame
+
+    real_clock = pygame.time.Clock
+
+    class ProfiledClock:
+        def __init__(self):
+            self.clock = real_clock()
+
+        def tick(self, framerate=0):
+            with profiler.section(WAIT):
+                return self.clock.tick(framerate)
+
+        def tick_busy_loop(self, framerate=0):
+            with profiler.section(WAIT):
+                return self.clock.tick_busy_loop(framerate)
+
+        def __getattr__(self, name):
+            return getattr(self.clock, name)
+
+    return ProfiledClock
+
+
+def profile_script(path, frames=0, seed=0, profiler=None, hud=True):
+    """Run a model script in a window with its frames profiled.
+
+    The script draws to an off-screen surface that display.flip copies to
+    the window, so its fill/blit calls can be timed. Stops after frames
+    frames (0: when the script exits). Returns the profiler.
+    """
+    import pygame
+
+    # hexsim.bench picks the dummy video driver on import unless one is
+    # set; open the display first so a real window is still used
+    pygame.display.init()
+    from hexsim.bench import COLLISION_HELPERS, DRAW_FUNCTIONS, FrameLimitReached
+
+    profiler = profiler or Profiler()
+    overlay = Hud(profiler, hud)
+    namespace = {"__name__": "__main__", "__file__": path, "__builtins__": builtins}
+    state = {"window": None, "surface": None, "wrapped": False}
+    surface_class = _profiled_surface(profiler)
+    saved = []
+
+    def patch(owner, name, value):
+        saved.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    real_set_mode = pygame.display.set_mode
+    real_get = pygame.event.get
+    real_flip = pygame.display.flip
+
+    def set_mode(size=(0, 0), *args, **kwargs):
+        state["window"] = real_set_mode(size, *args, **kwargs)
+        state["surface"] = surface_class(state["window"].get_size())
+        return state["surface"]
+
+    def event_get(*args, **kwargs):
+        if not state["wrapped"]:
+            state["wrapped"] = True
+            for name in COLLISION_HELPERS:
+                func = namespace.get(name)
+                if getattr(func, "__globals__", None) is namespace:
+                    namespace[name] = profiler.wrap(func, COLLISION)
+            profiler.frame()
+        with profiler.section(EVENTS):
+            events = real_get(*args, **kwargs)
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                overlay.handle_key(event.key)
+        return events
+
+    def flip(*args, **kwargs):
+        window = state["window"]
+        if window is not None:
+            with profiler.section(FLIP):
+                window.blit(state["surface"], (0, 0))
+            overlay.draw(window)
+            with profiler.section(FLIP):
+                real_flip()
+        profiler.frame()
+        if frames and profiler.frames >= frames:
+            raise FrameLimitReached()
+
+    patch(pygame.display, "set_mode", set_mode)
+    patch(pygame.display, "get_surface", lambda: state["surface"])
+    patch(pygame.display, "flip", flip)
+    patch(pygame.display, "update", flip)
+    patch(pygame.event, "get", event_get)
+    patch(pygame.time, "Clock", _profiled_clock(profiler))
+    for name in DRAW_FUNCTIONS:
+        patch(pygame.draw, name, profiler.wrap(getattr(pygame.draw, name), DRAW))
+
+    with open(path, encoding="utf-8") as f:
+        code = compile(f.read(), path, "exec")
+    random.seed(seed)
+    try:
+        exec(code, namespace)
+    except (FrameLimitReached, SystemExit):
+        pass
+    finally:
+        for owner, name, value in reversed(saved):
+            setattr(owner, name, value)
+        pygame.quit()
+    return profiler
+
+
+def print_means(profiler, title):
+    means = profiler.means()
+    print("%s: %d frames, %.2f ms/frame" % (title, profiler.frames, sum(means.values())))
+    for name in PHASES:
+        print("  %-10s %8.3f ms" % (name, means[name]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile a model script's frames by phase")
+    parser.add_argument("script")
+    parser.add_argument("--frames", type=int, default=0, help="stop after this many frames (0: run until closed)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace-event JSON file")
+    parser.add_argument("--no-hud", action="store_true", help="start with the overlay hidden")
+    args = parser.parse_args(argv)
+
+    profiler = Profiler(trace=bool(args.trace))
+    profile_script(args.script, args.frames, args.seed, profiler, hud=not args.no_hud)
+    print_means(profiler, model_name(args.script))
+    if args.trace:
+        profiler.write_trace(args.trace)
+        print("Wrote %s" % args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Compact binary trajectory recording and memory-mapped playback.
+
+File layout (little endian):
+
+  header  64 bytes   magic b"HEXTRAJ1", version u16, sides u16, balls u32,
+                     record size u32, ball radius f64, hexagon radius f64,
+                     center x/y f64, padding
+  record  fixed size frame u32, events u32, time f64, angle f64,
+                     angular velocity f64, then x, y, vx, vy f64 per ball
+
+Every record has the same size, so frame i starts at 64 + i * record_size
+and can be read straight out of a memory map without parsing anything
+before it. events is a bitmask of the hotkeys from
+"Gemini 2.0 Flash - Hotkeys.py" pressed during that frame.
+
+Writing happens on a background thread: the frame loop only packs the
+record into a buffer and hands full buffers over, it never touches disk.
+
+Usage:
+    python -m hexsim.viewer --record run.traj
+    python -m hexsim.recording info run.traj
+    python -m hexsim.recording play run.traj [--start FRAME]
+"""
+import argparse
+import mmap
+import queue
+import struct
+import threading
+
+import numpy as np
+
+MAGIC = b"HEXTRAJ1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHII4d")
+HEADER_SIZE = 64
+RECORD_HEAD = struct.Struct("<IIddd")
+FLUSH_BYTES = 1 << 16
+
+# Hotkey event bits
+EVENT_LEFT = 1 << 0      # a: counterclockwise
+EVENT_RIGHT = 1 << 1     # d: clockwise
+EVENT_FASTER = 1 << 2    # up: rotation speed up
+EVENT_SLOWER = 1 << 3    # down: rotation speed down
+EVENT_KICK = 1 << 4      # space: random kick
+EVENT_QUIT = 1 << 5
+EVENT_NAMES = {
+    EVENT_LEFT: "left",
+    EVENT_RIGHT: "right",
+    EVENT_FASTER: "faster",
+    EVENT_SLOWER: "slower",
+    EVENT_KICK: "kick",
+    EVENT_QUIT: "quit",
+}
+
+
+def record_size(balls):
+    return RECORD_HEAD.size + 32 * balls
+
+
+def record_dtype(balls):
+    """NumPy dtype of one record, for viewing the whole file as an array."""
+    return np.dtype([
+        ("frame", "<u4"),
+        ("events", "<u4"),
+        ("time", "<f8"),
+        ("angle", "<f8"),
+        ("angular_velocity", "<f8"),
+        ("balls", "<f8", (balls, 4)),
+    ])
+
+
+def event_names(events):
+    return [name for bit, name in EVENT_NAMES.items() if events & bit]
+
+
+class TrajectoryWriter:
+    """Appends fixed-size records to a file from a background thread."""
+
+    def __init__(self, path, engine):
+        self.path = path
+        self.balls = len(engine.balls)
+        self.frames = 0
+        self._state = np.empty((self.balls, 4))
+        self._buffer = bytearray()
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, "wb")
+        header = HEADER.pack(MAGIC, VERSION, engine.sides, self.balls, record_size(self.balls),
+                             engine.balls.radius, engine.radius, engine.center[0], engine.center[1])
+        self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+        self._thread = threading.Thread(target=self._run, name="trajectory-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, engine, events=0):
+        """Pack the engine's current state as the next frame."""
+        b = engine.balls
+        state = self._state
+        state[:, 0] = b.x
+        state[:, 1] = b.y
+        state[:, 2] = b.vx
+        state[:, 3] = b.vy
+        self._buffer += RECORD_HEAD.pack(self.frames, events, engine.time, engine.angle,
+                                         engine.angular_velocity)
+        self._buffer += state.tobytes()
+        self.frames += 1
+        if len(self._buffer) >= FLUSH_BYTES:
+            self._queue.put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self):
+        """Flush what's left and wait for the writer thread to finish."""
+        if self._buffer:
+            self._queue.put(bytes(self._buffer))
+            self._buffer.clear()
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            self._file.write(chunk)
+
+
+class Trajectory:
+    """Read-only, memory-mapped view of a recorded trajectory."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.sides, self.balls, size,
+         self.ball_radius, self.radius, cx, cy) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError("%s is not a trajectory file" % path)
+        if version != VERSION:
+            raise ValueError("%s has unsupported version %d" % (path, version))
+        self.center = (cx, cy)
+        self.record_size = size
+        self.frames = (len(self._map) - HEADER_SIZE) // size
+        self.records = np.frombuffer(self._map, dtype=record_dtype(self.balls),
+                                     count=self.frames, offset=HEADER_SIZE)
+
+    def __len__(self):
+        return self.frames
+
+    def frame(self, i):
+        """(frame, events, time, angle, angular_velocity, balls) for frame i.
+
+        balls is an (n, 4) array of x, y, vx, vy backed by the file.
+        """
+        if i < 0:
+            i += self.frames
+        if not 0 <= i < self.frames:
+            raise IndexError("frame %d out of range (%d frames)" % (i, self.frames))
+        r = self.records[i]
+        return int(r["frame"]), int(r["events"]), float(r["time"]), float(r["angle"]), \
+            float(r["angular_velocity"]), r["balls"]
+
+    def close(self):
+        self.records = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # frame arrays handed out still use it; freed with them
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# ----------------------------
+# Command line
+# ----------------------------
+
+def info(path):
+    with Trajectory(path) as traj:
+        print("%s: %d frames, %d ball(s), %d-sided polygon, %d bytes/frame"
+              % (path, len(traj), traj.balls, traj.sides, traj.record_size))
+        if len(traj):
+            r = traj.records
+            print("time %.3f .. %.3f s" % (r["time"][0], r["time"][-1]))
+            events = np.flatnonzero(r["events"])
+            for i in events[:20]:
+                print("  frame %6d  %s" % (r["frame"][i], ", ".join(event_names(int(r["events"][i])))))
+            if len(events) > 20:
+                print("  ... %d more frames with events" % (len(events) - 20))
+
+
+def play(path, start=0, fps=60):
+    import pygame
+
+    from hexsim.geometry import RegularPolygon
+
+    traj = Trajectory(path)
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    pygame.display.set_caption("Trajectory playback - %s" % path)
+    clock = pygame.time.Clock()
+    polygon = RegularPolygon(traj.center, traj.radius, traj.sides)
+    radius = int(traj.ball_radius)
+
+    i = start
+    paused = False
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                if event.key == pygame.K_LEFT:
+                    i = max(0, i - fps)
+                if event.key == pygame.K_RIGHT:
+                    i = min(len(traj) - 1, i + fps)
+        if len(traj) == 0:
+            break
+        _, _, _, angle, _, balls = traj.frame(i)
+        screen.fill((0, 0, 0))
+        pygame.draw.polygon(screen, (255, 255, 255), polygon.update(angle), 2)
+        for x, y in balls[:, :2].tolist():
+            pygame.draw.circle(screen, (255, 0, 0), (int(x), int(y)), radius)
+        pygame.display.flip()
+        if not paused:
+            i = min(len(traj) - 1, i + 1)
+        clock.tick(fps)
+
+    pygame.quit()
+    traj.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or replay a recorded trajectory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("info", help="print a summary of a recording")
+    p.add_argument("path")
+    p = sub.add_parser("play", help="replay a recording in a window")
+    p.add_argument("path")
+    p.add_argument("--start", type=int, default=0, help="first frame to show")
+    p.add_argument("--fps", type=int, default=60)
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        info(args.path)
+    else:
+        play(args.path, args.start, args.fps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Pluggable render backends.
+
+Everything here draws the same scene, a polygon outline and a set of
+equal-sized filled circles, through one small interface:
+
+  clear()                              start a frame
+  polygon(vertices, color, width)      closed outline
+  circles(x, y, radius, color)         filled circles at arrays of centers
+  present()                            show the frame, if there is anywhere to show it
+  pixels()                             the frame as an (h, w, 3) uint8 array, or None
+
+The backends, by name in RENDERERS:
+
+  null     draws nothing, for pure physics runs
+  pygame   pygame.draw onto a Surface (the window, or an off-screen one),
+           the same output as the scripts
+  numpy    a preallocated framebuffer of packed RGB pixels, one uint32
+           each, so a pixel is written with one store; circles are stamped
+           as a precomputed disc of pixel offsets, outlines as points one
+           pixel apart along each edge, all with array indexing and no
+           Python loop over balls or pixels. Needs neither SDL nor a display
+  ascii    a character grid written to a terminal with ANSI cursor moves,
+           for watching over SSH
+
+Usage:
+    python -m hexsim.render --balls 200 --frames 500
+    python -m hexsim.render --renderers ascii --frames 1 --cols 100 --rows 40
+"""
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+BACKGROUND = (0, 0, 0)
+ASCII_COLS = 80         # terminal columns for the whole window
+ASCII_ROWS = 30         # terminal rows; 80x30 cells keeps 800x600 at a 2:1 cell aspect
+OUTLINE_CHAR = "#"
+BALL_CHAR = "o"
+
+
+def _edge_points(vertices, spacing):
+    """Points at most spacing apart along every edge of a closed polygon, as (x, y) arrays."""
+    v = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+    d = np.roll(v, -1, axis=0) - v
+    counts = np.maximum(np.ceil(np.hypot(d[:, 0], d[:, 1]) / spacing).astype(np.intp), 1) + 1
+    edge = np.repeat(np.arange(len(v)), counts)
+    # Fraction along each edge: 0, 1/(n-1), ..., 1 per edge, without a loop
+    start = np.cumsum(counts) - counts
+    t = (np.arange(counts.sum()) - start[edge]) / (counts[edge] - 1)
+    return v[edge, 0] + t * d[edge, 0], v[edge, 1] + t * d[edge, 1]
+
+
+def _disc(rx, ry):
+    """(dy, dx) offsets of the cells inside an axis-aligned ellipse of radii rx, ry."""
+    ix, iy = int(rx), int(ry)
+    dy, dx = np.mgrid[-iy:iy + 1, -ix:ix + 1]
+    inside = (dx / max(rx, 1e-9)) ** 2 + (dy / max(ry, 1e-9)) ** 2 <= 1.0
+    inside[iy, ix] = True
+    return dy[inside], dx[inside]
+
+
+class NullRenderer:
+    """Draws nothing; also the interface the other backends implement."""
+
+    name = "null"
+
+    def __init__(self, width, height, background=BACKGROUND):
+        self.width = int(width)
+        self.height = int(height)
+        self.background = tuple(background)
+        self.frames = 0
+
+    def clear(self):
+        pass
+
+    def polygon(self, vertices, color, width=1):
+        pass
+
+    def circles(self, x, y, radius, color):
+        pass
+
+    def present(self):
+        self.frames += 1
+
+    def pixels(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class PygameRenderer(NullRenderer):
+    """pygame.draw onto surface (a new off-screen Surface if none is given).
+
+    present() flips the display only when surface is the display's.
+    """
+
+    name = "pygame"
+
+    def __init__(self, width, height, background=BACKGROUND, surface=None):
+        import pygame
+
+        super().__init__(width, height, background)
+        self._pygame = pygame
+        self.surface = surface if surface is not None else pygame.Surface((self.width, self.height))
+
+    def clear(self):
+        self.surface.fill(self.background)
+
+    def polygon(self, vertices, color, width=1):
+        self._pygame.draw.polygon(self.surface, color, [tuple(v) for v in vertices], width)
+
+    def circles(self, x, y, radius, color):
+        circle = self._pygame.draw.circle
+        r = int(radius)
+        for px, py in zip(np.asarray(x).tolist(), np.asarray(y).tolist()):
+            circle(self.surface, color, (int(px), int(py)), r)
+
+    def present(self):
+        self.frames += 1
+        if self.surface is self._pygame.display.get_surface():
+            self._pygame.display.flip()
+
+    def pixels(self):
+        from hexsim.export import surface_pixels
+
+        return surface_pixels(self.surface)
+
+
+def _pack(color):
+    """An RGB color as the uint32 whose little-endian bytes are R, G, B, 0."""
+    r, g, b = color[:3]
+    return np.uint32(r | g << 8 | b << 16)
+
+
+class FramebufferRenderer(NullRenderer):
+    """Rasterizes into a preallocated (h, w) array of packed pixels with NumPy.
+
+    scale resizes the frame: coordinates are multiplied by it, so a
+    half-size GIF is drawn at half size rather than shrunk afterwards.
+    """
+
+    name = "numpy"
+
+    def __init__(self, width, height, background=BACKGROUND, scale=1.0):
+        self.scale = float(scale)
+        super().__init__(max(1, round(width * self.scale)), max(1, round(height * self.scale)), background)
+        self.frame = np.empty((self.height, self.width), dtype="<u4")
+        self._flat = self.frame.reshape(-1)
+        self._background = _pack(self.background)
+        self._discs = {}
+        self.clear()
+
+    def clear(self):
+        self.frame.fill(self._background)
+
+    def _stamp(self, x, y, dy, dx, color):
+        """Set the pixels at every (x + dx, y + dy) inside the frame to color."""
+        x0, x1 = x + dx.min(), x + dx.max()
+        y0, y1 = y + dy.min(), y + dy.max()
+        whole = (x0 >= 0) & (x1 < self.width) & (y0 >= 0) & (y1 < self.height)
+        offsets = dy * self.width + dx
+        packed = _pack(color)
+        self._flat[((y[whole] * self.width + x[whole])[:, None] + offsets).ravel()] = packed
+        # Clip only the stamps that straddle an edge; ones wholly outside are skipped
+        part = ~whole & (x1 >= 0) & (x0 < self.width) & (y1 >= 0) & (y0 < self.height)
+        if part.any():
+            px = x[part, None] + dx
+            py = y[part, None] + dy
+            keep = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+            self._flat[py[keep] * self.width + px[keep]] = packed
+
+    def polygon(self, vertices, color, width=1):
+        x, y = _edge_points(np.asarray(vertices, dtype=np.float64) * self.scale, 1.0)
+        w = max(1, int(round(width * self.scale)))
+        # A w x w square per point, like pygame's thick lines
+        offsets = np.arange(w) - w // 2
+        dy, dx = np.meshgrid(offsets, offsets, indexing="ij")
+        self._stamp(np.round(x).astype(np.intp), np.round(y).astype(np.intp), dy.ravel(), dx.ravel(), color)
+
+    def circles(self, x, y, radius, color):
+        r = int(radius) * self.scale
+        disc = self._discs.get(r)
+        if disc is None:
+            disc = self._discs[r] = _disc(r, r)
+        # int() truncation, as the pygame path does
+        px = (np.asarray(x, dtype=np.float64) * self.scale).astype(np.intp)
+        py = (np.asarray(y, dtype=np.float64) * self.scale).astype(np.intp)
+        self._stamp(px, py, disc[0], disc[1], color)
+
+    def pixels(self):
+        return np.ascontiguousarray(self.frame.view(np.uint8).reshape(self.height, self.width, 4)[..., :3])
+
+
+class AsciiRenderer(NullRenderer):
+    """Draws into a cols x rows character grid and writes it to stream.
+
+    The first frame clears the terminal; later ones move the cursor home
+    and overwrite, so the picture stays in place. Colors are ignored.
+    """
+
+    name = "ascii"
+
+    def __init__(self, width, height, background=BACKGROUND, cols=ASCII_COLS, rows=ASCII_ROWS, stream=None):
+        super().__init__(width, height, background)
+        self.cols = int(cols)
+        self.rows = int(rows)
+        self.stream = stream if stream is not None else sys.stdout
+        self.cell_w = self.width / self.cols
+        self.cell_h = self.height / self.rows
+        self.grid = np.empty((self.rows, self.cols), dtype=np.uint8)
+        self._discs = {}
+        self.clear()
+
+    def clear(self):
+        self.grid.fill(ord(" "))
+
+    def _stamp(self, x, y, dy, dx, char):
+        cx = (np.asarray(x, dtype=np.float64) / self.cell_w).astype(np.intp)[:, None] + dx
+        cy = (np.asarray(y, dtype=np.float64) / self.cell_h).astype(np.intp)[:, None] + dy
+        ok = (cx >= 0) & (cx < self.cols) & (cy >= 0) & (cy < self.rows)
+        self.grid[cy[ok], cx[ok]] = ord(char)
+
+    def polygon(self, vertices, color, width=1):
+        x, y = _edge_points(vertices, min(self.cell_w, self.cell_h) / 2)
+        self._stamp(x, y, np.zeros(1, dtype=np.intp), np.zeros(1, dtype=np.intp), OUTLINE_CHAR)
+
+    def circles(self, x, y, radius, color):
+        r = float(radius)
+        disc = self._discs.get(r)
+        if disc is None:
+            disc = self._discs[r] = _disc(r / self.cell_w, r / self.cell_h)
+        self._stamp(x, y, disc[0], disc[1], BALL_CHAR)
+
+    def text(self):
+        return "\n".join(row.tobytes().decode("ascii") for row in self.grid)
+
+    def present(self):
+        self.stream.write(("\x1b[2J\x1b[H" if not self.frames else "\x1b[H") + self.text() + "\n")
+        self.stream.flush()
+        self.frames += 1
+
+    def close(self):
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+RENDERERS = {
+    "null": NullRenderer,
+    "pygame": PygameRenderer,
+    "numpy": FramebufferRenderer,
+    "ascii": AsciiRenderer,
+}
+
+
+def make_renderer(name, width, height, **options):
+    """The backend called name; options go to its constructor."""
+    if name not in RENDERERS:
+        raise ValueError("unknown renderer %r; choose from %s" % (name, ", ".join(RENDERERS)))
+    return RENDERERS[name](width, height, **options)
+
+
+def draw_scene(renderer, vertices, x, y, radius, outline=(255, 255, 255), fill=(255, 0, 0), width=2):
+    """One frame of the hexagon scene: the outline, then the balls."""
+    renderer.clear()
+    renderer.polygon(vertices, outline, width)
+    renderer.circles(x, y, radius, fill)
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+
+def main(argv=None):
+    from hexsim.engine import FPS, HEIGHT, WIDTH, make_engine
+
+    parser = argparse.ArgumentParser(description="Frames per second of each render backend")
+    parser.add_argument("--renderers", nargs="+", choices=list(RENDERERS), default=["null", "numpy", "pygame"])
+    parser.add_argument("--balls", type=int, default=200)
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--cols", type=int, default=ASCII_COLS, help="terminal columns (ascii)")
+    parser.add_argument("--rows", type=int, default=ASCII_ROWS, help="terminal rows (ascii)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for name in args.renderers:
+        options = {"cols": args.cols, "rows": args.rows} if name == "ascii" else {}
+        renderer = make_renderer(name, WIDTH, HEIGHT, **options)
+        engine = make_engine(args.balls, args.seed)
+        b = engine.balls
+        elapsed = 0.0
+        for _ in range(args.frames):
+            engine.step(1.0 / FPS)
+            start = time.perf_counter()
+            draw_scene(renderer, engine.polygon.update(engine.angle), b.x, b.y, b.radius)
+            renderer.present()
+            elapsed += time.perf_counter() - start
+        renderer.close()
+        rate = args.frames / elapsed if elapsed else math.inf
+        print("%-8s %6d frames in %7.3f s (%8.0f frames/s, %9.0f per minute)"
+              % (name, args.frames, elapsed, rate, rate * 60), file=sys.stderr if name == "ascii" else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Sandboxed, parallel, cached runs of the model scripts.
+
+hexsim.bench runs scripts in its own process, one after another, and
+trusts them to reach display.flip: a script that hangs before its first
+frame, recurses itself to death or takes the interpreter down with it
+takes the whole benchmark along. Here every script gets its own
+subprocess (python -m hexsim.bench on that one file), with
+
+  - the SDL dummy video and audio drivers, so nothing opens a window
+  - bench's frame limit, and a wall-clock --timeout after which the
+    process is killed ("timeout")
+  - an address-space limit (--memory, POSIX only)
+  - a working directory of its own, so stray files don't land in the repo
+
+and up to --workers of them run at once. Syntax errors and exceptions are
+reported by bench as usual ("syntax-error", "crashed"); a process that
+dies without writing a result is "died", with its exit code and the end
+of its stderr.
+
+Results are cached in CACHE_DIR under the SHA-256 of the script's bytes,
+bench.py's bytes and the run options, so rerunning after adding or
+editing one model output only runs that file.
+
+Usage:
+    python -m hexsim.runner --frames 600 --output runs.json
+    python -m hexsim.runner --timeout 5 --no-cache "DeepSeek R1 8B.py"
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from hexsim.scripts import REPO_ROOT, model_name, model_scripts
+
+CACHE_DIR = os.path.join(REPO_ROOT, ".hexsim-cache", "runs")
+TIMEOUT = 60.0          # seconds per script before it is killed
+MEMORY_LIMIT = 2048     # MiB of address space per script
+STDERR_TAIL = 2000      # characters of stderr kept for scripts that die
+
+_BENCH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench.py")
+
+
+def cache_key(path, options):
+    """Hash of the script, the harness that runs it and the run options."""
+    h = hashlib.sha256()
+    for name in (path, _BENCH):
+        with open(name, "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    h.update(json.dumps(options, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _limit_memory(mib):
+    def apply():
+        import resource
+
+        limit = mib * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    return apply
+
+
+def run_isolated(path, frames=600, warmup=60, seed=0, timeout=TIMEOUT, memory=MEMORY_LIMIT):
+    """Run one script in a fresh subprocess; returns bench's result dict.
+
+    process_s is added: the subprocess's wall time, start-up included.
+    """
+    path = os.path.abspath(path)
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    preexec = _limit_memory(memory) if memory and os.name == "posix" else None
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="hexsim-run-") as cwd:
+        output = os.path.join(cwd, "result.json")
+        command = [sys.executable, "-m", "hexsim.bench", path, "--frames", str(frames),
+                   "--warmup", str(warmup), "--seed", str(seed), "--output", output]
+        try:
+            proc = subprocess.run(command, cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                  timeout=timeout, preexec_fn=preexec)
+        except subprocess.TimeoutExpired:
+            return {"model": model_name(path), "script": os.path.basename(path), "status": "timeout",
+                    "error": "no result after %g s" % timeout, "frames": 0, "process_s": timeout}
+        if os.path.exists(output):
+            with open(output, encoding="utf-8") as f:
+                result = json.load(f)["results"][0]
+            result["process_s"] = time.perf_counter() - start
+            return result
+    stderr = proc.stderr.decode("utf-8", "replace")
+    return {"model": model_name(path), "script": os.path.basename(path), "status": "died",
+            "error": "exit code %d: %s" % (proc.returncode, stderr[-STDERR_TAIL:].strip()),
+            "frames": 0, "process_s": time.perf_counter() - start}
+
+
+class ResultCache:
+    """One JSON file per cache key."""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, result):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename, so a killed run never leaves half a file behind
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        os.replace(tmp, self._path(key))
+
+
+def run_all(scripts, frames=600, warmup=60, seed=0, timeout=TIMEOUT, memory=MEMORY_LIMIT,
+            workers=None, cache=None, progress=None):
+    """Run scripts in parallel, taking what it can from cache.
+
+    Returns results in the order of scripts; each has "cached" set to
+    whether it came from the cache. progress(result) is called as each one
+    finishes.
+    """
+    options = {"frames": frames, "warmup": warmup, "seed": seed, "timeout": timeout, "memory": memory}
+    results = [None] * len(scripts)
+    pending = {}
+    for i, path in enumerate(scripts):
+        key = cache_key(path, options)
+        hit = cache.get(key) if cache is not None else None
+        if hit is not None:
+            results[i] = dict(hit, cached=True)
+            if progress:
+                progress(results[i])
+        else:
+            pending[i] = key
+    if pending:
+        # Threads only wait on the subprocesses, which do the work
+        with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+            futures = {pool.submit(run_isolated, scripts[i], frames, warmup, seed, timeout, memory): i
+                       for i in pending}
+            for future in as_completed(futures):
+                i = futures[future]
+                result = future.result()
+                # A timeout may just mean a busy machine, so it isn't cached
+                if cache is not None and result["status"] != "timeout":
+                    cache.put(pending[i], result)
+                results[i] = dict(result, cached=False)
+                if progress:
+                    progress(results[i])
+    return results
+
+
+def main(argv=None):
+    from hexsim.bench import print_table
+
+    parser = argparse.ArgumentParser(description="Run every model script in its own sandboxed process")
+    parser.add_argument("scripts", nargs="*", help="scripts to run (default: every model script)")
+    parser.add_argument("--frames", type=int, default=600, help="measured frames per script")
+    parser.add_argument("--warmup", type=int, default=60, help="unmeasured frames before timing")
+    parser.add_argument("--seed", type=int, default=0, help="seed for scripts that use random")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="seconds before a script is killed")
+    parser.add_argument("--memory", type=int, default=MEMORY_LIMIT, help="MiB of address space (0: no limit)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--no-cache", action="store_true", help="rerun everything and don't store results")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    scripts = args.scripts or model_scripts()
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+
+    def progress(result):
+        sys.stderr.write("%-30s %-13s %s\n" % (result["model"][:30], result["status"],
+                                               "(cached)" if result["cached"] else "%.1f s" % result["process_s"]))
+
+    start = time.perf_counter()
+    results = run_all(scripts, args.frames, args.warmup, args.seed, args.timeout, args.memory,
+                      args.workers, cache, progress)
+    ran = sum(not r["cached"] for r in results)
+    print_table(results)
+    print("\n%d run, %d from cache, in %.1f s" % (ran, len(results) - ran, time.perf_counter() - start))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"frames": args.frames, "warmup": args.warmup, "seed": args.seed, "results": results}, f,
+                      indent=2)
+
+
+if __name__ == "__main__":
+    main()
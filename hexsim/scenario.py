@@ -0,0 +1,358 @@
+"""
+Scenario files, and reloading them into a running engine.
+
+Every script hard-codes its constants (GRAVITY, BALL_RESTITUTION,
+HEXAGON_ROTATION_SPEED, hex_radius, ball_radius, ...), so trying a new
+value means editing the script and starting pygame again. A scenario file
+(JSON, or TOML where tomllib is available) describes the scene instead,
+in the engine's units (pixels, seconds, radians):
+
+  polygon    sides, radius, center, angle
+  balls      count, radius, seed, speed, spread (one ball starts where
+             o3-mini's does; more are scattered as Balls.random)
+  forces     gravity, drag, restitution
+  rotation   speed, or a schedule of [time, speed] pairs, stepped or
+             smooth, optionally repeating every period seconds
+  engine     ccd, contacts, sectors, collide_balls, integrator, iterations
+
+Every section and field is optional; missing ones take the engine's
+defaults. load() parses and validates a file and compiles it to a
+Scenario: plain attributes plus the schedule as two sorted tuples, so all
+the per-frame work left is a bisect for the rotation speed.
+
+ScenarioWatcher is polled once per frame. It stats the file, and only
+when that changed does it read, validate and compile it again and apply
+the differences to the engine: forces and flags are assigned, a new
+polygon shape or ball radius is swapped in, and the balls are spawned
+again only when their count or spawn settings changed. polygon.angle
+only sets the starting angle; a changed one is reported, not applied. A file that
+doesn't validate is reported and the previous scenario stays in force.
+
+Usage:
+    python -m hexsim.scenario template > scene.json
+    python -m hexsim.scenario check scene.json
+    python -m hexsim.viewer --scenario scene.json
+"""
+import argparse
+import bisect
+import json
+import math
+import os
+import sys
+
+from hexsim import broadphase, integrators
+from hexsim.engine import (ANGULAR_VELOCITY, BALL_RADIUS, FPS, GRAVITY, HEX_CENTER, HEX_RADIUS, INTEGRATOR,
+                           ITERATIONS, NUM_SIDES, RESTITUTION, SPAWN_SPREAD, Balls, Engine)
+from hexsim.geometry import RegularPolygon
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON scenarios only
+    tomllib = None
+
+
+class ScenarioError(ValueError):
+    """A scenario file that can't be read or doesn't match the schema."""
+
+
+def _number(path, value, minimum=None, integer=False, positive=False):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or (integer and not isinstance(value, int)):
+        raise ScenarioError("%s: expected %s, got %r" % (path, "an integer" if integer else "a number", value))
+    if not math.isfinite(value):
+        raise ScenarioError("%s: must be finite, got %r" % (path, value))
+    if minimum is not None and value < minimum:
+        raise ScenarioError("%s: must be at least %r, got %r" % (path, minimum, value))
+    if positive and value <= 0:
+        raise ScenarioError("%s: must be positive, got %r" % (path, value))
+    return value if integer else float(value)
+
+
+def _flag(path, value):
+    if not isinstance(value, bool):
+        raise ScenarioError("%s: expected true or false, got %r" % (path, value))
+    return value
+
+
+def _point(path, value):
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ScenarioError("%s: expected [x, y], got %r" % (path, value))
+    return (_number(path + "[0]", value[0]), _number(path + "[1]", value[1]))
+
+
+def _integrator(path, value):
+    if value not in integrators.INTEGRATORS:
+        raise ScenarioError("%s: expected one of %s, got %r" % (path, ", ".join(integrators.INTEGRATORS), value))
+    return value
+
+
+def _schedule(path, value):
+    if not isinstance(value, (list, tuple)) or not value:
+        raise ScenarioError("%s: expected a list of [time, speed] pairs" % path)
+    out = []
+    for i, pair in enumerate(value):
+        t, speed = _point("%s[%d]" % (path, i), pair)
+        if t < 0 or (out and t <= out[-1][0]):
+            raise ScenarioError("%s[%d]: times must be non-negative and increasing, got %r" % (path, i, t))
+        out.append((t, speed))
+    return out
+
+
+# section -> field -> (validator, default)
+SCHEMA = {
+    "polygon": {
+        "sides": (lambda p, v: _number(p, v, minimum=3, integer=True), NUM_SIDES),
+        "radius": (lambda p, v: _number(p, v, positive=True), float(HEX_RADIUS)),
+        "center": (_point, (float(HEX_CENTER[0]), float(HEX_CENTER[1]))),
+        "angle": (_number, 0.0),
+    },
+    "balls": {
+        "count": (lambda p, v: _number(p, v, minimum=1, integer=True), 1),
+        "radius": (lambda p, v: _number(p, v, positive=True), float(BALL_RADIUS)),
+        "seed": (lambda p, v: _number(p, v, minimum=0, integer=True), 0),
+        "speed": (lambda p, v: _number(p, v, minimum=0), 300.0),
+        "spread": (lambda p, v: _number(p, v, minimum=0), SPAWN_SPREAD),
+    },
+    "forces": {
+        "gravity": (_number, GRAVITY),
+        "drag": (lambda p, v: _number(p, v, minimum=0), 0.0),
+        "restitution": (lambda p, v: _number(p, v, minimum=0), RESTITUTION),
+    },
+    "rotation": {
+        "speed": (_number, ANGULAR_VELOCITY),
+        "schedule": (_schedule, None),
+        "smooth": (_flag, False),
+        "period": (lambda p, v: _number(p, v, positive=True), None),
+    },
+    "engine": {
+        "ccd": (_flag, False),
+        "contacts": (_flag, False),
+        "sectors": (_flag, False),
+        "collide_balls": (_flag, False),
+        "integrator": (_integrator, INTEGRATOR),
+        "iterations": (lambda p, v: _number(p, v, minimum=1, integer=True), ITERATIONS),
+    },
+}
+
+# Fields that decide where balls start; changing any of them spawns them again
+SPAWN_FIELDS = ("count", "seed", "speed", "spread")
+
+
+class Scenario:
+    """A validated scenario, flattened to what the engine needs.
+
+    Sections become dicts of their fields (polygon, balls, forces,
+    rotation, engine); the rotation schedule is also kept as the sorted
+    tuples times and speeds.
+    """
+
+    def __init__(self, sections):
+        for name, fields in sections.items():
+            setattr(self, name, fields)
+        schedule = self.rotation["schedule"] or []
+        self.times = tuple(t for t, _ in schedule)
+        self.speeds = tuple(s for _, s in schedule)
+        if self.engine["ccd"] and self.engine["integrator"] != INTEGRATOR:
+            raise ScenarioError("engine.ccd: ccd moves balls in straight lines and needs the %s integrator"
+                                % INTEGRATOR)
+
+    def angular_velocity(self, t):
+        """Rotation speed at simulated time t."""
+        if not self.times:
+            return self.rotation["speed"]
+        if self.rotation["period"]:
+            t %= self.rotation["period"]
+        i = bisect.bisect_right(self.times, t) - 1
+        if i < 0:
+            # Before the first entry: the plain speed
+            return self.rotation["speed"]
+        if not self.rotation["smooth"] or i + 1 == len(self.times):
+            return self.speeds[i]
+        t0, t1 = self.times[i], self.times[i + 1]
+        return self.speeds[i] + (self.speeds[i + 1] - self.speeds[i]) * (t - t0) / (t1 - t0)
+
+    def spawn(self):
+        """Fresh Balls for this scenario."""
+        b = self.balls
+        center = self.polygon["center"]
+        if b["count"] == 1:
+            # o3-mini's starting state, relative to the polygon
+            return Balls.single(center[0] + 100, center[1] - 50, 3 * FPS, -5 * FPS, b["radius"])
+        return Balls.random(b["count"], center=center, spread=b["spread"], speed=b["speed"],
+                            radius=b["radius"], seed=b["seed"])
+
+    def make_engine(self):
+        p, f, e = self.polygon, self.forces, self.engine
+        return Engine(self.spawn(), center=p["center"], radius=p["radius"], sides=p["sides"], angle=p["angle"],
+                      angular_velocity=self.angular_velocity(0.0), gravity=f["gravity"],
+                      restitution=f["restitution"], iterations=e["iterations"], ccd=e["ccd"],
+                      ball_collisions=e["collide_balls"], sectors=e["sectors"], contacts=e["contacts"],
+                      integrator=e["integrator"], drag=f["drag"])
+
+    def apply(self, engine, previous=None):
+        """Bring a running engine in line with this scenario; returns what changed.
+
+        previous is the scenario the engine was last given, so only the
+        differences are applied (the angle is never reset, and the balls
+        keep moving unless their spawn settings changed).
+        """
+        old = previous or Scenario(validate({}))
+        changes = []
+        p, b, f, e = self.polygon, self.balls, self.forces, self.engine
+        if (p["sides"], p["radius"], p["center"]) != (old.polygon["sides"], old.polygon["radius"],
+                                                      old.polygon["center"]):
+            engine.polygon = RegularPolygon(p["center"], p["radius"], p["sides"])
+            engine.solver.reset()
+            changes.append("polygon")
+        if p["angle"] != old.polygon["angle"]:
+            # The angle is the running engine's; only a fresh engine starts at it
+            changes.append("polygon.angle (not applied on reload)")
+        if any(b[k] != old.balls[k] for k in SPAWN_FIELDS):
+            engine.balls = self.spawn()
+            engine.solver.reset()
+            changes.append("balls")
+        elif b["radius"] != old.balls["radius"]:
+            engine.balls.radius = b["radius"]
+            engine.solver.reset()
+            changes.append("balls.radius")
+        if engine.balls.radius * 2 != engine._grid.cell_size:
+            engine._grid = broadphase.SpatialHash(2 * engine.balls.radius)
+        for name in ("gravity", "drag", "restitution"):
+            if f[name] != getattr(engine, name):
+                setattr(engine, name, f[name])
+                changes.append("forces." + name)
+        for name, attr in (("ccd", "ccd"), ("contacts", "contacts"), ("sectors", "sectors"),
+                           ("collide_balls", "ball_collisions"), ("integrator", "integrator"),
+                           ("iterations", "iterations")):
+            if e[name] != getattr(engine, attr):
+                setattr(engine, attr, e[name])
+                changes.append("engine." + name)
+        if self.rotation != old.rotation:
+            engine.angular_velocity = self.angular_velocity(engine.time)
+            changes.append("rotation")
+        return changes
+
+
+def validate(data):
+    """Check parsed scenario data against SCHEMA; returns every section with defaults filled in."""
+    if not isinstance(data, dict):
+        raise ScenarioError("a scenario is a table of sections, got %r" % (data,))
+    unknown = sorted(set(data) - set(SCHEMA))
+    if unknown:
+        raise ScenarioError("unknown section %s (expected %s)" % (", ".join(unknown), ", ".join(SCHEMA)))
+    sections = {}
+    for section, fields in SCHEMA.items():
+        given = data.get(section, {})
+        if not isinstance(given, dict):
+            raise ScenarioError("%s: expected a table, got %r" % (section, given))
+        unknown = sorted(set(given) - set(fields))
+        if unknown:
+            raise ScenarioError("%s: unknown field %s (expected %s)" % (section, ", ".join(unknown),
+                                                                       ", ".join(fields)))
+        sections[section] = {name: check("%s.%s" % (section, name), given[name]) if name in given else default
+                             for name, (check, default) in fields.items()}
+    return sections
+
+
+def parse(text, path):
+    """Scenario data from the text of a .json or .toml file."""
+    try:
+        if path.endswith(".toml"):
+            if tomllib is None:
+                raise ScenarioError("%s: TOML scenarios need Python 3.11 (tomllib); use JSON" % path)
+            return tomllib.loads(text)
+        return json.loads(text)
+    except ValueError as e:
+        if isinstance(e, ScenarioError):
+            raise
+        raise ScenarioError("%s does not parse: %s" % (path, e))
+
+
+def load(path):
+    """Read, validate and compile the scenario file at path."""
+    with open(path, encoding="utf-8") as f:
+        return Scenario(validate(parse(f.read(), path)))
+
+
+class ScenarioWatcher:
+    """Reloads a scenario file into an engine when it changes.
+
+    Call poll() once per frame; it costs one stat() unless the file
+    changed. on_error(message) is called for a file that doesn't load
+    (the default writes it to stderr).
+    """
+
+    def __init__(self, path, engine=None, on_error=None):
+        self.path = path
+        self.scenario = load(path)
+        self.engine = engine if engine is not None else self.scenario.make_engine()
+        self.on_error = on_error or (lambda message: sys.stderr.write("scenario: %s\n" % message))
+        self.reloads = 0
+        self._stamp = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self):
+        """Apply the file if it changed since the last poll; returns the changes made."""
+        stamp = self._stat()
+        if stamp == self._stamp or stamp is None:
+            self.update()
+            return []
+        self._stamp = stamp
+        try:
+            scenario = load(self.path)
+        except (OSError, ScenarioError) as e:
+            self.on_error(str(e))
+            return []
+        changes = scenario.apply(self.engine, self.scenario)
+        self.scenario = scenario
+        self.reloads += 1
+        self.update()
+        return changes
+
+    def update(self):
+        """Follow the rotation schedule, if there is one, at the engine's time."""
+        if self.scenario.times:
+            self.engine.angular_velocity = self.scenario.angular_velocity(self.engine.time)
+
+
+def template():
+    """The default scenario, every field spelled out."""
+    sections = validate({})
+    sections["rotation"]["schedule"] = [[0.0, ANGULAR_VELOCITY], [10.0, -ANGULAR_VELOCITY]]
+    sections["rotation"]["period"] = 20.0
+    return sections
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check scenario files or write a template")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("check", help="validate scenario files")
+    p.add_argument("paths", nargs="+")
+    sub.add_parser("template", help="print a scenario with every field, as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "template":
+        print(json.dumps(template(), indent=2))
+        return
+    failed = 0
+    for path in args.paths:
+        try:
+            scenario = load(path)
+        except (OSError, ScenarioError) as e:
+            failed += 1
+            print("FAIL %s: %s" % (path, e))
+            continue
+        print("ok   %s: %d-gon, %d ball(s), gravity %g, rotation %s" % (
+            path, scenario.polygon["sides"], scenario.balls["count"], scenario.forces["gravity"],
+            "%d-entry schedule" % len(scenario.times) if scenario.times else "%g rad/s" % scenario.rotation["speed"]))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
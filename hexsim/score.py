@@ -0,0 +1,252 @@
+"""
+Physics-realism scorer for the model outputs.
+
+Each script's physics (the ports in hexsim.models) is run headless and its
+whole trajectory is kept as arrays, so the metrics below are computed in a
+few NumPy passes rather than per frame:
+
+  containment   signed distance of the ball's center from the hexagon for
+                every frame at once (a batch is_point_inside_hexagon);
+                positive means outside
+  escape        time of the first frame the center is outside
+  penetration   how far the ball overlaps a wall before it escapes, as a
+                fraction of its radius
+  energy drift  relative change of kinetic + potential energy across each
+                bounce, and per second of free flight
+
+A bounce is a run of frames whose velocity change isn't explained by
+gravity (and, for Claude, friction). Scripts that don't run score "-".
+
+Usage:
+    python -m hexsim.score [--frames 3600] [--seeds 4] [--update-readme]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+from hexsim.models import MODELS
+from hexsim.scripts import REPO_ROOT, model_name, model_scripts
+
+BOUNCE_THRESHOLD = 0.05   # velocity change beyond gravity, relative to speed, that counts as a bounce
+ENERGY_GAIN_LIMIT = 0.05  # mean relative energy gained per bounce that stops being plausible
+PENETRATION_LIMIT = 0.5   # overlap with a wall, in ball radii, that is visibly wrong
+
+# README column header -> script name
+README_COLUMNS = {
+    "DeepSeek R1 8b": "DeepSeek R1 8B",
+    "DeepSeek R1 14b": "DeepSeek R1 14B",
+    "DeepSeek R1 32b": "DeepSeek R1 32B",
+    "DeepSeek R1 70b": "DeepSeek R1 70B",
+    "DeepSeek R1 671b": "DeepSeek R1",
+    "ChatGPT o3-mini": "ChatGPT o3-mini",
+    "Gemini 2.0 Flash Exp (4000 output tok)": "Gemini 2.0 Flash",
+    "Gemini 2.0 Flash Exp (8192 output tok)": "Gemini 2.0 Flash 8192 tok",
+    "Gemini 2.0 Pro Exp": "Gemini 2.0 Pro",
+    "Claude 3.5 Sonnet": "Claude 3.5 Sonnet",
+}
+README_ROW = "Realistic Physics?"
+VERDICTS = {"realistic": "✅", "partly": "🔶", "unrealistic": "❌", "does not run": "-"}
+
+
+def trajectory(model, frames):
+    """Step model for frames; returns an (frames + 1, 5) array of x, y, vx, vy, angle."""
+    out = np.empty((frames + 1, 5))
+    out[0] = model.state()
+    for i in range(1, frames + 1):
+        model.step()
+        out[i] = model.state()
+    return out
+
+
+def signed_distances(polygon, angles, x, y):
+    """Vectorized models.signed_distance: one value per (angle, x, y) triple."""
+    c, s = np.cos(angles), np.sin(angles)
+    rx = x - polygon.center[0]
+    ry = y - polygon.center[1]
+    local = np.stack((c * rx + s * ry, c * ry - s * rx), axis=1)
+    return (-(local @ np.array(polygon.unit_normals).T)).max(axis=1) - polygon.apothem
+
+
+def _runs(mask):
+    """(start, end) index pairs of the runs of True in mask, end exclusive."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def metrics(model, traj):
+    """Realism metrics of one trajectory of model (see the module docstring)."""
+    x, y, vx, vy, angle = traj.T
+    dt = model.frame_dt
+    radius = model.ball_radius
+    g = model.gravity * model.gravity_unit
+
+    distance = signed_distances(model.polygon, angle, x, y)
+    outside = distance > 0
+    escaped = bool(outside.any())
+    escape_frame = int(np.argmax(outside)) if escaped else len(traj)
+
+    # Only the frames before the escape say anything about the walls
+    contained = slice(0, escape_frame)
+    overlap = np.maximum(distance[contained] + radius, 0) / radius
+    touching = overlap > 0
+
+    # Energy per unit mass, measured from the bottom of the circumscribed
+    # circle. Every script updates velocity before position; the extra
+    # g * dt * vy / 2 term makes that scheme conserve this exactly in flight.
+    speed = np.hypot(vx, vy) * model.velocity_unit
+    floor = model.polygon.center[1] + model.polygon.radius
+    energy = 0.5 * speed ** 2 + g * (floor - y) + 0.5 * g * dt * vy * model.velocity_unit
+
+    # Velocity change per frame minus what gravity and friction alone would
+    # do; Claude adds gravity, then scales the whole velocity by friction
+    f = getattr(model, "friction", 1.0)
+    dvx = (vx[1:] - f * vx[:-1]) * model.velocity_unit
+    dvy = (vy[1:] - f * vy[:-1]) * model.velocity_unit - f * g * dt
+    kick = np.hypot(dvx, dvy)
+    bounce = kick > BOUNCE_THRESHOLD * (speed[:-1] + g * dt)
+    bounce[escape_frame:] = False
+    starts, ends = _runs(bounce)
+
+    # Energy just before each bounce vs. just after it
+    before = energy[starts]
+    after = energy[ends]
+    valid = before > 0
+    bounce_drift = (after[valid] - before[valid]) / before[valid]
+
+    flight = ~bounce[:max(escape_frame - 1, 0)]
+    e0 = energy[:-1][:len(flight)][flight]
+    e1 = energy[1:][:len(flight)][flight]
+    flight_drift = np.abs(e1 - e0) / np.maximum(e0, 1e-9) / dt if len(e0) else np.zeros(0)
+
+    return {
+        "frames": len(traj) - 1,
+        "escaped": escaped,
+        "escape_time_s": escape_frame * dt if escaped else None,
+        "outside_fraction": float(outside.mean()),
+        "contact_fraction": float(touching.mean()) if escape_frame else 0.0,
+        "max_penetration": float(overlap.max()) if escape_frame else 0.0,
+        "mean_penetration": float(overlap[touching].mean()) if touching.any() else 0.0,
+        "bounces": int(len(starts)),
+        "energy_drift_per_bounce": float(bounce_drift.mean()) if len(bounce_drift) else 0.0,
+        "max_energy_gain_per_bounce": float(bounce_drift.max()) if len(bounce_drift) else 0.0,
+        "flight_drift_per_s": float(np.median(flight_drift)) if len(flight_drift) else 0.0,
+    }
+
+
+def verdict(m):
+    """realistic / partly / unrealistic for one metrics dict."""
+    if m["escaped"] or m["energy_drift_per_bounce"] > ENERGY_GAIN_LIMIT:
+        return "unrealistic"
+    if m["max_penetration"] > PENETRATION_LIMIT or m["bounces"] == 0:
+        return "partly"
+    return "realistic"
+
+
+def _worst(results):
+    """Combine per-seed metrics, keeping the least flattering value of each."""
+    worst = dict(results[0])
+    for m in results[1:]:
+        worst["escaped"] = worst["escaped"] or m["escaped"]
+        times = [t for t in (worst["escape_time_s"], m["escape_time_s"]) if t is not None]
+        worst["escape_time_s"] = min(times) if times else None
+        for key in ("outside_fraction", "max_penetration", "mean_penetration",
+                    "energy_drift_per_bounce", "max_energy_gain_per_bounce", "flight_drift_per_s"):
+            worst[key] = max(worst[key], m[key])
+    return worst
+
+
+def runs(path):
+    """Whether the unmodified script gets through a few frames."""
+    from hexsim.bench import run_script
+
+    return run_script(path, frames=10, warmup=0)["status"] == "ok"
+
+
+def score(path, frames=3600, seeds=4):
+    """Score one script; returns a dict with its metrics and verdict."""
+    name = model_name(path)
+    result = {"model": name, "runs": runs(path)}
+    if not result["runs"]:
+        result["verdict"] = "does not run"
+        return result
+    cls = MODELS.get(name)
+    if cls is None:
+        result["verdict"] = "no port"
+        return result
+    per_seed = []
+    for seed in range(seeds if cls.random_start else 1):
+        model = cls(seed=seed)
+        per_seed.append(metrics(model, trajectory(model, frames)))
+    result.update(_worst(per_seed))
+    result["verdict"] = verdict(result)
+    return result
+
+
+# ----------------------------
+# Output
+# ----------------------------
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def print_table(results, out=sys.stdout):
+    out.write("%-28s %-12s %8s %8s %8s %8s %10s %10s\n" % (
+        "model", "verdict", "escape s", "outside", "pen max", "bounces", "dE/bounce", "dE/s fly"))
+    for r in results:
+        out.write("%-28s %-12s %8s %8s %8s %8s %10s %10s\n" % (
+            r["model"][:28], r["verdict"], _fmt(r.get("escape_time_s"), ".2f"),
+            _fmt(r.get("outside_fraction"), ".1%"), _fmt(r.get("max_penetration"), ".2f"),
+            _fmt(r.get("bounces"), "d"), _fmt(r.get("energy_drift_per_bounce"), "+.1%"),
+            _fmt(r.get("flight_drift_per_s"), ".2%")))
+
+
+def update_readme(results, path=os.path.join(REPO_ROOT, "README.md")):
+    """Rewrite the README's "Realistic Physics?" row from results."""
+    by_name = {r["model"]: r for r in results}
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    for i, line in enumerate(lines):
+        if line.startswith("|") and line.strip("| ").startswith(README_ROW):
+            break
+    else:
+        raise ValueError("no %r row in %s" % (README_ROW, path))
+    top = i
+    while top > 0 and lines[top - 1].startswith("|"):
+        top -= 1
+    header = re.findall(r"[^|]+", lines[top])
+    cells = re.findall(r"[^|]+", line)
+    for col, title in enumerate(header):
+        r = by_name.get(README_COLUMNS.get(title.strip()))
+        if r is not None and r["verdict"] in VERDICTS:
+            width = len(cells[col])
+            cells[col] = (" " + VERDICTS[r["verdict"]]).ljust(width)
+    lines[i] = "|" + "|".join(cells) + "|"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score the physics of every model script")
+    parser.add_argument("scripts", nargs="*", help="scripts to score (default: all)")
+    parser.add_argument("--frames", type=int, default=3600)
+    parser.add_argument("--seeds", type=int, default=4, help="seeds for scripts with random starts")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--update-readme", action="store_true", help="fill in the README results table")
+    args = parser.parse_args(argv)
+
+    results = [score(path, args.frames, args.seeds) for path in args.scripts or model_scripts()]
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.update_readme:
+        update_readme(results)
+
+
+if __name__ == "__main__":
+    main()
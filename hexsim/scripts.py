@@ -0,0 +1,15 @@
+"""Locate the model outputs that live at the top level of the repository."""
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def model_scripts(root=REPO_ROOT):
+    """Return the paths of every "<Model>.py" script in root, sorted by name."""
+    names = [n for n in os.listdir(root) if n.endswith(".py") and not n.startswith(".")]
+    return [os.path.join(root, n) for n in sorted(names)]
+
+
+def model_name(path):
+    """Turn "DeepSeek R1 70B.py" into "DeepSeek R1 70B"."""
+    return os.path.splitext(os.path.basename(path))[0]
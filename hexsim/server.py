@@ -0,0 +1,455 @@
+"""
+Asyncio simulation server streaming engine state to any number of clients.
+
+One authoritative Engine runs on a fixed tick. After every tick the state is
+quantized (positions to 1/POSITION_SCALE px, velocities to
+1/VELOCITY_SCALE px/s, int16) and each connected client is sent either a
+keyframe or the delta from the last state *it* received, zlib-compressed.
+Consecutive states differ by small amounts, so deltas compress far better
+than the raw arrays. int16 holds positions up to 2047 px and velocities
+up to 8191 px/s; a state with anything beyond that (an escaped ball soon
+falls past both) is sent whole as float64 instead of being clipped, and
+deltas resume from a fresh keyframe once it fits again.
+
+Every client has its own sender task that only ever sends the newest state.
+A client that can't keep up (full socket buffer) simply skips states: the
+tick never waits on a client, and the next delta is taken from whatever
+that client last got, so nothing has to be resent.
+
+Clients send the hotkeys of "Gemini 2.0 Flash - Hotkeys.py" as
+recording.EVENT_* bitmasks; they are applied at the next tick and passed
+on to every client with the state they were applied to.
+
+Wire format: every message is a little-endian u32 length followed by that
+many bytes, the first of which is the message type:
+
+  HELLO    JSON: sides, radius, center, balls, ball radius, tick, scales
+  KEYFRAME SNAPSHOT header + zlib(int16 x, y, vx, vy)
+  DELTA    SNAPSHOT header + base frame u32 + zlib(int16 differences)
+  EXACT    SNAPSHOT header + u32 0 + zlib(float64 x, y, vx, vy)
+  CONTROL  (client -> server) u32 event bits
+
+Usage:
+    python -m hexsim.server serve --balls 500 [--port 8765 | --unix /tmp/hexsim.sock]
+    python -m hexsim.server view [--port 8765 | --unix /tmp/hexsim.sock]
+    python -m hexsim.server record run.traj --frames 3600
+"""
+import argparse
+import asyncio
+import json
+import socket
+import struct
+import sys
+import threading
+import zlib
+
+import numpy as np
+
+from hexsim.controls import Controls
+from hexsim.engine import BALL_RADIUS, FPS, Balls, Engine
+
+HOST = "127.0.0.1"
+PORT = 8765
+POSITION_SCALE = 16.0   # quantization steps per pixel
+VELOCITY_SCALE = 4.0    # quantization steps per pixel/second
+COMPRESSION = 1         # zlib level; the deltas are mostly zeros and small values
+MAX_MESSAGE = 1 << 26   # larger length prefixes are treated as a broken stream
+MAX_LAG = 0.25          # seconds the tick may fall behind before it stops catching up
+
+MSG_HELLO = 1
+MSG_KEYFRAME = 2
+MSG_DELTA = 3
+MSG_EXACT = 4
+MSG_CONTROL = 16
+
+LENGTH = struct.Struct("<I")
+SNAPSHOT = struct.Struct("<BIdddI")  # type, frame, time, angle, angular velocity, events
+BASE = struct.Struct("<I")
+CONTROL = struct.Struct("<BI")
+
+_LIMIT = np.iinfo(np.int16)
+
+
+def quantize(balls, out=None):
+    """(4, n) int16 array of x, y, vx, vy in wire units."""
+    scales = ((balls.x, POSITION_SCALE), (balls.y, POSITION_SCALE),
+              (balls.vx, VELOCITY_SCALE), (balls.vy, VELOCITY_SCALE))
+    if out is None:
+        out = np.empty((4, len(balls)), dtype=np.int16)
+    for row, (values, scale) in zip(out, scales):
+        np.copyto(row, np.clip(np.rint(values * scale), _LIMIT.min, _LIMIT.max), casting="unsafe")
+    return out
+
+
+def fits(balls):
+    """Whether quantize() can represent balls without clipping; NaN never fits."""
+    position = max(np.abs(balls.x).max(), np.abs(balls.y).max()) * POSITION_SCALE
+    velocity = max(np.abs(balls.vx).max(), np.abs(balls.vy).max()) * VELOCITY_SCALE
+    return bool(position <= _LIMIT.max and velocity <= _LIMIT.max)
+
+
+def dequantize(q, balls):
+    """Write wire-unit state q into balls."""
+    np.multiply(q[0], 1.0 / POSITION_SCALE, out=balls.x)
+    np.multiply(q[1], 1.0 / POSITION_SCALE, out=balls.y)
+    np.multiply(q[2], 1.0 / VELOCITY_SCALE, out=balls.vx)
+    np.multiply(q[3], 1.0 / VELOCITY_SCALE, out=balls.vy)
+
+
+def _message(payload):
+    return LENGTH.pack(len(payload)) + payload
+
+
+# ----------------------------
+# Server
+# ----------------------------
+
+class _Client:
+    def __init__(self, writer):
+        self.writer = writer
+        self.wake = asyncio.Event()
+        self.frame = None   # last frame sent
+        self.state = None   # and its quantized state, the base of the next delta
+        self.events = 0     # hotkeys applied since then
+
+
+class SimulationServer:
+    """Steps an engine at a fixed rate and streams it to clients."""
+
+    def __init__(self, engine, dt=1.0 / FPS):
+        self.engine = engine
+        self.dt = dt
+        self.controls = Controls(engine)
+        self.frame = 0
+        self.clients = set()
+        self.pending_events = 0
+        self.dropped = 0       # states skipped by slow clients
+        self.exact_states = 0  # states too large for int16, sent as float64
+        self._snapshot()
+        self.header = self._header()
+        self._encoded = {}     # base frame (None: keyframe, "exact") -> body, for the current state
+        self._server = None
+
+    def hello(self):
+        e = self.engine
+        info = {
+            "sides": e.sides, "radius": e.radius, "center": list(e.center),
+            "balls": len(e.balls), "ball_radius": e.balls.radius, "dt": self.dt,
+            "position_scale": POSITION_SCALE, "velocity_scale": VELOCITY_SCALE,
+        }
+        return _message(bytes([MSG_HELLO]) + json.dumps(info).encode())
+
+    def tick(self):
+        """Apply pending controls, step once and publish the new state."""
+        events, self.pending_events = self.pending_events, 0
+        self.controls.apply(events)
+        self.engine.step(self.dt)
+        self.frame += 1
+        self._snapshot()
+        self.header = self._header()
+        self._encoded = {}
+        for client in self.clients:
+            client.events |= events
+            if client.frame is not None and client.wake.is_set():
+                self.dropped += 1
+            client.wake.set()
+
+    def _snapshot(self):
+        """Quantize the engine's balls into self.state, or, when they don't
+        fit, leave state None and keep them in self.exact."""
+        b = self.engine.balls
+        if fits(b):
+            self.state, self.exact = quantize(b), None
+        else:
+            self.state, self.exact = None, np.stack((b.x, b.y, b.vx, b.vy))
+            self.exact_states += 1
+
+    def _header(self):
+        e = self.engine
+        return (self.frame, e.time, e.angle, e.angular_velocity)
+
+    def encode(self, client):
+        """Message bringing client from the state it has to the current one."""
+        # A client whose last state was exact has no int16 base: keyframe
+        base = client.frame if client.state is not None else None
+        if self.state is None:
+            kind, base = MSG_EXACT, "exact"
+        else:
+            kind = MSG_KEYFRAME if base is None else MSG_DELTA
+        body = self._encoded.get(base)
+        if body is None:
+            if kind == MSG_EXACT:
+                body = BASE.pack(0) + zlib.compress(self.exact.tobytes(), COMPRESSION)
+            elif kind == MSG_KEYFRAME:
+                body = BASE.pack(0) + zlib.compress(self.state.tobytes(), COMPRESSION)
+            else:
+                delta = self.state - client.state  # int16 wrap-around undoes itself on the other end
+                body = BASE.pack(base) + zlib.compress(delta.tobytes(), COMPRESSION)
+            self._encoded[base] = body
+        return _message(SNAPSHOT.pack(kind, *self.header, client.events) + body)
+
+    async def run(self):
+        """Tick forever at 1/dt Hz, catching up (within MAX_LAG) after slow ticks."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            self.tick()
+            next_tick += self.dt
+            delay = next_tick - loop.time()
+            if delay < -MAX_LAG:
+                next_tick = loop.time()
+                delay = 0.0
+            await asyncio.sleep(max(delay, 0.0))
+
+    async def handle(self, reader, writer):
+        client = _Client(writer)
+        writer.write(self.hello())
+        self.clients.add(client)
+        client.wake.set()
+        sender = asyncio.ensure_future(self._send(client))
+        try:
+            while True:
+                size = LENGTH.unpack(await reader.readexactly(LENGTH.size))[0]
+                if size > MAX_MESSAGE:
+                    break
+                payload = await reader.readexactly(size)
+                if payload[:1] == bytes([MSG_CONTROL]) and len(payload) == CONTROL.size:
+                    self.pending_events |= CONTROL.unpack(payload)[1]
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, client):
+        try:
+            while True:
+                await client.wake.wait()
+                client.wake.clear()
+                if client.frame == self.frame:
+                    continue
+                client.writer.write(self.encode(client))
+                client.frame = self.frame
+                client.state = self.state
+                client.events = 0
+                # Only this client's task waits here; the tick keeps going and
+                # this client gets the newest state once its socket drains
+                await client.writer.drain()
+        except ConnectionError:
+            client.writer.close()
+
+    async def serve(self, host=HOST, port=PORT, unix=None):
+        if unix:
+            self._server = await asyncio.start_unix_server(self.handle, unix)
+        else:
+            self._server = await asyncio.start_server(self.handle, host, port)
+        async with self._server:
+            await self.run()
+
+
+# ----------------------------
+# Clients
+# ----------------------------
+
+class StateClient:
+    """Blocking client: connects, then yields the decoded states.
+
+    mirror is an Engine built from the server's HELLO that is never
+    stepped; every state received is written into it, so anything that
+    draws or records an engine (hexsim.viewer, hexsim.recording) works on a
+    client unchanged.
+    """
+
+    def __init__(self, host=HOST, port=PORT, unix=None):
+        if unix:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(unix)
+        else:
+            self.sock = socket.create_connection((host, port))
+        self._file = self.sock.makefile("rb")
+        self._send_lock = threading.Lock()
+        kind, payload = self._read()
+        if kind != MSG_HELLO:
+            raise ConnectionError("expected HELLO, got message type %d" % kind)
+        self.info = json.loads(payload[1:])
+        n = self.info["balls"]
+        zeros = np.zeros(n)
+        balls = Balls(zeros, zeros, zeros, zeros, self.info["ball_radius"])
+        self.mirror = Engine(balls, center=self.info["center"], radius=self.info["radius"],
+                             sides=self.info["sides"])
+        self.state = np.zeros((4, n), dtype=np.int16)
+        self.frame = None
+        self.events = 0
+
+    def _read(self):
+        head = self._file.read(LENGTH.size)
+        if len(head) < LENGTH.size:
+            raise EOFError("server closed the connection")
+        size = LENGTH.unpack(head)[0]
+        payload = self._file.read(size)
+        if len(payload) < size:
+            raise EOFError("server closed the connection")
+        return payload[0], payload
+
+    def receive(self):
+        """Block for the next state and apply it to self.mirror; returns its frame."""
+        kind, payload = self._read()
+        _, frame, t, angle, omega, events = SNAPSHOT.unpack_from(payload)
+        base = BASE.unpack_from(payload, SNAPSHOT.size)[0]
+        body = zlib.decompress(payload[SNAPSHOT.size + BASE.size:])
+        m = self.mirror
+        if kind == MSG_EXACT:
+            exact = np.frombuffer(body, dtype=np.float64).reshape(self.state.shape)
+            for values, column in zip(exact, (m.balls.x, m.balls.y, m.balls.vx, m.balls.vy)):
+                np.copyto(column, values)
+        else:
+            data = np.frombuffer(body, dtype=np.int16).reshape(self.state.shape)
+            if kind == MSG_KEYFRAME:
+                self.state[...] = data
+            elif kind == MSG_DELTA:
+                if base != self.frame:
+                    raise ValueError("delta against frame %d, have %r" % (base, self.frame))
+                self.state += data
+            else:
+                raise ValueError("unexpected message type %d" % kind)
+            dequantize(self.state, m.balls)
+        m.time, m.angle, m.angular_velocity = t, angle, omega
+        self.frame = frame
+        self.events = events
+        return frame
+
+    def send_events(self, events):
+        if events:
+            with self._send_lock:
+                self.sock.sendall(_message(CONTROL.pack(MSG_CONTROL, events)))
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+
+def view(client, fps=FPS):
+    """Thin pygame viewer: draws whatever state arrived last."""
+    import pygame
+
+    from hexsim.engine import HEIGHT, WIDTH
+    from hexsim.viewer import KEY_EVENTS, Viewer
+
+    latest = {"frame": None, "error": None}
+    lock = threading.Lock()
+
+    def receive():
+        try:
+            while True:
+                frame = client.receive()
+                with lock:
+                    latest["frame"] = frame
+                    np.copyto(shown.balls.x, client.mirror.balls.x)
+                    np.copyto(shown.balls.y, client.mirror.balls.y)
+                    shown.angle = client.mirror.angle
+        except (EOFError, OSError, ValueError) as e:
+            latest["error"] = e
+
+    # The drawn copy, so the receiver thread never writes what is being drawn
+    m = client.mirror
+    shown = Engine(Balls(m.balls.x.copy(), m.balls.y.copy(), m.balls.vx, m.balls.vy, m.balls.radius),
+                   center=m.center, radius=m.radius, sides=m.sides)
+    threading.Thread(target=receive, name="state-client", daemon=True).start()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Spinning Hexagon - hexsim client")
+    clock = pygame.time.Clock()
+    viewer = Viewer(screen, shown)
+    running = True
+    while running and latest["error"] is None:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                else:
+                    client.send_events(KEY_EVENTS.get(event.key, 0))
+        with lock:
+            np.copyto(viewer.prev_x, shown.balls.x)
+            np.copyto(viewer.prev_y, shown.balls.y)
+            viewer.prev_angle = shown.angle
+            viewer.draw(1.0)
+        pygame.display.flip()
+        clock.tick(fps)
+    pygame.quit()
+    if latest["error"] is not None and not isinstance(latest["error"], EOFError):
+        raise latest["error"]
+
+
+def record(client, path, frames=0):
+    """Write received states to a trajectory file (see hexsim.recording).
+
+    Skipped states are simply missing from the file; each record keeps the
+    server's frame number and time.
+    """
+    from hexsim.recording import TrajectoryWriter
+
+    writer = TrajectoryWriter(path, client.mirror)
+    count = 0
+    try:
+        while not frames or count < frames:
+            try:
+                frame = client.receive()
+            except EOFError:
+                break
+            writer.frames = frame  # number records by server frame
+            writer.record(client.mirror, client.events)
+            count += 1
+    finally:
+        writer.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream engine state to viewer and recorder clients")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run the simulation")
+    serve.add_argument("--balls", type=int, default=1)
+    serve.add_argument("--seed", type=int, default=None)
+    serve.add_argument("--ccd", action="store_true", help="swept collision detection")
+    serve.add_argument("--collide-balls", action="store_true", help="balls collide with each other")
+    serve.add_argument("--radius", type=float, default=BALL_RADIUS, help="ball radius")
+    p = sub.add_parser("view", help="show the simulation in a window")
+    p = sub.add_parser("record", help="save the simulation to a trajectory file")
+    p.add_argument("path")
+    p.add_argument("--frames", type=int, default=0, help="stop after this many states (0: until the server stops)")
+    for p in sub.choices.values():
+        p.add_argument("--host", default=HOST)
+        p.add_argument("--port", type=int, default=PORT)
+        p.add_argument("--unix", metavar="PATH", help="use a Unix socket instead of TCP")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        from hexsim.engine import make_engine
+
+        engine = make_engine(args.balls, args.seed, args.ccd, args.radius, args.collide_balls)
+        server = SimulationServer(engine)
+        where = args.unix or "%s:%d" % (args.host, args.port)
+        print("Serving %d ball(s) on %s" % (len(engine.balls), where))
+        try:
+            asyncio.run(server.serve(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    client = StateClient(args.host, args.port, args.unix)
+    try:
+        if args.command == "view":
+            view(client)
+        else:
+            n = record(client, args.path, args.frames)
+            sys.stderr.write("Recorded %d states to %s\n" % (n, args.path))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
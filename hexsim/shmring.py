@@ -0,0 +1,285 @@
+"""
+Physics and rendering in separate processes, joined by a shared-memory ring.
+
+The physics process steps the engine at a fixed tick rate and publishes
+every state into the next slot of a ring in multiprocessing.shared_memory.
+The renderer (this process) draws the newest complete slot straight from
+NumPy views onto the shared buffer. Nothing is pickled, piped or copied
+between the two, and neither ever waits for the other.
+
+Synchronisation is a seqlock per slot, so there are no locks:
+
+  writer  slot.seq = 2*n - 1 (odd: being written), write the state,
+          slot.seq = 2*n (even: complete), then control.latest = n
+  reader  n = control.latest, check slot.seq == 2*n, draw from the slot,
+          check slot.seq again; if it changed the writer lapped the ring
+          mid-draw and the frame is drawn again from the newest slot
+
+With RING_SLOTS slots the writer needs RING_SLOTS ticks to come back to a
+slot, longer than drawing one usually takes, so redraws are rare. A
+renderer slower than a lap of the ring gives up after MAX_REDRAWS and shows
+the frame anyway; at worst some balls are a few ticks ahead of the rest
+(--slots makes the lap longer). Hotkeys go the other way on a small
+multiprocessing queue.
+
+Usage:
+    python -m hexsim.shmring --balls 2000 --tick 240
+"""
+import argparse
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from hexsim.engine import BALL_RADIUS, FPS, HEIGHT, WIDTH
+
+RING_SLOTS = 8
+TICK_RATE = 240         # physics steps per second
+MAX_REDRAWS = 2         # torn frames redrawn before one is shown anyway
+SLOT_HEADER = 64        # bytes before each slot's arrays
+MAGIC = 0x48455852494E47  # "HEXRING"
+
+# Control block: magic, slots, balls, ball radius, latest complete sequence number
+_CONTROL = np.dtype([("magic", "<u8"), ("slots", "<u8"), ("balls", "<u8"), ("radius", "<f8"),
+                     ("latest", "<u8")])
+_HEADER = np.dtype([("seq", "<u8"), ("frame", "<u8"), ("time", "<f8"), ("angle", "<f8"),
+                    ("angular_velocity", "<f8")])
+
+
+def _slot_size(balls):
+    return SLOT_HEADER + 32 * balls
+
+
+class Slot:
+    """Views of one ring slot: header fields and the (4, n) x, y, vx, vy state."""
+
+    def __init__(self, buf, offset, balls):
+        self.header = np.ndarray((), dtype=_HEADER, buffer=buf, offset=offset)
+        self.state = np.ndarray((4, balls), dtype=np.float64, buffer=buf, offset=offset + SLOT_HEADER)
+        self.x, self.y, self.vx, self.vy = self.state
+
+
+class StateRing:
+    """Single-writer ring of engine states in shared memory.
+
+    StateRing(balls) creates the segment; StateRing.attach(name) opens it
+    from another process. close() in every process, unlink() once.
+    """
+
+    def __init__(self, balls, slots=RING_SLOTS, radius=BALL_RADIUS, name=None):
+        if name is None:
+            size = _CONTROL.itemsize + slots * _slot_size(balls)
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.control = np.ndarray((), dtype=_CONTROL, buffer=self.shm.buf)
+            self.control["magic"] = MAGIC
+            self.control["slots"] = slots
+            self.control["balls"] = balls
+            self.control["radius"] = radius
+            self.control["latest"] = 0
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.control = np.ndarray((), dtype=_CONTROL, buffer=self.shm.buf)
+            if int(self.control["magic"]) != MAGIC:
+                raise ValueError("shared memory %r is not a state ring" % name)
+            balls = int(self.control["balls"])
+            slots = int(self.control["slots"])
+        self.balls = balls
+        self.radius = float(self.control["radius"])
+        self.slots = [Slot(self.shm.buf, _CONTROL.itemsize + i * _slot_size(balls), balls)
+                      for i in range(slots)]
+        self.published = 0
+
+    @classmethod
+    def attach(cls, name):
+        return cls(0, name=name)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, engine, frame):
+        """Write engine's state into the next slot (writer process only)."""
+        n = self.published + 1
+        slot = self.slots[n % len(self.slots)]
+        h = slot.header
+        h["seq"] = 2 * n - 1
+        b = engine.balls
+        np.copyto(slot.x, b.x)
+        np.copyto(slot.y, b.y)
+        np.copyto(slot.vx, b.vx)
+        np.copyto(slot.vy, b.vy)
+        h["frame"] = frame
+        h["time"] = engine.time
+        h["angle"] = engine.angle
+        h["angular_velocity"] = engine.angular_velocity
+        h["seq"] = 2 * n
+        self.control["latest"] = n
+        self.published = n
+
+    def latest(self):
+        """(n, slot) of the newest complete state, or (0, None) before the first."""
+        while True:
+            n = int(self.control["latest"])
+            if n == 0:
+                return 0, None
+            slot = self.slots[n % len(self.slots)]
+            if int(slot.header["seq"]) == 2 * n:
+                return n, slot
+            # Lapped between the two reads: take the newer latest
+
+    def still_valid(self, n, slot):
+        """Whether slot still holds state n, i.e. nothing read from it was torn."""
+        return int(slot.header["seq"]) == 2 * n
+
+    def close(self):
+        self.slots = []
+        self.control = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+# ----------------------------
+# Physics process
+# ----------------------------
+
+def physics_loop(name, config, events, stop, stats):
+    """Step an engine at config["tick"] Hz, publishing every state to the ring.
+
+    stats (a shared array) gets steps taken, seconds run and seconds spent
+    stepping when the loop stops.
+    """
+    from hexsim.controls import Controls
+    from hexsim.engine import Balls, Engine, HEX_CENTER
+
+    if config["balls"] == 1:
+        balls = Balls.single(HEX_CENTER[0] + 100, HEX_CENTER[1] - 50, 3 * FPS, -5 * FPS, config["radius"])
+    else:
+        balls = Balls.random(config["balls"], radius=config["radius"], seed=config["seed"])
+    engine = Engine(balls, ccd=config["ccd"], ball_collisions=config["collide_balls"])
+    controls = Controls(engine)
+    ring = StateRing.attach(name)
+    dt = 1.0 / config["tick"]
+    frame = 0
+    busy = 0.0
+    start = next_tick = time.perf_counter()
+    try:
+        ring.publish(engine, frame)
+        while not stop.is_set():
+            pressed = 0
+            try:
+                while True:
+                    pressed |= events.get_nowait()
+            except queue.Empty:
+                pass
+            controls.apply(pressed)
+            t = time.perf_counter()
+            engine.step(dt)
+            frame += 1
+            ring.publish(engine, frame)
+            busy += time.perf_counter() - t
+            next_tick += dt
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -0.25:
+                next_tick = time.perf_counter()  # too far behind to catch up
+    finally:
+        stats[:] = [frame, time.perf_counter() - start, busy]
+        ring.close()
+
+
+# ----------------------------
+# Renderer
+# ----------------------------
+
+def render(ring, events, fps=FPS, duration=None):
+    """Draw the newest slot until the window closes; returns render stats."""
+    import pygame
+
+    from hexsim.engine import HEX_CENTER, HEX_RADIUS, NUM_SIDES
+    from hexsim.geometry import RegularPolygon
+    from hexsim.viewer import BLACK, KEY_EVENTS, RED, WHITE
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Spinning Hexagon - hexsim (physics in its own process)")
+    clock = pygame.time.Clock()
+    polygon = RegularPolygon(HEX_CENTER, HEX_RADIUS, NUM_SIDES)
+    frames = redrawn = 0
+    start = time.perf_counter()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key in KEY_EVENTS:
+                    events.put(KEY_EVENTS[event.key])
+        for attempt in range(MAX_REDRAWS + 1):
+            n, slot = ring.latest()
+            screen.fill(BLACK)
+            if slot is None:
+                break
+            pygame.draw.polygon(screen, WHITE, polygon.update(float(slot.header["angle"])), 2)
+            radius = int(ring.radius)
+            # Straight from the shared buffer
+            for x, y in zip(slot.x.tolist(), slot.y.tolist()):
+                pygame.draw.circle(screen, RED, (int(x), int(y)), radius)
+            if ring.still_valid(n, slot) or attempt == MAX_REDRAWS:
+                break
+            redrawn += 1
+        pygame.display.flip()
+        frames += 1
+        clock.tick(fps)
+        if duration is not None and time.perf_counter() - start >= duration:
+            running = False
+    pygame.quit()
+    return {"frames": frames, "seconds": time.perf_counter() - start, "redrawn": redrawn}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run physics and rendering in separate processes")
+    parser.add_argument("--balls", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--radius", type=float, default=BALL_RADIUS)
+    parser.add_argument("--tick", type=float, default=TICK_RATE, help="physics steps per second")
+    parser.add_argument("--fps", type=int, default=FPS, help="render frame cap")
+    parser.add_argument("--ccd", action="store_true", help="swept collision detection")
+    parser.add_argument("--collide-balls", action="store_true", help="balls collide with each other")
+    parser.add_argument("--slots", type=int, default=RING_SLOTS)
+    parser.add_argument("--duration", type=float, default=None, help="close after this many seconds")
+    args = parser.parse_args(argv)
+
+    ring = StateRing(args.balls, args.slots, args.radius)
+    config = {"balls": args.balls, "seed": args.seed, "radius": args.radius, "tick": args.tick,
+              "ccd": args.ccd, "collide_balls": args.collide_balls}
+    events = mp.Queue()
+    stop = mp.Event()
+    stats = mp.Array("d", 3)
+    physics = mp.Process(target=physics_loop, args=(ring.name, config, events, stop, stats),
+                         name="hexsim-physics", daemon=True)
+    physics.start()
+    try:
+        shown = render(ring, events, args.fps, args.duration)
+    finally:
+        stop.set()
+        physics.join()
+        ring.close()
+        ring.unlink()
+
+    steps, seconds, busy = stats[:]
+    if seconds:
+        print("physics: %d steps in %.1f s (%.1f/s, target %g), %.0f%% of the time stepping"
+              % (steps, seconds, steps / seconds, args.tick, 100 * busy / seconds))
+    print("render:  %d frames in %.1f s (%.1f FPS), %d redrawn after the ring lapped them"
+          % (shown["frames"], shown["seconds"], shown["frames"] / shown["seconds"], shown["redrawn"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Multi-contact wall solver with accumulated, warm-started impulses.
+
+The scripts resolve one wall at a time: o3-mini pushes a ball out of the
+first edge it overlaps and retries up to three times, Gemini and DeepSeek
+reflect off each edge in turn. A ball wedged in a corner touches two
+edges, and fixing one pushes it into the other, so it jitters, picks up
+energy from the repeated reflections, or is pushed out through a wall.
+
+ContactSolver treats the container the way hexsim.ccd does: a ball is
+inside a convex polygon exactly when its center is on the inner side of
+every edge line moved inward by its radius. Every line a ball is past is
+one contact, so a ball in a corner has two, and all of them are solved
+together each step:
+
+  1. gather every (ball, edge) contact, and the wall velocity
+     omega x (p - center) at each contact point
+  2. warm start: reapply the impulse each contact ended the previous step
+     with, looked up by (ball, edge)
+  3. sequential impulses: each pass, every contact's accumulated impulse
+     is moved to what makes its relative normal velocity reach its target
+     (a restitution bounce for fast approaches, zero for resting ones)
+     and clamped to push only; passes stop once no impulse changes by
+     more than the tolerance
+  4. push centers back inside every contact line, the same way
+
+A ball's contacts are numbered 0, 1, ... and each pass walks contact 0 of
+every ball, then contact 1, and so on, so every update is vectorized over
+balls with no ball appearing twice. A resting ball's warm-started impulses
+already hold it, so corners settle in one or two passes instead of running
+the full loop every frame. The cost per candidate ball grows with the
+number of sides, so --sectors stays the better choice for 1000-gons.
+
+Usage:
+    python -m hexsim.solver --seconds 10
+"""
+import argparse
+import math
+
+import numpy as np
+
+from hexsim.broadphase import RESTING_SPEED
+
+ITERATIONS = 8          # cap on velocity passes per step
+POSITION_ITERATIONS = 8  # cap on push-out passes per step
+TOLERANCE = 1e-3        # px/s; passes stop once no impulse changes by more
+POSITION_TOLERANCE = 1e-6  # px; push-out stops once no ball moves further
+
+
+class ContactSolver:
+    """Solves all ball/wall contacts of an engine together.
+
+    Keeps the previous step's contacts and impulses for warm starting.
+    After solve(): contacts is the number of contacts, warm_started how
+    many of them carried an impulse over, and passes the velocity passes
+    it took.
+    """
+
+    def __init__(self, iterations=ITERATIONS, tolerance=TOLERANCE):
+        self.iterations = int(iterations)
+        self.tolerance = float(tolerance)
+        self.contacts = 0
+        self.warm_started = 0
+        self.passes = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the cached impulses, e.g. after balls were added or moved."""
+        self._keys = np.empty(0, dtype=np.int64)
+        self._impulses = np.empty(0)
+        self._balls = None
+
+    def solve(self, engine):
+        """Resolve every ball/wall contact of engine at its current angle."""
+        b = engine.balls
+        poly = engine.polygon
+        r = b.radius
+        if self._balls != len(b):
+            self.reset()
+            self._balls = len(b)
+        normals = poly.update_arrays(engine.angle)[1]
+        cx, cy = poly.center
+        # Inscribed-circle early-out, as in Engine._collide_sectors
+        dx = b.x - cx
+        dy = b.y - cy
+        safe = max(poly.apothem - r, 0.0)
+        candidates = np.flatnonzero(dx * dx + dy * dy >= safe * safe)
+        # Distance of each candidate's center inside each edge line, less its radius
+        gap = (dx[candidates, None] * normals[:, 0] + dy[candidates, None] * normals[:, 1]
+               + (poly.apothem - r))
+        rows, edge = np.nonzero(gap < 0)
+        self.contacts = rows.size
+        self.warm_started = 0
+        self.passes = 0
+        if rows.size == 0:
+            self.reset()
+            self._balls = len(b)
+            return
+        ball = candidates[rows]
+        nx = normals[edge, 0]
+        ny = normals[edge, 1]
+
+        # Contact point on the wall line, and the wall's velocity there
+        reach = r + gap[rows, edge]
+        px = b.x[ball] - nx * reach
+        py = b.y[ball] - ny * reach
+        wx = -engine.angular_velocity * (py - cy)
+        wy = engine.angular_velocity * (px - cx)
+
+        # Contacts of one ball are adjacent (nonzero walks rows in order);
+        # number them so contact k of every ball can be solved at once
+        first = np.flatnonzero(np.diff(rows, prepend=-1))
+        rank = np.arange(rows.size) - np.repeat(first, np.diff(np.append(first, rows.size)))
+        groups = [np.flatnonzero(rank == k) for k in range(int(rank.max()) + 1)]
+
+        # Bounce fast approaches, bring slow ones to rest
+        approach = (b.vx[ball] - wx) * nx + (b.vy[ball] - wy) * ny
+        target = np.where(approach < -RESTING_SPEED, -engine.restitution * approach, 0.0)
+
+        # Warm start from the impulses the same contacts ended the last step with
+        keys = ball.astype(np.int64) * poly.sides + edge
+        impulse = np.zeros(rows.size)
+        if self._keys.size:
+            at = np.minimum(np.searchsorted(self._keys, keys), self._keys.size - 1)
+            known = self._keys[at] == keys
+            impulse[known] = self._impulses[at[known]]
+            self.warm_started = int(np.count_nonzero(known))
+            np.add.at(b.vx, ball, impulse * nx)
+            np.add.at(b.vy, ball, impulse * ny)
+
+        for _ in range(self.iterations):
+            self.passes += 1
+            change = 0.0
+            for g in groups:
+                i = ball[g]
+                gx, gy = nx[g], ny[g]
+                vx, vy = b.vx[i], b.vy[i]
+                vn = (vx - wx[g]) * gx + (vy - wy[g]) * gy
+                old = impulse[g]
+                new = np.maximum(old + (target[g] - vn), 0.0)
+                delta = new - old
+                impulse[g] = new
+                b.vx[i] = vx + delta * gx
+                b.vy[i] = vy + delta * gy
+                change = max(change, float(np.abs(delta).max()))
+            if change <= self.tolerance:
+                break
+
+        for _ in range(POSITION_ITERATIONS):
+            moved = 0.0
+            for g in groups:
+                i = ball[g]
+                gx, gy = nx[g], ny[g]
+                x, y = b.x[i], b.y[i]
+                depth = np.maximum(-((x - cx) * gx + (y - cy) * gy + (poly.apothem - r)), 0.0)
+                b.x[i] = x + depth * gx
+                b.y[i] = y + depth * gy
+                moved = max(moved, float(depth.max()))
+            if moved <= POSITION_TOLERANCE:
+                break
+
+        self._keys = keys
+        self._impulses = impulse
+
+
+# ----------------------------
+# Corner test
+# ----------------------------
+
+def _corner_engine(contacts, balls, angular_velocity):
+    from hexsim.engine import Balls, Engine, HEX_CENTER, HEX_RADIUS
+
+    # A vertex pointing straight down, and balls dropped just above it
+    angle = math.pi / 2 - 2 * math.pi / 6
+    x = HEX_CENTER[0] + np.linspace(-40, 40, balls) if balls > 1 else [HEX_CENTER[0] + 5.0]
+    y = np.full(balls, HEX_CENTER[1] + HEX_RADIUS - 60.0)
+    return Engine(Balls(x, y, np.zeros(balls), np.zeros(balls)), angle=angle,
+                  angular_velocity=angular_velocity, contacts=contacts)
+
+
+def main(argv=None):
+    from hexsim.engine import FPS
+
+    parser = argparse.ArgumentParser(description="Compare wall solvers on balls settling into a corner")
+    parser.add_argument("--balls", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--spin", type=float, default=0.0, help="polygon angular velocity in rad/s")
+    args = parser.parse_args(argv)
+
+    steps = int(args.seconds * FPS)
+    settle = steps // 2
+    print("%-10s %14s %16s %12s %14s" % ("solver", "final speed", "energy drift", "escaped", "passes/step"))
+    for contacts in (False, True):
+        engine = _corner_engine(contacts, args.balls, args.spin)
+        poly = engine.polygon
+        energy = None
+        passes = 0
+        for k in range(steps):
+            engine.step()
+            if k == settle:
+                energy = engine.energy()
+            if k >= settle and contacts:
+                passes += engine.solver.passes
+        b = engine.balls
+        normals = poly.update_arrays(engine.angle)[1]
+        inside = ((b.x[:, None] - poly.center[0]) * normals[:, 0] + (b.y[:, None] - poly.center[1]) * normals[:, 1]
+                  + (poly.apothem - b.radius))
+        escaped = int(np.count_nonzero(inside.min(axis=1) < -1e-6))
+        speed = float(np.hypot(b.vx, b.vy).max())
+        drift = engine.energy() - energy
+        print("%-10s %11.3f px/s %16.3f %12d %14s" % (
+            "contacts" if contacts else "o3-mini", speed, drift, escaped,
+            "%.2f" % (passes / (steps - settle)) if contacts else "%d fixed" % engine.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Pre-rotated polygon sprite cache.
+
+The only thing that changes about the hexagon from frame to frame is its
+rotation angle, so rasterizing pygame.draw.polygon(screen, ..., vertices, 2)
+every frame is wasted work. PolygonSpriteCache renders the outline once per
+quantized angle onto a color-keyed surface and blits that instead.
+
+A regular N-gon looks the same after turning 2*pi/N (60 degrees for the
+hexagon), so angles are reduced modulo that period first and only one
+N-th of the angle range is ever stored. Entries are kept in an LRU of
+bounded size; changing the radius, color or line width drops them all.
+"""
+import math
+from collections import OrderedDict
+
+import pygame
+
+RESOLUTION = 0.25     # degrees between cached angles
+MAX_ENTRIES = 256     # 60 / 0.25 = 240, so the whole hexagon period fits
+
+
+class PolygonSpriteCache:
+    """LRU cache of pre-rendered polygon outlines keyed by quantized angle."""
+
+    def __init__(self, sides, radius, color, width=2, resolution=RESOLUTION, max_entries=MAX_ENTRIES):
+        self.sides = int(sides)
+        self.radius = float(radius)
+        self.color = tuple(color)
+        self.width = int(width)
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self.set_resolution(resolution)
+
+    # ----------------------------
+    # Configuration
+    # ----------------------------
+
+    def set_resolution(self, degrees):
+        self.period = 2 * math.pi / self.sides
+        self.steps = max(1, int(round(math.degrees(self.period) / degrees)))
+        self.step = self.period / self.steps
+        self.clear()
+
+    def configure(self, radius=None, color=None, width=None):
+        """Change the look of the outline; cached sprites are dropped if it changed."""
+        changed = False
+        if radius is not None and float(radius) != self.radius:
+            self.radius = float(radius)
+            changed = True
+        if color is not None and tuple(color) != self.color:
+            self.color = tuple(color)
+            changed = True
+        if width is not None and int(width) != self.width:
+            self.width = int(width)
+            changed = True
+        if changed:
+            self.clear()
+        return changed
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+
+    def key(self, angle):
+        """Quantized angle index, reduced by the polygon's rotational symmetry."""
+        return int(round((angle % self.period) / self.step)) % self.steps
+
+    def get(self, angle):
+        """Sprite surface for angle (radians); the polygon center is its center."""
+        key = self.key(angle)
+        sprite = self._entries.get(key)
+        if sprite is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = self._render(key * self.step)
+        self._entries[key] = sprite
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return sprite
+
+    def blit(self, surface, center, angle):
+        """Blit the outline rotated to angle around center; returns the blitted rect."""
+        sprite = self.get(angle)
+        half_w = sprite.get_width() / 2
+        half_h = sprite.get_height() / 2
+        return surface.blit(sprite, (int(round(center[0] - half_w)), int(round(center[1] - half_h))))
+
+    def _render(self, angle):
+        size = int(math.ceil(2 * self.radius)) + 2 * self.width + 2
+        key_color = (255, 0, 255) if self.color != (255, 0, 255) else (0, 255, 0)
+        sprite = pygame.Surface((size, size))
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite.fill(key_color)
+        c = size / 2
+        vertices = []
+        for i in range(self.sides):
+            theta = angle + 2 * math.pi * i / self.sides
+            vertices.append((c + self.radius * math.cos(theta), c + self.radius * math.sin(theta)))
+        pygame.draw.polygon(sprite, self.color, vertices, self.width)
+        sprite.set_colorkey(key_color, pygame.RLEACCEL)
+        return sprite
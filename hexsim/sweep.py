@@ -0,0 +1,130 @@
+"""
+Parameter sweep across the ported model physics (see hexsim.models).
+
+Every combination of the swept values is run for every selected model on a
+process pool using all cores. Each run's summary is appended to a JSON-lines
+file as soon as it finishes, so a long sweep can be watched (or killed)
+while it runs.
+
+gravity, rotation speed, ball radius and initial velocity are given as
+multipliers of each script's own value, since the scripts use different
+units; restitution is the absolute bounce coefficient, and left out it is
+each script's own, so the default sweep reproduces the scripts.
+
+Usage:
+    python -m hexsim.sweep --frames 3600 --gravity 0.5 1 2 --restitution 0.6 0.8 1 \\
+        --seeds 8 --output sweep.jsonl
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from hexsim.models import MODELS, get_model
+
+SCALED = ("gravity", "rotation_speed", "ball_radius")
+
+
+def make_tasks(models, frames, seeds, gravity, restitution, rotation_speed, ball_radius, velocity_scale):
+    """Expand the sweep grid into one task dict per run."""
+    tasks = []
+    grid = list(itertools.product(gravity, restitution, rotation_speed, ball_radius, velocity_scale))
+    for name in models:
+        cls = get_model(name)
+        for g, e, w, r, v in grid:
+            for seed in range(seeds if cls.random_start else 1):
+                tasks.append({
+                    "model": cls.name,
+                    "seed": seed,
+                    "frames": frames,
+                    "sweep": {"gravity": g, "restitution": e, "rotation_speed": w,
+                              "ball_radius": r, "velocity_scale": v},
+                })
+    return tasks
+
+
+def model_params(cls, sweep):
+    """Turn sweep multipliers into the model's absolute parameters."""
+    params = {name: cls.defaults[name] * sweep[name] for name in SCALED}
+    restitution = sweep["restitution"]
+    params["restitution"] = cls.defaults["restitution"] if restitution is None else restitution
+    params["velocity_scale"] = sweep["velocity_scale"]
+    return params
+
+
+def run_one(task):
+    """Simulate one run and summarize it. Runs in a worker process."""
+    cls = get_model(task["model"])
+    params = model_params(cls, task["sweep"])
+    start = time.perf_counter()
+    model = cls(seed=task["seed"], **params)
+    energy0 = model.energy()
+    escape_frame = None
+    max_penetration = 0.0
+    speed_sum = 0.0
+    for frame in range(task["frames"]):
+        model.step()
+        outside = model.outside_distance()
+        max_penetration = max(max_penetration, outside + model.ball_radius)
+        if escape_frame is None and outside > 0:
+            escape_frame = frame
+        speed_sum += math.hypot(model.ball_vx, model.ball_vy) * model.velocity_unit
+    frames = task["frames"]
+    result = dict(task)
+    result.update({
+        "params": params,
+        "escaped": escape_frame is not None,
+        "escape_frame": escape_frame,
+        "escape_time_s": None if escape_frame is None else (escape_frame + 1) * cls.frame_dt,
+        "max_penetration": max_penetration,
+        "mean_speed": speed_sum / frames if frames else 0.0,
+        "energy_start": energy0,
+        "energy_end": model.energy(),
+        "elapsed_s": time.perf_counter() - start,
+    })
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models", nargs="+", default=list(MODELS), help="model names (default: all)")
+    parser.add_argument("--frames", type=int, default=3600)
+    parser.add_argument("--seeds", type=int, default=1, help="seeds per point for models with random starts")
+    parser.add_argument("--gravity", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--restitution", type=float, nargs="+", default=[None],
+                        help="bounce coefficients (default: each script's own)")
+    parser.add_argument("--rotation-speed", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--ball-radius", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--velocity-scale", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="sweep.jsonl")
+    args = parser.parse_args(argv)
+
+    tasks = make_tasks(args.models, args.frames, args.seeds, args.gravity, args.restitution,
+                       args.rotation_speed, args.ball_radius, args.velocity_scale)
+    print("Running %d simulations on %d workers -> %s" % (len(tasks), args.workers, args.output))
+    start = time.perf_counter()
+    escaped = {}
+    with open(args.output, "w", encoding="utf-8") as out, Pool(args.workers) as pool:
+        chunksize = max(1, len(tasks) // (args.workers * 16))
+        for done, result in enumerate(pool.imap_unordered(run_one, tasks, chunksize), 1):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            counts = escaped.setdefault(result["model"], [0, 0])
+            counts[0] += result["escaped"]
+            counts[1] += 1
+            if done % 100 == 0 or done == len(tasks):
+                sys.stderr.write("\r%d/%d runs" % (done, len(tasks)))
+    sys.stderr.write("\n")
+
+    print("Finished in %.1f s" % (time.perf_counter() - start))
+    for name, (n_escaped, n) in escaped.items():
+        print("%-30s escaped in %4d of %4d runs (%.0f%%)" % (name, n_escaped, n, 100.0 * n_escaped / n))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Fixed-timestep simulation clock.
+
+The scripts tie physics to the render rate: o3-mini computes
+dt = clock.tick(60) and never uses it, Gemini and DeepSeek bake gravity into
+per-frame units, and Claude hard-codes dt = 1/FPS. FixedStepClock decouples
+the two: wall time (scaled by speed) is added to an accumulator, the
+simulation is advanced in whole steps of a fixed size, and the left-over
+fraction of a step is exposed as alpha for interpolated rendering.
+"""
+import time
+
+
+class FixedStepClock:
+    """Accumulator that turns elapsed wall time into fixed simulation steps.
+
+    step       - simulation step in seconds
+    max_steps  - cap on steps per rendered frame, so a slow frame can't make
+                 the next one slower still (excess time is dropped)
+    speed      - simulation seconds per wall-clock second
+    """
+
+    def __init__(self, step=1.0 / 120, max_steps=8, speed=1.0, timer=time.perf_counter):
+        if step <= 0:
+            raise ValueError("step must be positive, got %r" % (step,))
+        self.step = float(step)
+        self.max_steps = int(max_steps)
+        self.speed = float(speed)
+        self.timer = timer
+        self.accumulator = 0.0
+        self.dropped = 0.0
+        self._last = None
+
+    def reset(self):
+        self.accumulator = 0.0
+        self._last = None
+
+    def tick(self, elapsed=None):
+        """Account for one rendered frame and return how many steps to run.
+
+        elapsed is the wall time since the previous call; by default it is
+        measured with the clock's timer.
+        """
+        if elapsed is None:
+            now = self.timer()
+            elapsed = 0.0 if self._last is None else now - self._last
+            self._last = now
+        self.accumulator += elapsed * self.speed
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            self.dropped += (steps - self.max_steps) * self.step
+            self.accumulator -= (steps - self.max_steps) * self.step
+            steps = self.max_steps
+        self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of a step left in the accumulator, for interpolation."""
+        return min(1.0, max(0.0, self.accumulator / self.step))
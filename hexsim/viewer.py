@@ -0,0 +1,384 @@
+"""
+Interactive viewer for the vectorized engine.
+
+Physics runs on a FixedStepClock, independent of the frame rate, and the
+hexagon and balls are drawn interpolated between the last two physics
+states. Two faster-than-real-time modes are available:
+
+  --uncapped   no frame cap; every rendered frame advances --steps-per-frame
+               fixed steps, as fast as the CPU allows
+  --headless   no window at all; simulate --duration seconds and report how
+               much faster than real time that was (--record is refused)
+
+--dirty redraws only the regions that changed (see hexsim.dirty) instead of
+filling and flipping the whole window every frame. --sprites blits the
+hexagon from a cache of pre-rotated outlines (see hexsim.sprites) instead of
+rasterizing it every frame.
+
+The hotkeys from "Gemini 2.0 Flash - Hotkeys.py" work here too: a/d set the
+rotation direction, up/down change its speed and space kicks the balls in
+random directions. --record writes every frame and hotkey to a trajectory
+file (see hexsim.recording). --profile times each frame by phase (see
+hexsim.profiler) and shows the HUD, which F3 toggles; --trace also writes
+the phases as a Chrome trace when the window closes.
+
+--renderer picks another backend from hexsim.render instead of the
+window: ascii draws into the terminal (for SSH sessions), numpy into an
+off-screen framebuffer and null not at all. These run for --duration
+simulated seconds, in real time unless --uncapped, with no hotkeys,
+recording or profiling, and report the frames drawn per second.
+
+--scenario builds the scene from a JSON or TOML scenario file (see
+hexsim.scenario) and watches it: saving a change to gravity, the polygon,
+the balls or the rotation schedule applies it on the next frame, without
+restarting. The file replaces the scene flags (--balls, --seed, --ccd,
+--radius, --collide-balls, --contacts), which are refused alongside it.
+A trajectory file's header fixes the polygon and the balls, so when a
+reload changes either while recording, the recording carries on in a new
+file, PATH.1, PATH.2, ... (before the extension).
+
+Usage:
+    python -m hexsim.viewer --balls 200
+    python -m hexsim.viewer --balls 2000 --radius 3 --collide-balls
+    python -m hexsim.viewer --uncapped --steps-per-frame 16
+    python -m hexsim.viewer --headless --balls 10000 --duration 600
+    python -m hexsim.viewer --balls 2000 --profile --trace trace.json
+    python -m hexsim.viewer --balls 50 --renderer ascii --duration 30
+    python -m hexsim.viewer --scenario scene.json
+"""
+import argparse
+import math
+import os
+import time
+
+import numpy as np
+import pygame
+
+from hexsim.controls import Controls
+from hexsim.dirty import DirtyRects, draw_outline
+from hexsim import profiler as profiling
+from hexsim import recording
+from hexsim.engine import BALL_RADIUS, FPS, HEIGHT, WIDTH, make_engine
+from hexsim.render import RENDERERS, draw_scene, make_renderer
+from hexsim.scenario import ScenarioError, ScenarioWatcher
+from hexsim.sprites import PolygonSpriteCache
+from hexsim.timestep import FixedStepClock
+
+# Define some colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+
+# Hotkeys of "Gemini 2.0 Flash - Hotkeys.py"
+KEY_EVENTS = {
+    pygame.K_a: recording.EVENT_LEFT,      # counterclockwise
+    pygame.K_d: recording.EVENT_RIGHT,     # clockwise
+    pygame.K_UP: recording.EVENT_FASTER,
+    pygame.K_DOWN: recording.EVENT_SLOWER,
+    pygame.K_SPACE: recording.EVENT_KICK,  # random kick
+}
+
+# Viewer flags that a scenario file replaces
+SCENE_FLAGS = ("balls", "seed", "ccd", "radius", "collide_balls", "contacts")
+# Scenario changes that a trajectory file's header can't follow
+RECORDED_SCENE = ("polygon", "balls", "balls.radius")
+
+
+class Viewer:
+    """Steps an engine and draws it interpolated between physics states.
+
+    With a renderer (see hexsim.render) the frame is drawn through it and
+    screen is not used.
+    """
+
+    def __init__(self, screen, engine, dirty=False, sprites=False, renderer=None):
+        self.screen = screen
+        self.engine = engine
+        self.renderer = renderer
+        self.dirty = DirtyRects(screen, BLACK) if dirty else None
+        self.sprites = None
+        if sprites:
+            self.sprites = PolygonSpriteCache(engine.sides, engine.radius, WHITE, 2)
+        self.controls = Controls(engine)
+        self.reset()
+
+    def reset(self):
+        """Start interpolating afresh, e.g. after the balls or polygon were replaced."""
+        engine = self.engine
+        b = engine.balls
+        self.prev_x = b.x.copy()
+        self.prev_y = b.y.copy()
+        self.prev_angle = engine.angle
+        self._x = np.empty_like(b.x)
+        self._y = np.empty_like(b.y)
+        if self.sprites is not None and self.sprites.sides != engine.sides:
+            self.sprites = PolygonSpriteCache(engine.sides, engine.radius, WHITE, 2)
+        if self.dirty is not None:
+            self.dirty.invalidate()
+        self.controls = Controls(engine)
+
+    def handle_key(self, key):
+        """Apply a hotkey; returns its recording.EVENT_* bit, or 0."""
+        event = KEY_EVENTS.get(key, 0)
+        self.controls.apply(event)
+        return event
+
+    def advance(self, steps, dt):
+        """Run steps physics steps, keeping the state before the last one."""
+        if steps <= 0:
+            return
+        engine = self.engine
+        for _ in range(steps - 1):
+            engine.step(dt)
+        b = engine.balls
+        np.copyto(self.prev_x, b.x)
+        np.copyto(self.prev_y, b.y)
+        self.prev_angle = engine.angle
+        engine.step(dt)
+
+    def draw(self, alpha=1.0):
+        """Draw the state alpha of the way from the previous to the current step."""
+        engine = self.engine
+        b = engine.balls
+        angle = self.prev_angle + (engine.angle - self.prev_angle) * alpha
+        # Interpolated ball positions: prev + (cur - prev) * alpha
+        np.subtract(b.x, self.prev_x, out=self._x)
+        self._x *= alpha
+        self._x += self.prev_x
+        np.subtract(b.y, self.prev_y, out=self._y)
+        self._y *= alpha
+        self._y += self.prev_y
+
+        if self.renderer is not None:
+            draw_scene(self.renderer, engine.polygon.update(angle), self._x, self._y, b.radius, WHITE, RED)
+            return
+        radius = int(b.radius)
+        points = zip(self._x.tolist(), self._y.tolist())
+        if self.dirty is None:
+            self.screen.fill(BLACK)
+            self.draw_hexagon(angle)
+            for x, y in points:
+                pygame.draw.circle(self.screen, RED, (int(x), int(y)), radius)
+            return
+        dirty = self.dirty
+        dirty.clear()
+        dirty.extend(self.draw_hexagon(angle))
+        for x, y in points:
+            dirty.add(pygame.draw.circle(self.screen, RED, (int(x), int(y)), radius))
+
+    def draw_hexagon(self, angle):
+        """Draw the outline at angle; returns the rects it covers."""
+        engine = self.engine
+        if self.sprites is not None:
+            self.sprites.configure(radius=engine.radius)
+            return [self.sprites.blit(self.screen, engine.center, angle)]
+        vertices = engine.polygon.update(angle)
+        if self.dirty is not None:
+            return draw_outline(self.screen, WHITE, vertices, 2)
+        return [pygame.draw.polygon(self.screen, WHITE, vertices, 2)]
+
+    def present(self):
+        if self.renderer is not None:
+            self.renderer.present()
+        elif self.dirty is None:
+            pygame.display.flip()
+        else:
+            self.dirty.present()
+
+
+def run_headless(engine, duration, step, watcher=None):
+    """Simulate duration seconds without a window; returns wall seconds taken.
+
+    With a scenario watcher the steps run a frame's worth at a time, polling
+    it in between, so the rotation schedule and file changes still apply.
+    """
+    steps = int(math.ceil(duration / step))
+    start = time.perf_counter()
+    if watcher is None:
+        engine.run(steps, step)
+        return time.perf_counter() - start
+    per_frame = max(1, round(1.0 / (FPS * step)))
+    for done in range(0, steps, per_frame):
+        watcher.poll()
+        engine.run(min(per_frame, steps - done), step)
+    return time.perf_counter() - start
+
+
+def poll_scenario(watcher, viewer):
+    """Apply a changed scenario file before the next frame; returns what changed."""
+    changes = watcher.poll()
+    if changes:
+        print("scenario: %s" % ", ".join(changes))
+        if "balls" in changes or "polygon" in changes:
+            viewer.reset()
+    return changes
+
+
+def next_segment(recorder, engine, path, segment):
+    """Close recorder and record engine on into segment number segment of path."""
+    recorder.close()
+    root, ext = os.path.splitext(path)
+    name = "%s.%d%s" % (root, segment, ext)
+    print("recording: %d frames in %s, continuing in %s" % (recorder.frames, recorder.path, name))
+    return recording.TrajectoryWriter(name, engine)
+
+
+def run_renderer(viewer, duration, step, fps, uncapped=False, steps_per_frame=1, speed=1.0, max_steps=8,
+                 watcher=None):
+    """Simulate and draw duration seconds through viewer's renderer.
+
+    Frames are capped at fps and physics follows the wall clock, unless
+    uncapped, when every frame advances steps_per_frame steps as fast as
+    possible. Ctrl-C stops early. Returns (frames drawn, wall seconds).
+    """
+    sim_clock = FixedStepClock(step, max_steps, speed)
+    frame_time = 1.0 / fps
+    simulated = 0.0
+    start = time.perf_counter()
+    try:
+        while simulated < duration:
+            begin = time.perf_counter()
+            if watcher is not None:
+                poll_scenario(watcher, viewer)
+            steps = steps_per_frame if uncapped else sim_clock.tick()
+            viewer.advance(steps, step)
+            simulated += steps * step
+            viewer.draw(1.0 if uncapped else sim_clock.alpha)
+            viewer.present()
+            if not uncapped:
+                time.sleep(max(0.0, frame_time - (time.perf_counter() - begin)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        viewer.renderer.close()
+    return viewer.renderer.frames, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--balls", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--step", type=float, default=1.0 / 120, help="physics step in seconds")
+    parser.add_argument("--speed", type=float, default=1.0, help="simulation seconds per wall second")
+    parser.add_argument("--max-steps", type=int, default=8, help="step cap per rendered frame")
+    parser.add_argument("--fps", type=int, default=FPS, help="render frame cap")
+    parser.add_argument("--uncapped", action="store_true", help="no frame cap, fixed steps per frame")
+    parser.add_argument("--steps-per-frame", type=int, default=1)
+    parser.add_argument("--ccd", action="store_true", help="swept collision detection")
+    parser.add_argument("--radius", type=float, default=BALL_RADIUS, help="ball radius")
+    parser.add_argument("--collide-balls", action="store_true", help="balls collide with each other")
+    parser.add_argument("--contacts", action="store_true", help="multi-contact wall solver")
+    parser.add_argument("--dirty", action="store_true", help="dirty-rectangle rendering")
+    parser.add_argument("--sprites", action="store_true", help="cached pre-rotated hexagon sprites")
+    parser.add_argument("--record", metavar="PATH", help="record every frame to a trajectory file")
+    parser.add_argument("--profile", action="store_true", help="per-phase frame timing with a HUD (F3)")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace of the profiled frames")
+    parser.add_argument("--headless", action="store_true", help="simulate without a window")
+    parser.add_argument("--renderer", choices=list(RENDERERS), default="pygame",
+                        help="draw through this backend instead of a window")
+    parser.add_argument("--scenario", metavar="PATH", help="scene from a scenario file, reloaded when it changes")
+    parser.add_argument("--duration", type=float, default=60.0, help="simulated seconds (headless)")
+    args = parser.parse_args(argv)
+    if args.headless and args.record:
+        parser.error("--record needs the window loop; drop --headless")
+    if args.renderer != "pygame" and not args.headless:
+        window_only = [name for name in ("record", "profile", "trace") if getattr(args, name)]
+        if window_only:
+            parser.error("%s need the pygame window; drop them or --renderer %s"
+                         % (", ".join("--" + name for name in window_only), args.renderer))
+
+    watcher = None
+    if args.scenario:
+        clash = [name for name in SCENE_FLAGS if getattr(args, name) != parser.get_default(name)]
+        if clash:
+            parser.error("--scenario sets the scene; drop %s"
+                         % ", ".join("--" + name.replace("_", "-") for name in clash))
+        try:
+            watcher = ScenarioWatcher(args.scenario)
+        except (OSError, ScenarioError) as e:
+            parser.error(str(e))
+        engine = watcher.engine
+    else:
+        engine = make_engine(args.balls, args.seed, args.ccd, args.radius, args.collide_balls,
+                             args.contacts)
+    if args.headless:
+        wall = run_headless(engine, args.duration, args.step, watcher)
+        print("Simulated %.1f s in %.3f s (%.0fx real time)" % (args.duration, wall, args.duration / wall))
+        return
+    if args.renderer != "pygame":
+        viewer = Viewer(None, engine, renderer=make_renderer(args.renderer, WIDTH, HEIGHT))
+        frames, wall = run_renderer(viewer, args.duration, args.step, args.fps, args.uncapped,
+                                    args.steps_per_frame, args.speed, args.max_steps, watcher)
+        print("Drew %d frames in %.3f s (%.0f frames/s)" % (frames, wall, frames / wall if wall else 0))
+        return
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Spinning Hexagon - hexsim")
+    clock = pygame.time.Clock()
+    sim_clock = FixedStepClock(args.step, args.max_steps, args.speed)
+    viewer = Viewer(screen, engine, args.dirty, args.sprites)
+    recorder = recording.TrajectoryWriter(args.record, engine) if args.record else None
+    prof = profiling.Profiler(args.profile or bool(args.trace), trace=bool(args.trace))
+    hud = profiling.Hud(prof, args.profile)
+    engine.profiler = prof
+
+    running = True
+    segment = 0
+    try:
+        while running:
+            prof.frame()
+            events = 0
+            prof.begin(profiling.EVENTS)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                    events |= recording.EVENT_QUIT
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                        events |= recording.EVENT_QUIT
+                    elif not hud.handle_key(event.key):
+                        events |= viewer.handle_key(event.key)
+            prof.end()
+            if watcher is not None:
+                changes = poll_scenario(watcher, viewer)
+                if recorder is not None and any(c in changes for c in RECORDED_SCENE):
+                    segment += 1
+                    recorder = next_segment(recorder, engine, args.record, segment)
+
+            prof.begin(profiling.PHYSICS)
+            if args.uncapped:
+                viewer.advance(args.steps_per_frame, args.step)
+            else:
+                viewer.advance(sim_clock.tick(), args.step)
+            prof.end()
+            prof.begin(profiling.DRAW)
+            viewer.draw(1.0 if args.uncapped else sim_clock.alpha)
+            prof.end()
+            rect = hud.draw(screen)
+            if rect is not None and viewer.dirty is not None:
+                viewer.dirty.add(rect)
+            prof.begin(profiling.FLIP)
+            viewer.present()
+            prof.end()
+            if recorder is not None:
+                recorder.record(engine, events)
+
+            if not args.uncapped:
+                prof.begin(profiling.WAIT)
+                clock.tick(args.fps)
+                prof.end()
+    finally:
+        if recorder is not None:
+            recorder.close()
+        pygame.quit()
+    if prof.frames:
+        profiling.print_means(prof, "viewer")
+    if args.trace:
+        prof.write_trace(args.trace)
+        print("Wrote %s" % args.trace)
+
+
+if __name__ == "__main__":
+    main()
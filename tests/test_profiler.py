@@ -0,0 +1,34 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from hexsim import profiler as profiling
+
+
+def test_hud_key_enables_a_disabled_profiler_at_the_next_frame():
+    prof = profiling.Profiler(enabled=False)
+    hud = profiling.Hud(prof, visible=False)
+    for frame in range(3):
+        # The viewer's event phase, with F3 pressed in the middle of it
+        prof.frame()
+        prof.begin(profiling.EVENTS)
+        if frame == 0:
+            assert hud.handle_key(pygame.K_F3)
+            assert not prof.enabled
+        prof.end()
+    assert prof.enabled
+    assert prof.frames == 1
+    assert prof.history[0][prof._index[profiling.EVENTS]] > 0
+
+
+def test_hud_key_hides_and_shows_without_disabling():
+    prof = profiling.Profiler(enabled=True)
+    hud = profiling.Hud(prof, visible=True)
+    prof.frame()
+    prof.begin(profiling.EVENTS)
+    hud.handle_key(pygame.K_F3)
+    hud.handle_key(pygame.K_F3)
+    prof.end()
+    assert hud.visible and prof.enabled